@@ -1,15 +1,18 @@
+import asyncio
 import os
 import json
 import re
+import time
 import traceback
-from typing import Dict
+from typing import Dict, List
 from urllib.parse import urljoin
 from datetime import datetime
 
 import openai
 import torch
 import torch.nn.functional as F
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 from pydantic import BaseModel
 from transformers import AutoTokenizer, AutoModel, AutoModelForCausalLM
@@ -19,6 +22,26 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from bs4 import BeautifulSoup
 
+from serving.admission import (
+    ASK_DEGRADED,
+    AdmissionController,
+    Rejected,
+    TokenBucket,
+    fallback_answer,
+)
+from serving.embedder import EMBEDDER_DIR, CompiledEmbedder
+from serving.facts import ASK_FAST_PATH, ASK_LATENCY
+from serving.generation import create_generator
+from serving.index import INDEX_CONFIG_FILE, IndexRefresher, load_index_config
+from serving.rerank import PROMPT_CHARS, RETRIEVAL_STAGE_SECONDS, Reranker, retrieve
+from serving.query_log import WARM_START_FILE, QueryLog, WarmStart
+from serving.router import ShardRouter
+from serving.singleflight import SingleFlight, normalize_question
+from storage.doc_store import DocStore
+from storage.entity_resolution import MERGED_PLAYERS_FILE, refresh_merged
+from storage.players import DATA_DIR, PLAYERS_FILE, iter_players
+from storage.stats_store import STATS_DIR, StatsStore
+
 # Optional: If using a .env file, uncomment the following lines
 from dotenv import load_dotenv
 
@@ -37,16 +60,35 @@ app.add_middleware(
 
 Instrumentator().instrument(app).expose(app)  # Prometheus monitoring instrumentation
 
-# Initialize OpenAI API Key
+# Initialize OpenAI API Key (not needed when answering with the local model only)
 openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
+if not openai_api_key and os.getenv("LLM_BACKEND", "openai") != "local":
     raise ValueError(
         "OpenAI API key not found. Please set the OPENAI_API_KEY environment variable."
     )
 openai.api_key = openai_api_key
 
+# Touch or rewrite this file to force the background index refresher to rebuild
+PLAYERS_VERSION_FILE = os.path.join(DATA_DIR, "players.version")
+
+# Career stats from the Wikipedia tables, built by `python -m app.storage.stats_store`
+stats_store = None
+
+# Answer generator, picked by LLM_BACKEND at startup
+generator = None
+
+# Sampled question log (QUERY_LOG_SAMPLE_RATE > 0) and answers prewarmed from it by prewarm.py
+query_log = None
+warm_start = None
+
+# Exported embedder graph (`python -m serving.embedder export`), used instead of eager PyTorch when present
+compiled_embedder = None
+
 
 def get_embeddings(text, model, tokenizer):
+    if compiled_embedder is not None:
+        return compiled_embedder.embed(text)
+
     # Tokenize and get model outputs
     inputs = tokenizer(
         text, return_tensors="pt", padding=True, truncation=True, max_length=512
@@ -64,113 +106,337 @@ def get_embeddings(text, model, tokenizer):
         return embeddings.squeeze().numpy().tolist()  # Final shape: [384]
 
 
-def load_players_from_json():
-    """Load player data from JSON file"""
-    data_dir = os.path.join(os.path.dirname(__file__), "data")
-    players_file = os.path.join(data_dir, "players.json")
+def get_embeddings_batch(texts, model, tokenizer, batch_size=32):
+    """Embed many texts with one forward pass per `batch_size` chunk"""
+    if compiled_embedder is not None:
+        return compiled_embedder.embed_batch(texts, batch_size=batch_size)
 
-    if os.path.exists(players_file):
-        with open(players_file, "r") as f:
-            data = json.load(f)
-            # Make sure we're returning the list of players from the JSON structure
-            return data.get("players", [])
-    return []
+    results = []
+    for start in range(0, len(texts), batch_size):
+        inputs = tokenizer(
+            texts[start : start + batch_size],
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=512,
+        )
+        with torch.no_grad():
+            outputs = model(**inputs)
+            # Mean over real tokens only, so padding doesn't change each text's embedding
+            mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+            summed = (outputs.last_hidden_state * mask).sum(dim=1)
+            embeddings = summed / mask.sum(dim=1).clamp(min=1)  # Shape: [B, 768]
+            embeddings = F.avg_pool1d(embeddings.unsqueeze(1), kernel_size=2)  # [B, 1, 384]
+            results.extend(embeddings.squeeze(1).numpy().tolist())
+    return results
+
+
+def players_source_file():
+    """
+    The players file to index, preferring the resolved SportsDB + Wikipedia
+    file. Crawls only write the inputs, so the merged file is re-resolved
+    here whenever one of them is newer; the refresher polls this, and the
+    rewritten merged file then triggers a rebuild.
+    """
+    if os.path.exists(MERGED_PLAYERS_FILE):
+        try:
+            if refresh_merged():
+                print(f"Re-resolved {MERGED_PLAYERS_FILE} from updated crawl output")
+        except Exception as e:
+            print(f"Error re-resolving players, indexing the previous merged file: {e}")
+            traceback.print_exc()
+        return MERGED_PLAYERS_FILE
+    return PLAYERS_FILE
+
+
+def load_players_from_json(fields=None, path=None):
+    """Stream player records from the players JSON file"""
+    return iter_players(path or players_source_file(), fields=fields)
 
 
 @app.on_event("startup")
 async def startup_event():
-    global embedder_tokenizer, embedder_model, chroma_client, collection
-    global llm_model, llm_tokenizer
+    global embedder_tokenizer, embedder_model, chroma_client, index_refresher
+    global generator, stats_store, compiled_embedder, query_log, warm_start
 
     # 1. Initialize embedding model
     embedder_tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
     embedder_model = AutoModel.from_pretrained("bert-base-uncased")
-
-    # 2. Set up Chroma
-    chroma_client = chromadb.PersistentClient(path=".chroma")
-    try:
-        chroma_client.delete_collection(name="sports")
-        print("Deleted existing collection")
-    except Exception as e:
-        print(f"No existing collection to delete: {e}")
-    collection = chroma_client.get_or_create_collection(name="sports")
-
-    # Load players from JSON
-    players = load_players_from_json()
-    print(f"\nLoaded {len(players)} players from JSON")
-
-    # Convert to documents format
-    docs = []
-    ids = []
-    seen_names = set()
-
-    for idx, player in enumerate(players):
-        # Only process if we have a description and it's not a placeholder
-        description = player.get("description", "").strip()
-        if description and description != "--- add one?":
-            # Extract name from description (usually first sentence up to first parenthesis)
-            name_match = re.match(r"^([^(]+)", description)
-            if name_match:
-                name = name_match.group(1).strip()
-                print(f"\nProcessing player {idx + 1}/{len(players)}")
-                print(f"Extracted Name: {name}")
-                print(f"Description length: {len(description)}")
-
-                # Create unique ID using extracted name
-                unique_id = f"{name}_{idx}"  # Using index to ensure uniqueness
-
-                if unique_id in seen_names:
-                    print(f"Skipping duplicate player: {unique_id}")
-                    continue
-
-                seen_names.add(unique_id)
-
-                # Add to documents
-                docs.append(description)
-                ids.append(unique_id)
-                print(f"Added player: {unique_id}")
-        else:
-            print(
-                f"\nSkipping player {idx + 1} - no description or placeholder description"
+    embedder_path = os.getenv("EMBEDDER_PATH", EMBEDDER_DIR)
+    # The exported graph is opt-in until its parity check and benchmark have been run on the serving hosts
+    if os.getenv("EMBEDDER_BACKEND", "eager") == "compiled" and os.path.exists(
+        os.path.join(embedder_path, "embedder.json")
+    ):
+        try:
+            compiled_embedder = CompiledEmbedder(
+                embedder_path, threads=int(os.getenv("EMBEDDER_THREADS", "0")) or None
             )
+        except Exception as e:
+            print(f"Could not load compiled embedder, using eager PyTorch: {e}")
+            traceback.print_exc()
 
-    # Generate embeddings
-    if docs:
-        print(f"\nProcessing {len(docs)} unique players...")
-        embeddings = [
-            get_embeddings(doc, embedder_model, embedder_tokenizer) for doc in docs
-        ]
+    # 2. Set up Chroma and build the first index generation
+    chroma_client = chromadb.PersistentClient(path=".chroma")
+    index_refresher = IndexRefresher(
+        chroma_client,
+        embed=lambda text: get_embeddings(text, embedder_model, embedder_tokenizer),
+        source=players_source_file,
+        load=lambda path: load_players_from_json(path=path),
+        version_file=PLAYERS_VERSION_FILE,
+        interval=float(os.getenv("INDEX_REFRESH_INTERVAL", "60")),
+        collection_metadata=load_index_config(os.getenv("INDEX_CONFIG", INDEX_CONFIG_FILE)),
+    )
+    index_refresher.drop_stale_collections()
+    index_refresher.rebuild()
+
+    # Pick up new crawl data in the background and swap it in without a restart
+    index_refresher.start()
+
+    # Stats questions ("most receiving yards in 2021 among Ravens") are answered from data
+    if os.path.exists(os.path.join(STATS_DIR, "manifest.json")):
+        stats_store = StatsStore.load(STATS_DIR)
+        print(f"Loaded career stats for {len(stats_store.players)} players")
+
+    # The most asked questions are answered from the warm-start artifact while its data is live
+    warm_start = WarmStart.load(os.getenv("WARM_START_FILE", WARM_START_FILE), players_source_file())
+    if warm_start is not None:
+        warm_start.attach(index_refresher.current.number)
+        print(f"Loaded {len(warm_start)} warm-start questions")
+
+    sample_rate = float(os.getenv("QUERY_LOG_SAMPLE_RATE", "0"))
+    if sample_rate > 0:
+        query_log = QueryLog(sample_rate=sample_rate)
+
+    # 3. Initialize the answer generator: "openai", "local" (CPU model), or "openai+local"
+    generator = create_generator(
+        os.getenv("LLM_BACKEND", "openai"),
+        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        api_base=os.getenv("OPENAI_API_BASE"),
+        local_model_name=os.getenv("LOCAL_LLM_MODEL", "distilgpt2"),
+        local_max_new_tokens=int(os.getenv("LOCAL_LLM_MAX_NEW_TOKENS", "128")),
+        local_max_batch=int(os.getenv("LOCAL_LLM_MAX_BATCH", "8")),
+        local_threads=int(os.getenv("LOCAL_LLM_THREADS", "0")),
+    )
+    print(f"Answer generation backend: {generator.name}")
 
-        # Add to collection
-        collection.add(documents=docs, embeddings=embeddings, ids=ids)
-        print(f"Added {len(docs)} players to vector database")
-    else:
-        print("No players to add to vector database!")
+    # 4. Prometheus monitoring instrumentation
 
-    # 3. Initialize LLM (Removed local LLM initialization)
 
-    # 4. Prometheus monitoring instrumentation
+@app.on_event("shutdown")
+async def shutdown_event():
+    index_refresher.stop()
 
 
 class QueryRequest(BaseModel):
     question: str
 
 
+class BatchQueryRequest(BaseModel):
+    questions: List[str]
+
+
+# Limits for /ask/batch
+ASK_BATCH_MAX_QUESTIONS = int(os.getenv("ASK_BATCH_MAX_QUESTIONS", "1000"))
+ASK_BATCH_LLM_CONCURRENCY = int(os.getenv("ASK_BATCH_LLM_CONCURRENCY", "8"))
+
+# Admission control for /ask: keep the queue short enough to answer before the ALB gives up
+admission = AdmissionController(
+    max_in_flight=int(os.getenv("ASK_MAX_IN_FLIGHT", "16")),
+    max_queue=int(os.getenv("ASK_MAX_QUEUE", "64")),
+    queue_timeout=float(os.getenv("ASK_QUEUE_TIMEOUT", "10")),
+    client_rate=float(os.getenv("ASK_CLIENT_RATE", "2")),
+    client_burst=float(os.getenv("ASK_CLIENT_BURST", "10")),
+)
+
+# Retrieval cascade: wide vector search, then rerank down to what goes in the prompt
+reranker = Reranker(
+    candidate_k=int(os.getenv("RETRIEVAL_CANDIDATE_K", "40")),
+    final_k=int(os.getenv("RETRIEVAL_FINAL_K", "4")),
+)
+
+# Sends each question to the league shards it is about, fanning out when unclear
+router = ShardRouter(max_workers=int(os.getenv("ROUTER_MAX_WORKERS", "8")))
+
+# Identical questions asked at the same moment (game-event bursts) share one computation
+inflight = SingleFlight()
+
+# OpenAI calls per minute; past this /ask answers from the retrieved docs alone
+ASK_LLM_CALLS_PER_MINUTE = float(os.getenv("ASK_LLM_CALLS_PER_MINUTE", "600"))
+llm_budget = TokenBucket(
+    rate=ASK_LLM_CALLS_PER_MINUTE / 60, burst=max(1.0, ASK_LLM_CALLS_PER_MINUTE / 6)
+)
+
+
+GENERATION_ERROR = "I'm sorry, but I couldn't process your request at the moment."
+
+
+def generate_answer(question: str, context: str) -> str:
+    """Answer the question from the retrieved context with the configured generator"""
+    try:
+        return generator.generate(question, context)
+    except Exception as e:
+        print(f"Error generating answer ({generator.name}): {e}")
+        return GENERATION_ERROR
+
+
+def client_id(request: Request) -> str:
+    """Identify the caller for rate limiting: explicit header, proxy header, then peer address"""
+    forwarded = request.headers.get("x-forwarded-for", "").split(",")[0].strip()
+    peer = request.client.host if request.client else "unknown"
+    return request.headers.get("x-client-id") or forwarded or peer
+
+
+def fast_answer(question: str, start: float):
+    """Answer from player fields or the stats store without the LLM, or None"""
+    # Simple factual questions are answered from player fields, skipping the queue and LLM
+    fact = index_refresher.current.facts.answer(question)
+    if fact is not None:
+        ASK_FAST_PATH.labels(result="hit").inc()
+        ASK_LATENCY.labels(path="fact").observe(time.perf_counter() - start)
+        print(f"⚡ Fast path ({fact['field']}): {question} -> {fact['answer']}")
+        return {"question": question, "answer": fact["answer"], "source": "facts"}
+
+    # Aggregate stats questions are answered with vectorized queries over the stats store
+    stat = stats_store.answer(question) if stats_store is not None else None
+    if stat is not None:
+        ASK_FAST_PATH.labels(result="stats").inc()
+        ASK_LATENCY.labels(path="stats").observe(time.perf_counter() - start)
+        print(f"⚡ Stats path ({stat['stat']}): {question} -> {stat['answer']}")
+        return {"question": question, "answer": stat["answer"], "source": "stats"}
+
+    # Popular questions prewarmed from the query log
+    warm = warm_entry(question)
+    if warm is not None and warm.get("answer"):
+        ASK_FAST_PATH.labels(result="warm").inc()
+        ASK_LATENCY.labels(path="warm").observe(time.perf_counter() - start)
+        return {"question": question, "answer": warm["answer"], "source": "warm"}
+    ASK_FAST_PATH.labels(result="miss").inc()
+    return None
+
+
+def warm_entry(question: str):
+    if warm_start is None:
+        return None
+    return warm_start.get(question, index_refresher.current.number)
+
+
+def shed_response(e: Rejected) -> JSONResponse:
+    print(f"Shedding /ask request ({e.reason}), retry after {e.retry_after}s")
+    return JSONResponse(
+        status_code=e.status,
+        content={"detail": f"Server busy ({e.reason}), please retry later"},
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
 @app.post("/ask")
-async def ask_question(query_req: QueryRequest):
+async def ask_question(query_req: QueryRequest, request: Request):
+    start = time.perf_counter()
+    if query_log is not None:
+        query_log.log(query_req.question, "ask")
+
+    fast = fast_answer(query_req.question, start)
+    if fast is not None:
+        return fast
+
+    # Charge every caller, including the ones that end up joining an in-flight answer
+    try:
+        admission.limit(client_id(request))
+    except Rejected as e:
+        return shed_response(e)
+
+    async def answer():
+        async with admission.admit():
+            # The embedding, Chroma and LLM calls all block, so keep them off the event loop
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, answer_question, query_req)
+
+    try:
+        response, shared = await inflight.do(normalize_question(query_req.question), answer)
+    except Rejected as e:
+        return shed_response(e)
+    ASK_LATENCY.labels(path="coalesced" if shared else "rag").observe(time.perf_counter() - start)
+    if shared:
+        return {**response, "question": query_req.question}
+    return response
+
+
+@app.post("/ask/stream")
+async def ask_stream(query_req: QueryRequest, request: Request):
+    """Like /ask, but streams the answer as plain text while it is generated"""
+    start = time.perf_counter()
+    if query_log is not None:
+        query_log.log(query_req.question, "stream")
+
+    fast = fast_answer(query_req.question, start)
+    if fast is not None:
+        return StreamingResponse(iter([fast["answer"]]), media_type="text/plain")
+
+    try:
+        admission.limit(client_id(request))
+    except Rejected as e:
+        return shed_response(e)
+
+    loop = asyncio.get_running_loop()
+
+    async def stream():
+        # The slot is taken and released inside the body, so it is held until the last token is
+        # sent, and a client that disconnects before the body starts never holds one
+        try:
+            async with admission.admit():
+                docs, _ = await loop.run_in_executor(None, retrieve_docs, query_req.question)
+                if llm_budget.take():
+                    ASK_DEGRADED.inc()
+                    yield fallback_answer(query_req.question, docs)
+                    return
+                context = "\n\n".join(docs)
+                PROMPT_CHARS.observe(len(context))
+                pieces = generator.stream(query_req.question, context)
+                done = object()
+                try:
+                    while True:
+                        piece = await loop.run_in_executor(None, next, pieces, done)
+                        if piece is done:
+                            break
+                        yield piece
+                except Exception as e:
+                    print(f"Error streaming answer ({generator.name}): {e}")
+                    yield GENERATION_ERROR
+                ASK_LATENCY.labels(path="rag").observe(time.perf_counter() - start)
+        except Rejected as e:
+            # Headers are already out, so a shed stream says so in its body
+            print(f"Shedding /ask/stream request ({e.reason}), retry after {e.retry_after}s")
+            yield f"Server busy ({e.reason}), please retry later"
+
+    return StreamingResponse(stream(), media_type="text/plain")
+
+
+def retrieve_docs(question: str, query_embedding=None):
+    """Embed, retrieve and rerank: the descriptions and ids that go into the prompt"""
+    # Prewarmed questions already have their context
+    warm = warm_entry(question)
+    if warm is not None and warm.get("docs"):
+        return warm["docs"], warm["ids"]
+
+    # Convert user question into embedding
+    if query_embedding is None:
+        stage_start = time.perf_counter()
+        query_embedding = get_embeddings(question, embedder_model, embedder_tokenizer)
+        RETRIEVAL_STAGE_SECONDS.labels(stage="embed").observe(time.perf_counter() - stage_start)
+
+    # Pin the live index generation until retrieval is done, so a swap cannot drop its collections
+    with index_refresher.acquire() as index:
+        # Retrieve a wide candidate set and keep the best few after reranking
+        retrieved_rows, retrieved_ids = retrieve(index, query_embedding, question, reranker, router)
+        return [index.player_table.description(row).strip() for row in retrieved_rows], retrieved_ids
+
+
+def answer_question(query_req: QueryRequest):
     print("\n" + "=" * 50)
     print(f"📝 Question: {query_req.question}")
     print("-" * 50)
 
-    # Convert user question into embedding
-    query_embedding = get_embeddings(
-        query_req.question, embedder_model, embedder_tokenizer
-    )
-
-    # Retrieve matching docs (increase n_results since we're looking for multiple players)
-    results = collection.query(query_embeddings=[query_embedding], n_results=10)
-    retrieved_docs = results["documents"][0]
-    retrieved_ids = results["ids"][0]
+    retrieved_docs, retrieved_ids = retrieve_docs(query_req.question)
 
     # print("🔍 Retrieved Context:")
     # for i, (doc, id) in enumerate(zip(retrieved_docs, retrieved_ids), 1):
@@ -179,49 +445,131 @@ async def ask_question(query_req: QueryRequest):
     # Combine retrieved documents into a single context string
     context = "\n\n".join(retrieved_docs)
 
-    # Create a prompt for OpenAI
-    prompt = f"""
-    You are an intelligent assistant knowledgeable about NFL players.
+    if llm_budget.take():
+        # LLM budget exhausted: answer from the retrieved docs alone
+        ASK_DEGRADED.inc()
+        answer = fallback_answer(query_req.question, retrieved_docs)
+        print(f"💡 Answer (retrieval only): {answer}")
+        print("=" * 50 + "\n")
+        return {"question": query_req.question, "answer": answer, "degraded": True}
 
-    Use the information below to answer the question.
+    PROMPT_CHARS.observe(len(context))
+    stage_start = time.perf_counter()
+    answer = generate_answer(query_req.question, context)
+    RETRIEVAL_STAGE_SECONDS.labels(stage="generate").observe(time.perf_counter() - stage_start)
+    print(f"💡 Answer: {answer}")
 
-    Context:
-    {context}
+    print("=" * 50 + "\n")
 
-    Question: {query_req.question}
+    return {"question": query_req.question, "answer": answer}
 
-    Answer:
-    """
 
+@app.post("/ask/batch")
+async def ask_batch(batch_req: BatchQueryRequest, request: Request):
+    """
+    Answer many questions in one call, streaming NDJSON lines as answers complete.
+
+    Each question first tries the same fact/stats/warm fast paths as /ask. The
+    rest are embedded in batched forward passes and retrieved with one
+    multi-query Chroma call per routed shard, then reranked per question; each
+    retrieved description is read once and shared between questions. Every LLM
+    call takes an admission slot and an `llm_budget` token like /ask does, and
+    falls back to a retrieval-only answer when either is unavailable.
+    """
+    start = time.perf_counter()
+    questions = batch_req.questions
+    if len(questions) > ASK_BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {ASK_BATCH_MAX_QUESTIONS} questions per batch",
+        )
     try:
-        # Call OpenAI API to generate the answer
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an intelligent assistant knowledgeable about NFL players. Only answer questions about the NFL. If the question is not about the NFL, say 'I'm sorry, but I can only answer questions about the NFL.'",
-                },
-                {
-                    "role": "user",
-                    "content": f"Use the following context to answer the question like you are a sports expert.\n\nContext:\n{context}\n\nQuestion: {query_req.question}",
-                },
-            ],
-            max_tokens=300,
-            n=1,
-            stop=None,
-            temperature=0.7,
+        admission.limit(client_id(request))
+    except Rejected as e:
+        return shed_response(e)
+
+    fast = {}
+    for i, question in enumerate(questions):
+        answer = fast_answer(question, start)
+        if answer is not None:
+            fast[i] = answer
+    pending = [i for i in range(len(questions)) if i not in fast]
+
+    loop = asyncio.get_running_loop()
+    docs = {}
+    ranked_ids = {}
+    if pending:
+        pending_questions = [questions[i] for i in pending]
+        query_embeddings = await loop.run_in_executor(
+            None, get_embeddings_batch, pending_questions, embedder_model, embedder_tokenizer
         )
+        # Pin the live index generation while its collections are queried
+        with index_refresher.acquire() as index:
+            results = await loop.run_in_executor(
+                None,
+                lambda: router.query(
+                    index,
+                    pending_questions,
+                    query_embeddings,
+                    reranker.candidate_k,
+                    ["metadatas", "distances"],
+                ),
+            )
 
-        answer = response.choices[0].message["content"].strip()
-        print(f"💡 Answer: {answer}")
-    except Exception as e:
-        print(f"Error contacting OpenAI API: {e}")
-        answer = "I'm sorry, but I couldn't process your request at the moment."
+        # Rerank each question's candidates, then de-duplicate contexts shared between questions
+        descriptions: Dict[int, str] = {}
+        for j, metadatas in enumerate(results["metadatas"]):
+            i = pending[j]
+            rows, ids = reranker.rerank(
+                questions[i],
+                index.player_table,
+                [meta["row"] for meta in metadatas],
+                results["ids"][j],
+                results["distances"][j] if results.get("distances") else None,
+                index.terms,
+            )
+            ranked_ids[i] = ids
+            for row in rows:
+                if row not in descriptions:
+                    descriptions[row] = index.player_table.description(row).strip()
+            docs[i] = [descriptions[row] for row in rows]
+        print(
+            f"Batch of {len(questions)} questions ({len(fast)} fast path) "
+            f"retrieved {len(descriptions)} unique documents"
+        )
 
-    print("=" * 50 + "\n")
+    semaphore = asyncio.Semaphore(ASK_BATCH_LLM_CONCURRENCY)
 
-    return {"question": query_req.question, "answer": answer}
+    async def answer_one(i):
+        result = {"index": i, "question": questions[i], "ids": ranked_ids[i]}
+        async with semaphore:
+            try:
+                async with admission.admit():
+                    if not llm_budget.take():
+                        context = "\n\n".join(docs[i])
+                        PROMPT_CHARS.observe(len(context))
+                        answer = await loop.run_in_executor(
+                            None, generate_answer, questions[i], context
+                        )
+                        return {**result, "answer": answer}
+            except Rejected:
+                pass
+        # No slot or no LLM budget: answer from the retrieved docs alone
+        ASK_DEGRADED.inc()
+        return {**result, "answer": fallback_answer(questions[i], docs[i]), "degraded": True}
+
+    async def stream():
+        for i, answer in fast.items():
+            yield json.dumps({"index": i, **answer}) + "\n"
+        tasks = [asyncio.ensure_future(answer_one(i)) for i in pending]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @app.get("/health")
@@ -230,83 +578,65 @@ async def health():
 
 
 def create_sports_docs():
-    """Create document objects from sports data files"""
-    docs = []
+    """Yield document objects from sports data files"""
+    fields = ("name", "description", "url", "team", "position", "nationality", "honors")
 
-    # Load players data
+    # Stream players data
     try:
-        with open("app/data/players.json", "r") as f:
-            players_data = json.load(f)
-            players = players_data.get("players", [])
-
-            for player in players:
-                if not isinstance(player, dict):
-                    print(f"Skipping invalid player data: {player}")
-                    continue
-
-                description = player.get("description", "").strip()
-
-                # Skip players with placeholder description
-                if description == "--- add one?":
-                    print(
-                        f"Skipping player '{player.get('name', 'Unknown')}' due to placeholder description."
-                    )
-                    continue
-
-                # Create document for each player
-                doc = {
-                    "title": player.get("name", "Unknown Player"),
-                    "content": description,
-                    "metadata": {
-                        "url": player.get("url", ""),
-                        "team": player.get("team", ""),
-                        "position": player.get("position", ""),
-                        "nationality": player.get("nationality", ""),
-                        "honors": player.get("honors", []),
-                    },
-                }
-                docs.append(doc)
+        for player in iter_players(PLAYERS_FILE, fields=fields):
+            if not isinstance(player, dict):
+                print(f"Skipping invalid player data: {player}")
+                continue
+
+            description = player.get("description", "").strip()
+
+            # Skip players with placeholder description
+            if description == "--- add one?":
+                print(
+                    f"Skipping player '{player.get('name', 'Unknown')}' due to placeholder description."
+                )
+                continue
+
+            # Create document for each player
+            yield {
+                "title": player.get("name", "Unknown Player"),
+                "content": description,
+                "metadata": {
+                    "url": player.get("url", ""),
+                    "team": player.get("team", ""),
+                    "position": player.get("position", ""),
+                    "nationality": player.get("nationality", ""),
+                    "honors": player.get("honors", []),
+                },
+            }
 
     except Exception as e:
         print(f"Error loading players data: {e}")
         traceback.print_exc()
 
-    return docs
-
 
-def update_sample_data(sports_docs):
-    """Update sample_data.py with new sports docs"""
+def update_sample_data(sports_docs, doc_store=None):
+    """Upsert sports docs into the doc store and regenerate sample_data.py"""
     print("\nUpdating sample_data.py...")
     sample_data_path = os.path.join(os.path.dirname(__file__), "sample_data.py")
 
-    # Read existing SPORTS_DOCS if file exists
-    existing_docs = []
-    if os.path.exists(sample_data_path):
-        with open(sample_data_path, "r") as f:
-            content = f.read()
-            try:
-                # Find the list content between brackets
-                start = content.find("[")
-                end = content.rfind("]") + 1
-                if start != -1 and end != -1:
-                    existing_docs = eval(content[start:end])
-            except Exception as e:
-                print(f"Error reading existing sample_data.py: {e}")
-
-    # Merge existing docs with new docs, avoiding duplicates
-    updated_docs = existing_docs.copy()
-    for new_doc in sports_docs:
-        if not any(doc["title"] == new_doc["title"] for doc in existing_docs):
-            updated_docs.append(new_doc)
-            print(f"Added {new_doc['title']} to sample_data.py")
-
-    # Write back to file
-    with open(sample_data_path, "w") as f:
-        f.write("# sample_data.py\n\nSPORTS_DOCS = ")
-        f.write(json.dumps(updated_docs, indent=4))
+    store = doc_store or DocStore()
 
+    # Seed the store from the legacy file the first time it is used
+    if len(store) == 0:
+        try:
+            migrated = store.import_sample_data(sample_data_path)
+            if migrated:
+                print(f"Imported {migrated} docs from existing sample_data.py")
+        except Exception as e:
+            print(f"Error reading existing sample_data.py: {e}")
+
+    upserted = store.upsert_many(sports_docs)
+    print(f"Upserted {upserted} docs into {store.path}")
+
+    store.export_sample_data(sample_data_path)
     print(f"Successfully updated {sample_data_path}")
-    return updated_docs
+    return store
 
 
 def update_vector_db():
@@ -322,14 +652,14 @@ def update_vector_db():
         collection = chroma_client.create_collection("players")
         print("Created new collection")
 
-    # Convert player data to SPORTS_DOCS format
-    sports_docs = create_sports_docs()
-
-    # Update sample_data.py
-    update_sample_data(sports_docs)
+    # Convert player data to SPORTS_DOCS format and update sample_data.py
+    store = update_sample_data(create_sports_docs())
 
-    # Process each document
-    for doc in sports_docs:
+    # Process each document, streaming from the store
+    for doc in store.iter_docs():
+        if "metadata" not in doc:
+            # Hand-written sample docs carry no player metadata
+            continue
         try:
             collection.add(
                 documents=[doc["content"]],
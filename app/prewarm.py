@@ -0,0 +1,73 @@
+# prewarm.py
+import argparse
+import asyncio
+import time
+import traceback
+from datetime import datetime
+
+import main
+from serving.query_log import QUERY_LOG_DIR, WARM_START_FILE, log_files, mine, purge
+from storage.durable import DurableWriter, file_sha256
+
+
+async def build(top_n: int, min_count: int, days: int, output: str) -> int:
+    """
+    Mine the query log for the most asked question clusters and precompute
+    each one's embedding, retrieved context and answer with the same
+    pipeline /ask uses. Questions the fact/stats paths already answer
+    from data are skipped.
+    """
+    await main.startup_event()
+    main.warm_start = None  # build from the live pipeline, not the previous artifact
+    try:
+        clusters = mine(log_files(QUERY_LOG_DIR, days), top_n, min_count)
+        print(f"Mined {len(clusters)} question clusters asked at least {min_count} times")
+
+        entries = []
+        start = time.perf_counter()
+        for cluster in clusters:
+            question = cluster["question"]
+            if main.fast_answer(question, time.perf_counter()) is not None:
+                continue
+            try:
+                embedding = main.get_embeddings(question, main.embedder_model, main.embedder_tokenizer)
+                docs, ids = main.retrieve_docs(question, embedding)
+            except Exception as e:
+                print(f"Error retrieving context for '{question}': {e}")
+                traceback.print_exc()
+                continue
+            try:
+                answer = main.generator.generate(question, "\n\n".join(docs))
+            except Exception as e:
+                print(f"Error generating answer for '{question}', keeping context only: {e}")
+                answer = None
+            entries.append({**cluster, "embedding": embedding, "ids": ids, "docs": docs, "answer": answer})
+
+        players_file = main.players_source_file()
+        DurableWriter(output).write_json(
+            {
+                "built_at": datetime.now().isoformat(),
+                "players_file": players_file,
+                "players_sha256": file_sha256(players_file),
+                "entries": entries,
+            }
+        )
+        print(f"Prewarmed {len(entries)} questions in {time.perf_counter() - start:.1f}s -> {output}")
+        return len(entries)
+    finally:
+        await main.shutdown_event()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the warm-start artifact from the query log")
+    parser.add_argument("--top", type=int, default=200, help="Question clusters to prewarm")
+    parser.add_argument("--min-count", type=int, default=3, help="Ignore clusters asked fewer times")
+    parser.add_argument("--days", type=int, default=7, help="Days of query log to mine")
+    parser.add_argument("--keep-days", type=int, default=30, help="Delete query log files older than this")
+    parser.add_argument("--output", default=WARM_START_FILE)
+    args = parser.parse_args()
+
+    removed = purge(QUERY_LOG_DIR, args.keep_days)
+    if removed:
+        print(f"Deleted {removed} query log files past the {args.keep_days}-day retention")
+    asyncio.run(build(args.top, args.min_count, args.days, args.output))
@@ -0,0 +1,159 @@
+# crawl_metrics.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, start_http_server, write_to_textfile
+
+CRAWL_PAGES = Counter(
+    "sports_crawl_pages_total", "Pages finished by the crawlers, by outcome", ["crawler", "result"]
+)
+CRAWL_STAGE_SECONDS = Histogram(
+    "sports_crawl_stage_seconds",
+    "Time spent parsing and saving",
+    ["crawler", "stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+CRAWL_ERRORS = Counter("sports_crawl_errors_total", "Crawl errors by stage", ["crawler", "stage"])
+CRAWL_QUEUE_DEPTH = Gauge("sports_crawl_queue_depth", "Known pages not yet processed", ["crawler"])
+CRAWL_LAST_PROGRESS = Gauge(
+    "sports_crawl_last_progress_timestamp_seconds",
+    "Unix time the crawler last finished a page (alert when this stops moving)",
+    ["crawler"],
+)
+CRAWL_MISSING_FIELDS = Counter(
+    "sports_crawl_missing_fields_total", "Parsed pages where a field came back empty", ["crawler", "field"]
+)
+
+
+def format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+class CrawlProgress:
+    """
+    Progress and throughput for one crawl run.
+
+    Feeds the sports_crawl_* metrics, serves them on `port` and/or writes
+    them to `textfile` (for node_exporter's textfile collector), and prints
+    a one-line summary every `interval` seconds -- including while stalled,
+    so a hung crawl is visible in the log as well as in the metrics.
+    """
+
+    def __init__(self, crawler: str, http=None, interval: float = 15.0):
+        self.crawler = crawler
+        self.http = http
+        self.interval = float(os.getenv("CRAWL_PROGRESS_INTERVAL", interval))
+        self.port = int(os.getenv("CRAWL_METRICS_PORT", "0")) or None
+        self.textfile = os.getenv("CRAWL_METRICS_TEXTFILE") or None
+        self.total = 0
+        self.results = {"saved": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server_started = False
+        self._started_at = self._last_item = self._last_line = time.time()
+        self._done_at_last_line = 0
+
+    @property
+    def done(self) -> int:
+        return sum(self.results.values())
+
+    def add_total(self, count: int):
+        """More pages discovered (e.g. a team roster was read)"""
+        with self._lock:
+            self.total += count
+            CRAWL_QUEUE_DEPTH.labels(crawler=self.crawler).set(max(self.total - self.done, 0))
+
+    def item(self, result: str = "saved"):
+        """One page finished: saved, unchanged, skipped or failed"""
+        with self._lock:
+            self.results[result] = self.results.get(result, 0) + 1
+            self._last_item = time.time()
+            CRAWL_PAGES.labels(crawler=self.crawler, result=result).inc()
+            CRAWL_LAST_PROGRESS.labels(crawler=self.crawler).set(self._last_item)
+            CRAWL_QUEUE_DEPTH.labels(crawler=self.crawler).set(max(self.total - self.done, 0))
+
+    def missing_fields(self, record: dict, fields):
+        for field in fields:
+            if not record.get(field):
+                CRAWL_MISSING_FIELDS.labels(crawler=self.crawler, field=field).inc()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a parse/save step; exceptions are counted and re-raised"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            CRAWL_ERRORS.labels(crawler=self.crawler, stage=name).inc()
+            raise
+        finally:
+            CRAWL_STAGE_SECONDS.labels(crawler=self.crawler, stage=name).observe(time.perf_counter() - start)
+
+    def error(self, stage: str):
+        CRAWL_ERRORS.labels(crawler=self.crawler, stage=stage).inc()
+
+    def line(self) -> str:
+        now = time.time()
+        with self._lock:
+            done, total = self.done, self.total
+            recent = (done - self._done_at_last_line) / max(now - self._last_line, 1e-9)
+            self._done_at_last_line, self._last_line = done, now
+            results = dict(self.results)
+            idle = now - self._last_item
+        elapsed = max(now - self._started_at, 1e-9)
+        rate = done / elapsed
+        queued = max(total - done, 0)
+
+        parts = [
+            f"[{self.crawler}] {done}/{total} pages ({results['saved']} saved, "
+            f"{results['unchanged']} unchanged, {results['skipped']} skipped, {results['failed']} failed)",
+            f"{rate:.2f} pages/s (now {recent:.2f})",
+        ]
+        if self.http is not None:
+            snap = self.http.metrics.snapshot()
+            parts.append(
+                f"{snap['bytes_wire'] / 1e6:.1f} MB, fetch avg {snap['latency_avg'] * 1000:.0f} ms, "
+                f"{snap['retries']} retries, {snap['errors']} errors"
+            )
+        parts.append(f"ETA {format_seconds(queued / rate)}" if rate > 0 and queued else f"{queued} queued")
+        if idle > 4 * self.interval:
+            parts.append(f"STALLED {format_seconds(idle)}")
+        return " | ".join(parts)
+
+    def report(self):
+        print(self.line())
+        if self.textfile:
+            try:
+                write_to_textfile(self.textfile, REGISTRY)
+            except OSError as e:
+                print(f"Error writing crawl metrics to {self.textfile}: {e}")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.report()
+
+    def start(self):
+        self._started_at = self._last_item = self._last_line = time.time()
+        self._done_at_last_line = self.done
+        if self.port and not self._server_started:
+            start_http_server(self.port)
+            self._server_started = True
+            print(f"Serving crawl metrics on :{self.port}/metrics")
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name=f"{self.crawler}-progress", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+        self.report()
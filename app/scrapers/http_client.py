@@ -0,0 +1,236 @@
+# http_client.py
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from prometheus_client import Counter as MetricCounter, Histogram
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.scrapers.page_cache import PageCache
+
+try:
+    import brotli
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    brotli = None
+    ACCEPT_ENCODING = "gzip, deflate"
+
+FETCH_SECONDS = Histogram(
+    "sports_crawl_fetch_seconds",
+    "HTTP fetch latency, including retries",
+    ["host"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32),
+)
+FETCH_REQUESTS = MetricCounter(
+    "sports_crawl_fetch_requests_total", "HTTP fetches by final status (or 'error')", ["host", "status"]
+)
+FETCH_RETRIES = MetricCounter("sports_crawl_fetch_retries_total", "HTTP retries", ["host"])
+FETCH_BYTES = MetricCounter("sports_crawl_fetch_bytes_total", "Bytes received on the wire", ["host"])
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; SportsTalkCrawler/1.0)",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+}
+
+
+def _body_decoder(encoding: str) -> Optional[Tuple[Callable[[bytes], bytes], Callable[[], bytes]]]:
+    """(feed, finish) for a Content-Encoding we negotiate; None for identity or anything else"""
+    encoding = encoding.strip().lower()
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding != "deflate" else zlib.MAX_WBITS)
+        return decoder.decompress, decoder.flush
+    if encoding == "br" and brotli is not None:
+        decoder = brotli.Decompressor()
+        return decoder.process, lambda: b""
+    return None
+
+
+def read_body(response: requests.Response, chunk_size: int = 64 * 1024) -> int:
+    """
+    Read a `stream=True` response's body into `response.content` and return
+    the bytes received on the wire (before decompression). Counting the raw
+    stream works for chunked responses too, where there is no Content-Length.
+    """
+    encoding = response.headers.get("Content-Encoding", "")
+    decoder = _body_decoder(encoding)
+    if decoder is None and encoding.strip().lower() not in ("", "identity"):
+        # An encoding we didn't ask for: let urllib3 decode it and take what it counted
+        content = response.content
+        return int(response.headers.get("Content-Length") or response.raw.tell() or len(content))
+
+    wire = 0
+    parts = []
+    for chunk in response.raw.stream(chunk_size, decode_content=False):
+        wire += len(chunk)
+        parts.append(decoder[0](chunk) if decoder else chunk)
+    if decoder:
+        parts.append(decoder[1]())
+    response._content = b"".join(parts)
+    response._content_consumed = True
+    return wire
+
+
+class FetchMetrics:
+    """Thread-safe counters for everything that goes over the wire"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_wire = 0
+        self.bytes_decoded = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.status_codes = Counter()
+
+    def record(self, latency: float, status: Optional[int], wire: int, decoded: int, retries: int):
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+            self.bytes_wire += wire
+            self.bytes_decoded += decoded
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            if status is None:
+                self.errors += 1
+            else:
+                self.status_codes[status] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "bytes_wire": self.bytes_wire,
+                "bytes_decoded": self.bytes_decoded,
+                "latency_avg": self.latency_total / self.requests if self.requests else 0.0,
+                "latency_max": self.latency_max,
+                "status_codes": dict(self.status_codes),
+            }
+
+    def summary(self) -> str:
+        snap = self.snapshot()
+        return (
+            f"{snap['requests']} requests, {snap['errors']} errors, {snap['retries']} retries, "
+            f"{snap['bytes_wire'] / 1e6:.1f} MB on the wire ({snap['bytes_decoded'] / 1e6:.1f} MB decoded), "
+            f"avg {snap['latency_avg'] * 1000:.0f} ms, status {snap['status_codes']}"
+        )
+
+
+class FetchClient:
+    """
+    Shared HTTP client for the scrapers.
+
+    - One pooled keep-alive session, so pages on the same host reuse TCP/TLS.
+    - gzip (and brotli when available) negotiated via Accept-Encoding.
+    - Per-host concurrency cap, connect/read timeouts and retries with backoff
+      on connection errors, 429 and 5xx (Retry-After is honoured).
+    - Successful bodies are written to `cache` (if given) for offline re-parsing.
+    - Wire bytes are counted from the raw (still compressed) body stream.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = 4,
+        pool_size: int = 16,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 15.0,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        cache: Optional[PageCache] = None,
+    ):
+        self.cache = cache
+        self.max_per_host = max_per_host
+        self.timeout = (connect_timeout, read_timeout)
+        self.metrics = FetchMetrics()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_limits[host]
+
+    def get(self, url: str, headers: Optional[Dict] = None) -> requests.Response:
+        """GET with pooling, per-host limits and retries; raises requests.RequestException"""
+        start = time.perf_counter()
+        host = urlsplit(url).netloc
+        status = None
+        wire = decoded = retries = 0
+        try:
+            with self._host_limit(host):
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+                try:
+                    wire = read_body(response)
+                finally:
+                    response.close()
+            status = response.status_code
+            decoded = len(response.content)
+            history = getattr(getattr(response.raw, "retries", None), "history", None)
+            retries = len(history) if history else 0
+            response.raise_for_status()
+            if self.cache is not None:
+                self.cache.put(url, response.text, dict(response.headers), status)
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.record(elapsed, status, wire, decoded, retries)
+            FETCH_SECONDS.labels(host=host).observe(elapsed)
+            FETCH_REQUESTS.labels(host=host, status=str(status) if status else "error").inc()
+            if retries:
+                FETCH_RETRIES.labels(host=host).inc(retries)
+            FETCH_BYTES.labels(host=host).inc(wire)
+
+    def fetch_text(self, url: str, headers: Optional[Dict] = None) -> str:
+        """Return the page body, or "" (after logging) on any request error"""
+        try:
+            return self.get(url, headers=headers).text
+        except requests.RequestException as e:
+            print(f"Error fetching {url}: {str(e)}")
+            return ""
+
+    def close(self):
+        self.session.close()
+
+
+_shared_clients: Dict[bool, FetchClient] = {}
+_shared_lock = threading.Lock()
+
+
+def get_client(cached: bool = True) -> FetchClient:
+    """
+    Process-wide client shared by every scraper. HTML scrapers keep the
+    page cache for --replay; API clients pass cached=False, since JSON
+    responses are neither pages to re-parse nor safe to serve stale.
+    """
+    with _shared_lock:
+        if cached not in _shared_clients:
+            _shared_clients[cached] = FetchClient(cache=PageCache() if cached else None)
+        return _shared_clients[cached]
@@ -0,0 +1,141 @@
+# page_cache.py
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "page_cache")
+
+# Response headers worth keeping for later conditional requests / debugging
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date", "Cache-Control")
+
+
+class CachedPage(NamedTuple):
+    url: str
+    sha256: str
+    fetched_at: float
+    status: int
+    headers: Dict
+
+
+def _object_path(root: str, sha256: str) -> str:
+    return os.path.join(root, "objects", sha256[:2], sha256 + ".html.gz")
+
+
+def load_body(root: str, sha256: str) -> str:
+    """Read a cached body by hash (module-level so worker processes can use it)"""
+    with gzip.open(_object_path(root, sha256), "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+class PageCache:
+    """
+    Content-addressed raw HTML cache.
+
+    Bodies are gzip-compressed and stored once per SHA-256 under
+    `objects/`, so identical pages share storage. A SQLite index maps each
+    URL to its latest body hash, fetch time, status and selected headers.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT
+            )
+            """
+        )
+        self.conn.commit()
+
+    def put(self, url: str, body: str, headers: Optional[Dict] = None, status: int = 200) -> str:
+        data = body.encode("utf-8")
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = _object_path(self.root, sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        kept = {k: v for k, v in (headers or {}).items() if k in KEPT_HEADERS}
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, sha256, fetched_at, status, headers) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, sha256, time.time(), status, json.dumps(kept)),
+            )
+        return sha256
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT url, sha256, fetched_at, status, headers FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if not row:
+            return None
+        return CachedPage(row[0], row[1], row[2], row[3], json.loads(row[4] or "{}"))
+
+    def body(self, url: str) -> Optional[str]:
+        page = self.get(url)
+        return load_body(self.root, page.sha256) if page else None
+
+    def entries(self, prefix: str = "") -> Iterator[CachedPage]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, sha256, fetched_at, status, headers FROM pages "
+                "WHERE url LIKE ? ORDER BY url",
+                (prefix + "%",),
+            ).fetchall()
+        for row in rows:
+            yield CachedPage(row[0], row[1], row[2], row[3], json.loads(row[4] or "{}"))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+
+def _replay_one(args):
+    parse, root, url, sha256 = args
+    try:
+        return parse(load_body(root, sha256), url)
+    except Exception as e:
+        print(f"Error re-parsing {url}: {e}")
+        return None
+
+
+def replay(
+    cache: PageCache,
+    parse: Callable[[str, str], Optional[Dict]],
+    prefix: str = "",
+    workers: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Re-run `parse(html, url)` over every cached page under `prefix` in parallel.
+
+    `parse` must be a module-level function so it can be sent to worker processes.
+    """
+    jobs = [(parse, cache.root, page.url, page.sha256) for page in cache.entries(prefix)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = [r for r in pool.map(_replay_one, jobs, chunksize=16) if r]
+    print(
+        f"Replayed {len(jobs)} cached pages into {len(results)} records "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return results
@@ -1,18 +1,112 @@
-import chromadb
+import argparse
 import os
-from .crawler import SportsDBCrawler
+
+import chromadb
+from app.scrapers.page_cache import PageCache, replay
+from app.storage.durable import DurableWriter
+from .api import API_KEY, API_URL, SportsDBApiIngest
+from .crawler import SportsDBCrawler, replay_parse
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Crawl players from TheSportsDB")
+    parser.add_argument(
+        "--league",
+        default="NFL",
+        help="NFL, NBA, MLB, NHL or a /league/<id>-<slug> path "
+        "(use `python -m app.scrapers.sportsdb.jobs` for multi-worker crawls)",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Re-parse cached player pages instead of crawling",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Only re-parse new or changed player pages and write a delta file",
+    )
+    parser.add_argument(
+        "--api",
+        action="store_true",
+        help="Ingest rosters and bios from the JSON API instead of scraping HTML pages",
+    )
+    parser.add_argument("--api-url", default=API_URL)
+    parser.add_argument("--api-key", default=API_KEY, help="Defaults to SPORTSDB_API_KEY or the test key")
+    parser.add_argument("--concurrency", type=int, default=4, help="Teams fetched at once with --api")
+    parser.add_argument(
+        "--rate", type=float, default=0.5, help="Max API requests per second with --api (0: unlimited)"
+    )
+    parser.add_argument(
+        "--honours", action="store_true", help="Also fetch career honours (one request per player)"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--metrics-port", type=int, default=None, help="Serve crawl metrics on this port"
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        default=None,
+        help="Write crawl metrics here (Prometheus textfile format) with each progress line",
+    )
+    parser.add_argument(
+        "--progress-interval", type=float, default=None, help="Seconds between progress lines"
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Defaults to app/data/players_replay.json with --replay, app/data/players.json with --api",
+    )
+    args = parser.parse_args()
+
+    if args.api:
+        ingest = SportsDBApiIngest(
+            api_url=args.api_url,
+            api_key=args.api_key,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            honours=args.honours,
+        )
+        if args.metrics_port:
+            ingest.progress.port = args.metrics_port
+        if args.metrics_textfile:
+            ingest.progress.textfile = args.metrics_textfile
+        if args.progress_interval:
+            ingest.progress.interval = args.progress_interval
+        print(f"Ingesting {args.league} from {args.api_url}")
+        ingest.run([args.league], args.output or "app/data/players.json")
+        return
+
+    if args.replay:
+        args.output = args.output or "app/data/players_replay.json"
+        print("Replaying cached player pages")
+        players = replay(
+            PageCache(), replay_parse, prefix="https://www.thesportsdb.com/player/", workers=args.workers
+        )
+        DurableWriter(args.output).write_players(players)
+        print(f"Wrote {len(players)} players to {args.output}")
+        return
+
     # Initialize ChromaDB client
     chroma_client = chromadb.Client()
 
     # Create crawler instance
     crawler = SportsDBCrawler()
+    if args.metrics_port:
+        crawler.progress.port = args.metrics_port
+    if args.metrics_textfile:
+        crawler.progress.textfile = args.metrics_textfile
+    if args.progress_interval:
+        crawler.progress.interval = args.progress_interval
+
+    if args.refresh:
+        print(f"Starting incremental {args.league} refresh")
+        crawler.refresh(args.league)
+        return
 
-    # Start crawling from NFL league page
-    print("Starting to crawl NFL data")
-    crawler.run()
+    # Start crawling from the league page
+    print(f"Starting to crawl {args.league} data")
+    crawler.run(args.league)
 
 
 if __name__ == "__main__":
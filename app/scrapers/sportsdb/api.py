@@ -0,0 +1,197 @@
+# api.py
+import os
+import re
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlencode
+
+import requests
+
+from app.scrapers.crawl_metrics import CrawlProgress
+from app.scrapers.http_client import FetchClient, get_client
+from app.scrapers.sportsdb.crawler import BASE_URL, LEAGUES, TRACKED_FIELDS
+from app.storage.player_store import PlayerStore
+
+# v1 JSON API; "3" is TheSportsDB's public test key (set SPORTSDB_API_KEY for a Patreon key)
+API_URL = "https://www.thesportsdb.com/api/v1/json"
+API_KEY = os.getenv("SPORTSDB_API_KEY", "3")
+
+PLACEHOLDER_DESCRIPTION = "--- add one?"
+
+
+def league_id(league: str) -> str:
+    """'NFL' / '/league/4391-NFL' / '4391' -> '4391'"""
+    match = re.search(r"(\d+)", LEAGUES.get(league, league))
+    if not match:
+        raise ValueError(f"Unknown league {league!r}; pass NFL, NBA, MLB, NHL or a league id")
+    return match.group(1)
+
+
+def player_slug(name: str) -> str:
+    """The site's URL slug: "Ka'imi Fairbairn" -> "Kaimi-Fairbairn", non-ASCII percent-encoded"""
+    return quote("-".join(name.replace("'", "").split()), safe="-.")
+
+
+def player_url(player_id: str, name: str, site_url: str = BASE_URL) -> str:
+    """Same URL the HTML crawler records, so both paths upsert the same players"""
+    return f"{site_url}/player/{player_id}-{player_slug(name)}"
+
+
+def map_player(record: Dict, site_url: str = BASE_URL) -> Dict:
+    """Map one API player record onto the players.json schema"""
+    name = (record.get("strPlayer") or "").strip()
+    born = re.match(r"\d{4}", record.get("dateBorn") or "")
+    return {
+        "url": player_url(record.get("idPlayer", ""), name, site_url),
+        "name": name,
+        "number": record.get("strNumber") or "",
+        "position": record.get("strPosition") or "",
+        "birth_year": int(born.group()) if born else None,
+        "birth_place": record.get("strBirthLocation") or "",
+        "height": record.get("strHeight") or "",
+        "weight": record.get("strWeight") or "",
+        "team": record.get("strTeam") or "",
+        "status": record.get("strStatus") or "",
+        # The HTML path fills "nationality" from the Ethnicity row; keep that meaning
+        "nationality": record.get("strEthnicity") or record.get("strNationality") or "",
+        "description": (record.get("strDescriptionEN") or "").strip(),
+        "honors": [],
+    }
+
+
+def map_honours(records: Optional[List[Dict]]) -> List[Dict]:
+    return [
+        {"honor": r.get("strHonour") or "", "year": r.get("strSeason") or ""}
+        for r in records or []
+        if r.get("strHonour")
+    ]
+
+
+class RateLimiter:
+    """Spaces requests at least 1/`rate` seconds apart across all threads (rate <= 0: unlimited)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SportsDBApiIngest:
+    """
+    Ingest players from TheSportsDB's JSON API instead of scraping HTML.
+
+    One request lists a league's teams and one request per team returns the
+    whole roster with bios, so a league costs about (teams + 1) requests
+    instead of one HTML page per player. Player details are only looked up
+    individually when the roster record has no description, and honours
+    (one request per player) only when `honours` is set. Teams are fetched
+    `concurrency` at a time, with every request drawing from one `rate`
+    limit (the free key allows about 30 requests a minute).
+    """
+
+    def __init__(
+        self,
+        api_url: str = API_URL,
+        api_key: str = API_KEY,
+        site_url: str = BASE_URL,
+        concurrency: int = 4,
+        rate: float = 0.5,
+        honours: bool = False,
+        http: Optional[FetchClient] = None,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+        self.site_url = site_url
+        self.concurrency = concurrency
+        self.honours = honours
+        self.limiter = RateLimiter(rate)
+        self.http = http or get_client(cached=False)
+        self.progress = CrawlProgress("sportsdb_api", self.http)
+
+    def get_json(self, endpoint: str, **params) -> Dict:
+        """GET one endpoint; {} (after logging) on request errors or a non-JSON body"""
+        url = f"{self.api_url}/{self.api_key}/{endpoint}?{urlencode(params)}"
+        self.limiter.wait()
+        try:
+            return self.http.get(url).json() or {}
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error fetching {url}: {str(e)}")
+            self.progress.error("fetch")
+            return {}
+
+    def fetch_teams(self, league: str) -> List[Dict]:
+        return self.get_json("lookup_all_teams.php", id=league_id(league)).get("teams") or []
+
+    def fetch_team_players(self, team: Dict, league: str) -> List[Dict]:
+        """Players on one team's roster, mapped and filtered like the HTML crawler's"""
+        roster = self.get_json("lookup_all_players.php", id=team["idTeam"]).get("player") or []
+        self.progress.add_total(len(roster))
+        players = []
+        for record in roster:
+            try:
+                if not record.get("strDescriptionEN"):
+                    details = self.get_json("lookupplayer.php", id=record["idPlayer"]).get("players")
+                    if details:
+                        record = {**record, **{k: v for k, v in details[0].items() if v}}
+                with self.progress.stage("parse"):
+                    player = map_player(record, self.site_url)
+                    player["team"] = player["team"] or team.get("strTeam") or ""
+                    player["league"] = league
+                if self.honours:
+                    honours = self.get_json("lookuphonours.php", id=record["idPlayer"]).get("honours")
+                    player["honors"] = map_honours(honours)
+                self.progress.missing_fields(player, TRACKED_FIELDS)
+
+                if not player["name"] or player["description"] == PLACEHOLDER_DESCRIPTION:
+                    self.progress.item("skipped")
+                    continue
+                players.append(player)
+                self.progress.item("saved")
+            except Exception as e:
+                print(f"Error mapping player {record.get('idPlayer')} of {team.get('strTeam')}: {str(e)}")
+                traceback.print_exc()
+                self.progress.item("failed")
+        return players
+
+    def ingest(self, league: str = "NFL") -> List[Dict]:
+        """All players of one league, rosters fetched `concurrency` teams at a time"""
+        teams = self.fetch_teams(league)
+        print(f"Found {len(teams)} {league} teams")
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            rosters = pool.map(lambda team: self.fetch_team_players(team, league), teams)
+            return [player for roster in rosters for player in roster]
+
+    def run(self, leagues: List[str], output: str = "app/data/players.json") -> int:
+        """Ingest `leagues` and upsert the players into `output` by URL"""
+        start = datetime.now()
+        store = PlayerStore(output, key="url")
+        self.progress.start()
+        try:
+            for league in leagues:
+                players = self.ingest(league)
+                for player in players:
+                    store.upsert(player)
+                print(f"{league}: {len(players)} players")
+            with self.progress.stage("save"):
+                store.commit()
+        finally:
+            self.progress.stop()
+
+        print(f"Wrote {len(store)} players to {output}")
+        print(f"Total duration: {datetime.now() - start}")
+        print(f"Fetch stats: {self.http.metrics.summary()}")
+        return self.progress.results["saved"]
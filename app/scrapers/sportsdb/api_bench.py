@@ -0,0 +1,300 @@
+# api_bench.py
+import argparse
+import gzip
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from app.scrapers.http_client import FetchClient
+from app.scrapers.sportsdb.api import RateLimiter, SportsDBApiIngest, league_id, player_slug
+from app.scrapers.sportsdb.crawler import LEAGUES, SportsDBCrawler, replay_parse
+from app.storage.players import PLAYERS_FILE, iter_players
+
+# Schema fields both paths read from the source; "league" comes from the crawl, not the page,
+# and honours need --honours
+COMPARED_FIELDS = (
+    "url", "name", "number", "position", "birth_year", "birth_place",
+    "height", "weight", "team", "status", "nationality", "description",
+)
+
+# (HTML label, players.json field, API field) in the order a player page shows them
+_FIELDS = (
+    ("Team", "team", "strTeam"),
+    ("Team Number", "number", "strNumber"),
+    ("Position", "position", "strPosition"),
+    ("Born", "birth_year", "dateBorn"),
+    ("Birth Place", "birth_place", "strBirthLocation"),
+    ("Status", "status", "strStatus"),
+    ("Ethnicity", "nationality", "strEthnicity"),
+    ("Height", "height", "strHeight"),
+    ("Weight", "weight", "strWeight"),
+)
+
+
+class Fixture:
+    """
+    One league built from players.json, served both as TheSportsDB's HTML
+    pages (in the markup the crawler's parser reads) and as its v1 JSON
+    endpoints, so the two ingest paths fetch the same data.
+    """
+
+    def __init__(self, players: List[Dict], league: str = "NFL", per_team: int = 53, chrome: int = 0):
+        self.league = league
+        self.league_id = league_id(league)
+        self.chrome = "<!-- " + "x" * chrome + " -->" if chrome else ""
+        self.teams: Dict[str, Dict] = {}
+        self.players: Dict[str, Dict] = {}
+        for i in range(0, len(players), per_team):
+            team_id = str(900000 + i // per_team)
+            team_name = f"Team {i // per_team + 1}"
+            roster = []
+            for player in players[i:i + per_team]:
+                match = re.search(r"/player/(\d+)-", player.get("url", ""))
+                if not match or not player.get("name") or match.group(1) in self.players:
+                    continue
+                record = {**player, "id": match.group(1), "team": team_name}
+                self.players[record["id"]] = record
+                roster.append(record)
+            self.teams[team_id] = {"name": team_name, "players": roster}
+
+    def api_player(self, player: Dict) -> Dict:
+        record = {"idPlayer": player["id"], "strPlayer": player["name"], "strDescriptionEN": player["description"] or None}
+        for _, field, api_field in _FIELDS:
+            record[api_field] = player[field] or None
+        if player["birth_year"]:
+            record["dateBorn"] = f"{player['birth_year']}-01-01"
+        return record
+
+    def page(self, body: str) -> str:
+        return f"<html><head><title>TheSportsDB</title></head><body>{self.chrome}{body}</body></html>"
+
+    def league_html(self) -> str:
+        links = "".join(
+            f'<a href="/team/{team_id}-{player_slug(team["name"])}">{escape(team["name"])}</a><br>'
+            for team_id, team in self.teams.items()
+        )
+        return self.page(f"<div>{links}</div>")
+
+    def team_html(self, team: Dict) -> str:
+        rows = "".join(
+            f'<tr><td><a href="/player/{p["id"]}-{player_slug(p["name"])}">{escape(p["name"])}</a></td>'
+            f'<td>{escape(p["position"])}</td></tr>'
+            for p in team["players"]
+        )
+        return self.page(f'<div class="col-sm-9"><table>{rows}</table></div>')
+
+    def player_html(self, player: Dict) -> str:
+        parts = [f'<b>Name</b><br><font><a href="#">{escape(player["name"])}</a></font><br>']
+        for label, field, _ in _FIELDS:
+            value = player[field]
+            if field == "birth_year" and value:
+                value = f"{value}-01-01"
+            if value:
+                parts.append(f"<b>{label}</b><br>{escape(str(value))}<br>")
+        if player["description"]:
+            parts.append(f'<b>Description</b><br><p>{escape(player["description"])}</p>')
+        return self.page("".join(parts))
+
+    def respond(self, path: str) -> Optional[tuple]:
+        """(content type, body) for a request path, or None for a 404"""
+        url = urlsplit(path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        match = re.match(r"/api/v1/json/[^/]+/(\w+)\.php$", url.path)
+        if match:
+            endpoint, item = match.group(1), query.get("id", "")
+            if endpoint == "lookup_all_teams":
+                teams = [
+                    {"idTeam": team_id, "strTeam": team["name"], "strLeague": self.league}
+                    for team_id, team in self.teams.items()
+                ] if item == self.league_id else None
+                data = {"teams": teams}
+            elif endpoint == "lookup_all_players":
+                team = self.teams.get(item)
+                data = {"player": [self.api_player(p) for p in team["players"]] if team else None}
+            elif endpoint == "lookupplayer":
+                player = self.players.get(item)
+                data = {"players": [self.api_player(player)] if player else None}
+            elif endpoint == "lookuphonours":
+                data = {"honours": None}
+            else:
+                return None
+            return "application/json", json.dumps(data)
+
+        match = re.match(r"/(league|team|player)/(\d+)-", url.path)
+        if not match:
+            return None
+        kind, item = match.groups()
+        if kind == "league" and item == self.league_id:
+            return "text/html; charset=utf-8", self.league_html()
+        if kind == "team" and item in self.teams:
+            return "text/html; charset=utf-8", self.team_html(self.teams[item])
+        if kind == "player" and item in self.players:
+            return "text/html; charset=utf-8", self.player_html(self.players[item])
+        return None
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    fixture: Fixture = None
+    latency = 0.02
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        found = self.fixture.respond(self.path)
+        if found is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        content_type, body = found
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        # Compress like the real site does, so wire bytes are comparable
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve_fixture(fixture: Fixture, port: int = 8091, latency: float = 0.02) -> ThreadingHTTPServer:
+    """Start the fixture site in the background (for benchmarks only)"""
+    _FixtureHandler.fixture = fixture
+    _FixtureHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", port), _FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def html_ingest(site_url: str, league: str, http: FetchClient, concurrency: int, rate: float) -> List[Dict]:
+    """The HTML crawler's league -> team -> player walk and parsing, with the API path's concurrency"""
+    limiter = RateLimiter(rate)
+
+    def fetch(url):
+        limiter.wait()
+        return http.fetch_text(url)
+
+    league_html = fetch(site_url + LEAGUES.get(league, league))
+    teams = SportsDBCrawler.extract_team_links(league_html, base_url=site_url)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        rosters = pool.map(lambda team: SportsDBCrawler.extract_player_links(fetch(team), base_url=site_url), teams)
+        urls = sorted({url for roster in rosters for url in roster})
+        players = pool.map(lambda url: replay_parse(fetch(url), url), urls)
+        return [player for player in players if player]
+
+
+def compare(
+    players: List[Dict],
+    league: str = "NFL",
+    per_team: int = 53,
+    chrome: int = 0,
+    concurrency: int = 4,
+    rate: float = 0.0,
+    latency: float = 0.02,
+    honours: bool = False,
+    port: int = 8091,
+) -> Dict:
+    """Ingest the same fixture league through both paths; bytes, requests, wall time and field agreement"""
+    fixture = Fixture(players, league, per_team, chrome)
+    server = serve_fixture(fixture, port, latency)
+    site_url = f"http://127.0.0.1:{server.server_address[1]}"  # port 0 picks a free one
+    report = {"league": league, "teams": len(fixture.teams), "players": len(fixture.players)}
+    results = {}
+    try:
+        for path in ("html", "api"):
+            http = FetchClient(max_per_host=concurrency, pool_size=max(concurrency, 16))
+            start = time.perf_counter()
+            if path == "html":
+                results[path] = html_ingest(site_url, league, http, concurrency, rate)
+            else:
+                ingest = SportsDBApiIngest(
+                    api_url=f"{site_url}/api/v1/json",
+                    site_url=site_url,
+                    concurrency=concurrency,
+                    rate=rate,
+                    honours=honours,
+                    http=http,
+                )
+                results[path] = ingest.ingest(league)
+            elapsed = time.perf_counter() - start
+            snap = http.metrics.snapshot()
+            report[path] = {
+                "players": len(results[path]),
+                "requests": snap["requests"],
+                "errors": snap["errors"],
+                "bytes_wire": snap["bytes_wire"],
+                "bytes_decoded": snap["bytes_decoded"],
+                "wall_s": round(elapsed, 3),
+            }
+            http.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    html, api = report["html"], report["api"]
+    report["ratio"] = {
+        "bytes_wire": round(html["bytes_wire"] / max(api["bytes_wire"], 1), 1),
+        "requests": round(html["requests"] / max(api["requests"], 1), 1),
+        "wall_s": round(html["wall_s"] / max(api["wall_s"], 1e-9), 1),
+    }
+
+    # Both paths should produce the same records for the same players
+    by_url = {player["url"]: player for player in results["html"]}
+    mismatches = {}
+    matched = 0
+    for player in results["api"]:
+        other = by_url.get(player["url"])
+        if other is None:
+            continue
+        matched += 1
+        for field in COMPARED_FIELDS:
+            # The HTML parser joins a description's paragraphs with spaces; the API keeps the breaks
+            if field == "description":
+                same = player[field].split() == other[field].split()
+            else:
+                same = player[field] == other[field]
+            if not same:
+                mismatches[field] = mismatches.get(field, 0) + 1
+    report["agreement"] = {"matched": matched, "field_mismatches": mismatches}
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare HTML scraping with JSON API ingestion against a local fixture site"
+    )
+    parser.add_argument("--players", default=PLAYERS_FILE, help="Players the fixture league is built from")
+    parser.add_argument("--league", default="NFL")
+    parser.add_argument("--per-team", type=int, default=53)
+    parser.add_argument(
+        "--chrome", type=int, default=0, help="Bytes of navigation/footer markup added to every HTML page"
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0.0, help="Max requests per second (0: unlimited)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fixture server seconds per request")
+    parser.add_argument("--honours", action="store_true")
+    parser.add_argument("--port", type=int, default=8091)
+    args = parser.parse_args()
+
+    report = compare(
+        list(iter_players(args.players)),
+        league=args.league,
+        per_team=args.per_team,
+        chrome=args.chrome,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        latency=args.latency,
+        honours=args.honours,
+        port=args.port,
+    )
+    print(json.dumps(report, indent=2))
@@ -1,48 +1,69 @@
 from bs4 import BeautifulSoup
 from time import sleep
-from typing import Set, Dict, List
-import json
+from typing import Set, Dict, List, Optional
+from itertools import chain
 import os
-import requests
 from datetime import datetime
 from urllib.parse import urljoin
 import re
 import traceback
 
+from app.scrapers.crawl_metrics import CrawlProgress
+from app.scrapers.http_client import get_client
+from app.scrapers.sportsdb.refresh import RefreshState, apply_pending_deltas, content_hash, write_delta
+from app.storage.durable import DurableWriter
+from app.storage.players import iter_players
+
+BASE_URL = "https://www.thesportsdb.com"
+
+# Fields counted in sports_crawl_missing_fields_total when a page yields nothing for them
+TRACKED_FIELDS = ("name", "position", "team", "birth_year", "height", "weight", "description")
+
+# League pages on TheSportsDB; any other league can be passed as NAME=/league/<id>-<slug>
+LEAGUES = {
+    "NFL": "/league/4391-NFL",
+    "NBA": "/league/4387-NBA",
+    "MLB": "/league/4424-MLB",
+    "NHL": "/league/4380-NHL",
+}
+
 
 class SportsDBCrawler:
     def __init__(self):
-        self.base_url = "https://www.thesportsdb.com"
+        self.base_url = BASE_URL
         self.processed_urls = set()
         self.teams_data = {}
         self.players_data = []
         self.save_frequency = 10  # Save after every 10 players
         self.backup_frequency = 50  # Create backup every 50 players
         self.player_count = 0
+        self.http = get_client()
+        self.progress = CrawlProgress("sportsdb", self.http)
 
         # Create necessary directories
         os.makedirs("app/data/backups", exist_ok=True)
         os.makedirs("app/data", exist_ok=True)
 
-        # Initialize players.json if it doesn't exist
-        players_file = "app/data/players.json"
-        if not os.path.exists(players_file):
-            with open(players_file, "w", encoding="utf-8") as f:
-                json.dump({"players": []}, f, indent=2, ensure_ascii=False)
+        # Crash-safe writer for players.json with hard-linked backup generations
+        self.players_writer = DurableWriter(
+            "app/data/players.json", backup_dir="app/data/backups", keep=5
+        )
+        # Copies from before backup generations (players_backup_<count>.json)
+        self.players_writer.adopt_legacy_backups("players")
+
+        # Initialize players.json if it doesn't exist, or recover it if a crash left it corrupt
+        if not os.path.exists(self.players_writer.path):
+            self.players_writer.write_players([])
             print("Created new players.json file")
+        else:
+            self.players_writer.restore()
 
         # Load existing players at initialization
         self.load_existing_players()
 
     def fetch_page(self, url: str) -> str:
         """Fetch the content of a web page"""
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            print(f"Error fetching {url}: {str(e)}")
-            return ""
+        return self.http.fetch_text(url)
 
     def extract_team_data(self, html: str, team_url: str) -> Dict:
         """Extract team information from team page"""
@@ -76,8 +97,12 @@ class SportsDBCrawler:
 
         return team_data
 
-    def extract_player_data(self, html: str, player_url: str):
-        """Extract player data from the HTML content of a player page"""
+    @staticmethod
+    def parse_player_data(html: str, player_url: str) -> Dict:
+        """
+        Parse player fields from the HTML of a player page (no side effects).
+        Fields that are not on the page stay empty; callers count them.
+        """
         player_data = {
             "url": player_url,
             "name": "",
@@ -94,154 +119,125 @@ class SportsDBCrawler:
             "honors": [],
         }
 
-        try:
-            soup = BeautifulSoup(html, "html.parser")
-
-            # 1. Extract Player Name
-            name_tag = soup.find("b", text=re.compile(r"^Name$", re.I))
-            if name_tag:
-                # Navigate to the <font> tag containing the <a> tag with the name
-                # Handle possible malformed <a> tags
-                font_tag = name_tag.find_next_sibling("br")
-                if font_tag:
-                    font_tag = font_tag.find_next_sibling("font")
-                if font_tag:
-                    # Extract text directly from the font tag
-                    # Handle cases where <a> tag is self-closed improperly
-                    name_text = font_tag.get_text(separator=" ", strip=True)
-                    name_text = re.sub(r"^/[^/]+-/", "", name_text).strip()
-                    player_data["name"] = name_text
-                    print(f"Extracted player name: {player_data['name']}")
-                else:
-                    print(
-                        f"Warning: <font> tag not found after <b>Name</b> for {player_url}"
-                    )
-            else:
-                print(f"Warning: <b>Name</b> tag not found for {player_url}")
-
-            # 2. Extract Other Fields
-            fields = {
-                "Born": "birth_year",
-                "Birth Place": "birth_place",
-                "Position": "position",
-                "Status": "status",
-                "Ethnicity": "nationality",
-                "Team Number": "number",
-                "Height": "height",
-                "Weight": "weight",
-                "Team": "team",
-            }
-
-            for field_label, field_key in fields.items():
-                field_tag = soup.find("b", text=re.compile(rf"^{field_label}$", re.I))
-                if field_tag:
-                    field_value_tag = field_tag.find_next_sibling("br")
-                    if field_value_tag:
-                        # Extract the text following the <br> tag
-                        next_element = field_value_tag.next_sibling
-                        # Handle cases where next_element is NavigableString or a Tag
-                        if next_element:
-                            if isinstance(next_element, str):
-                                value = next_element.strip()
-                            else:
-                                value = next_element.get_text(separator=" ", strip=True)
-                            if field_key == "birth_year":
-                                # Extract year using regex
-                                year_match = re.search(r"\d{4}", value)
-                                if year_match:
-                                    player_data[field_key] = int(year_match.group())
-                                    print(
-                                        f"Extracted {field_label}: {player_data[field_key]}"
-                                    )
-                            else:
-                                player_data[field_key] = value
-                                print(
-                                    f"Extracted {field_label}: {player_data[field_key]}"
-                                )
+        soup = BeautifulSoup(html, "html.parser")
+
+        # 1. Extract Player Name
+        name_tag = soup.find("b", text=re.compile(r"^Name$", re.I))
+        if name_tag:
+            # Navigate to the <font> tag containing the <a> tag with the name
+            # Handle possible malformed <a> tags
+            font_tag = name_tag.find_next_sibling("br")
+            if font_tag:
+                font_tag = font_tag.find_next_sibling("font")
+            if font_tag:
+                # Extract text directly from the font tag
+                # Handle cases where <a> tag is self-closed improperly
+                name_text = font_tag.get_text(separator=" ", strip=True)
+                name_text = re.sub(r"^/[^/]+-/", "", name_text).strip()
+                player_data["name"] = name_text
+
+        # 2. Extract Other Fields
+        fields = {
+            "Born": "birth_year",
+            "Birth Place": "birth_place",
+            "Position": "position",
+            "Status": "status",
+            "Ethnicity": "nationality",
+            "Team Number": "number",
+            "Height": "height",
+            "Weight": "weight",
+            "Team": "team",
+        }
+
+        for field_label, field_key in fields.items():
+            field_tag = soup.find("b", text=re.compile(rf"^{field_label}$", re.I))
+            if field_tag:
+                field_value_tag = field_tag.find_next_sibling("br")
+                if field_value_tag:
+                    # Extract the text following the <br> tag
+                    next_element = field_value_tag.next_sibling
+                    # Handle cases where next_element is NavigableString or a Tag
+                    if next_element:
+                        if isinstance(next_element, str):
+                            value = next_element.strip()
                         else:
-                            print(
-                                f"Warning: No value found for {field_label} in {player_url}"
-                            )
-                    else:
-                        print(
-                            f"Warning: <br> tag not found after <b>{field_label}</b> for {player_url}"
+                            value = next_element.get_text(separator=" ", strip=True)
+                        if field_key == "birth_year":
+                            # Extract year using regex
+                            year_match = re.search(r"\d{4}", value)
+                            if year_match:
+                                player_data[field_key] = int(year_match.group())
+                        else:
+                            player_data[field_key] = value
+
+        # 3. Extract Description
+        description_tag = soup.find("b", text=re.compile(r"^Description$", re.I))
+        if description_tag:
+            # The description seems to be within the next <p> tag after some <br> and <a> tags
+            # Navigate to the <p> tag
+            # Start by finding the next sibling after <b>Description</b>
+            next_sibling = description_tag.find_next_sibling()
+            while next_sibling and next_sibling.name != "p":
+                next_sibling = next_sibling.find_next_sibling()
+            if next_sibling and next_sibling.name == "p":
+                description_text = next_sibling.get_text(separator=" ", strip=True)
+                player_data["description"] = description_text
+
+        # 4. Extract Honors
+        honors_tag = soup.find("b", text=re.compile(r"^Career Honours$", re.I))
+        if honors_tag:
+            honors_table = honors_tag.find_next("table")
+            if honors_table:
+                honor_rows = honors_table.find_all("tr")
+                for row in honor_rows:
+                    honor_cells = row.find_all("td")
+                    if len(honor_cells) >= 2:
+                        honor_name = honor_cells[0].get_text(strip=True)
+                        honor_year = honor_cells[1].get_text(strip=True)
+                        player_data["honors"].append(
+                            {"honor": honor_name, "year": honor_year}
                         )
-                else:
-                    print(
-                        f"Warning: <b>{field_label}</b> tag not found for {player_url}"
-                    )
 
-            # 3. Extract Description
-            description_tag = soup.find("b", text=re.compile(r"^Description$", re.I))
-            if description_tag:
-                # The description seems to be within the next <p> tag after some <br> and <a> tags
-                # Navigate to the <p> tag
-                # Start by finding the next sibling after <b>Description</b>
-                next_sibling = description_tag.find_next_sibling()
-                while next_sibling and next_sibling.name != "p":
-                    next_sibling = next_sibling.find_next_sibling()
-                if next_sibling and next_sibling.name == "p":
-                    description_text = next_sibling.get_text(separator=" ", strip=True)
-                    player_data["description"] = description_text
-                    print(f"Extracted description for {player_data['name']}")
-                else:
-                    print(
-                        f"Warning: <p> tag with description not found for {player_url}"
-                    )
-            else:
-                print(f"Warning: <b>Description</b> tag not found for {player_url}")
-
-            # 4. Extract Honors
-            honors_tag = soup.find("b", text=re.compile(r"^Career Honours$", re.I))
-            if honors_tag:
-                honors_table = honors_tag.find_next("table")
-                if honors_table:
-                    honor_rows = honors_table.find_all("tr")
-                    for row in honor_rows:
-                        honor_cells = row.find_all("td")
-                        if len(honor_cells) >= 2:
-                            honor_name = honor_cells[0].get_text(strip=True)
-                            honor_year = honor_cells[1].get_text(strip=True)
-                            player_data["honors"].append(
-                                {"honor": honor_name, "year": honor_year}
-                            )
-                            print(
-                                f"Added honor: {honor_name} ({honor_year}) for {player_data['name']}"
-                            )
-                else:
-                    print(f"Warning: Honors table not found for {player_url}")
+        return player_data
+
+    def extract_player_data(self, html: str, player_url: str, league: Optional[str] = None):
+        """Extract player data from the HTML content of a player page"""
+        player_data = None
+        try:
+            with self.progress.stage("parse"):
+                player_data = self.parse_player_data(html, player_url)
+            if league:
+                # The page does not name the league; the index routes shards on it
+                player_data["league"] = league
+            self.progress.missing_fields(player_data, TRACKED_FIELDS)
 
             # 5. Skip Players with Placeholder Description
             if player_data["description"] == "--- add one?":
-                print(
-                    f"Skipping player '{player_data.get('name', 'Unknown')}' due to placeholder description."
-                )
+                self.progress.item("skipped")
                 return  # Skip adding to players_data
 
             # 6. Append Player Data if Name Exists
             if player_data["name"]:
                 self.players_data.append(player_data)
                 self.player_count += 1
-                print(
-                    f"Added player {player_data['name']} to memory. Total players in memory: {len(self.players_data)}"
-                )
+                self.progress.item("saved")
 
                 # Regular save
                 if self.player_count % self.save_frequency == 0:
-                    print(f"Triggering save at player count: {self.player_count}")
                     self.save_players()
 
                 # Backup save
                 if self.player_count % self.backup_frequency == 0:
-                    print(f"Triggering backup at player count: {self.player_count}")
                     self.save_players(is_backup=True)
             else:
                 print(
                     f"Warning: Player name not extracted for {player_url}. Skipping entry."
                 )
+                self.progress.item("skipped")
 
         except Exception as e:
             print(f"Error extracting player data from {player_url}: {str(e)}")
+            self.progress.item("failed")
             traceback.print_exc()
             # Try to save what we have if there's an error
             if self.players_data:
@@ -251,17 +247,22 @@ class SportsDBCrawler:
 
     def crawl_nfl_teams(self):
         """Crawl NFL teams and their players"""
+        self.crawl_league("NFL")
+
+    def crawl_league(self, league: str = "NFL"):
+        """Crawl one league's teams and their players in this process"""
+        self.progress.start()
         try:
-            print("Starting NFL teams crawl...")
-            # Fetch the NFL teams URL
-            nfl_teams_url = urljoin(self.base_url, "/league/4391-NFL")
-            nfl_html = self.fetch_page(nfl_teams_url)
-            if not nfl_html:
-                print(f"Failed to fetch NFL teams page: {nfl_teams_url}")
+            print(f"Starting {league} teams crawl...")
+            # Fetch the league's teams page
+            league_url = urljoin(self.base_url, LEAGUES.get(league, league))
+            league_html = self.fetch_page(league_url)
+            if not league_html:
+                print(f"Failed to fetch {league} teams page: {league_url}")
                 return
 
             # Extract team URLs
-            team_links = self.extract_team_links(nfl_html)
+            team_links = self.extract_team_links(league_html)
             print(f"Found {len(team_links)} teams to process.")
 
             start_time = datetime.now()
@@ -277,22 +278,20 @@ class SportsDBCrawler:
                     continue
 
                 # Extract players from the team page
-                player_urls = self.extract_player_links(team_html)
-                print(f"Extracted {len(player_urls)} player URLs from {team_url}")
+                player_urls = [
+                    url for url in self.extract_player_links(team_html) if url not in self.processed_urls
+                ]
+                self.progress.add_total(len(player_urls))
+                print(f"Queued {len(player_urls)} new player URLs from {team_url}")
 
                 for player_url in player_urls:
-                    if player_url in self.processed_urls:
-                        print(f"Skipping already processed player: {player_url}")
-                        continue
-
-                    print(f"Processing player: {player_url}")
                     player_html = self.fetch_page(player_url)
                     if not player_html:
-                        print(f"Failed to fetch player page: {player_url}")
+                        self.progress.item("failed")
                         continue
 
                     # Extract and store player data
-                    self.extract_player_data(player_html, player_url)
+                    self.extract_player_data(player_html, player_url, league)
                     self.processed_urls.add(player_url)
                     sleep(1)  # Be polite to the server
 
@@ -308,7 +307,8 @@ class SportsDBCrawler:
             duration = end_time - start_time
             print(f"Crawl completed at {end_time}")
             print(f"Total duration: {duration}")
-            print(f"Total players collected: {len(self.players_data)}")
+            print(f"Total players collected: {self.progress.results['saved']}")
+            print(f"Fetch stats: {self.http.metrics.summary()}")
 
         except KeyboardInterrupt:
             print("Crawl interrupted by user. Saving any remaining players...")
@@ -321,101 +321,71 @@ class SportsDBCrawler:
                 print("Saving collected data before exit...")
                 self.save_players()
             traceback.print_exc()
+        finally:
+            self.progress.stop()
 
     def save_data(self):
         """Save the crawled data to JSON files"""
         try:
             # Save teams data
-            with open("app/data/teams.json", "w", encoding="utf-8") as f:
-                json.dump(
-                    {"teams": list(self.teams_data.values())},
-                    f,
-                    indent=2,
-                    ensure_ascii=False,
-                )
+            DurableWriter("app/data/teams.json").write_json(
+                {"teams": list(self.teams_data.values())}
+            )
 
-            # Save players data
-            with open("app/data/players.json", "w", encoding="utf-8") as f:
-                json.dump(
-                    {"players": self.players_data}, f, indent=2, ensure_ascii=False
-                )
+            print(f"Saved {len(self.teams_data)} teams")
 
-            print(
-                f"Saved {len(self.teams_data)} teams and {len(self.players_data)} players"
-            )
+            # Append the batch to players.json rather than replacing the file with it
+            self.save_players()
         except Exception as e:
             print(f"Error saving data: {e}")
 
     def save_players(self, is_backup: bool = False):
         """Save players data to JSON file"""
-        players_file = "app/data/players.json"
-        backup_dir = "app/data/backups"
-        backup_file = os.path.join(
-            backup_dir, f"players_backup_{self.player_count}.json"
-        )
+        players_file = self.players_writer.path
 
         try:
-            if is_backup:
-                # Create a backup copy
-                with open(players_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                with open(backup_file, "w", encoding="utf-8") as bf:
-                    json.dump(data, bf, indent=2, ensure_ascii=False)
-                print(f"Backup saved at {backup_file}")
-            else:
-                # Load existing data
-                if os.path.exists(players_file):
-                    with open(players_file, "r", encoding="utf-8") as f:
-                        data = json.load(f)
+            with self.progress.stage("save"):
+                if is_backup:
+                    # Hard-link the current file as a new backup generation
+                    self.players_writer.snapshot()
                 else:
-                    data = {"players": []}
-                    print("Created new players.json file")
-
-                # Append new players
-                data["players"].extend(self.players_data)
-                total_players = len(data["players"])
-                with open(players_file, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                print(
-                    f"Successfully saved {len(self.players_data)} players to {players_file} (Total players: {total_players})"
-                )
+                    # Stream existing players followed by the new ones into a temp file
+                    total_players = 0
 
-                # Clear the in-memory players_data
-                self.players_data = []
-        except Exception as e:
-            print(f"Error saving players to {players_file}: {str(e)}")
-            traceback.print_exc()
+                    def all_players():
+                        nonlocal total_players
+                        for player in chain(iter_players(players_file), self.players_data):
+                            total_players += 1
+                            yield player
 
-    def cleanup_old_backups(self, keep_last_n=5):
-        """Clean up old backup files, keeping only the n most recent ones"""
-        try:
-            backup_dir = "app/data/backups"
-            backup_files = sorted(
-                [f for f in os.listdir(backup_dir) if f.startswith("players_")],
-                reverse=True,
-            )
+                    self.players_writer.write_players(all_players())
+                    print(
+                        f"Successfully saved {len(self.players_data)} players to {players_file} (Total players: {total_players})"
+                    )
 
-            # Remove old backup files
-            for old_file in backup_files[keep_last_n:]:
-                os.remove(os.path.join(backup_dir, old_file))
+                    # Clear the in-memory players_data
+                    self.players_data = []
         except Exception as e:
-            print(f"Error cleaning up backups: {e}")
+            print(f"Error saving players to {players_file}: {str(e)}")
+            traceback.print_exc()
 
     def load_existing_players(self):
-        """Load existing players data from JSON file"""
+        """Stream existing player URLs from JSON file so they are not re-crawled"""
         try:
             players_file = "app/data/players.json"
-            with open(players_file, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
-            self.players_data = existing_data.get("players", [])
-            self.player_count = len(self.players_data)
+            self.player_count = 0
+            for player in iter_players(players_file, fields=("url",)):
+                if player.get("url"):
+                    self.processed_urls.add(player["url"])
+                self.player_count += 1
             print(f"Loaded {self.player_count} existing players")
         except Exception as e:
             print(f"Error loading existing players: {str(e)}")
             traceback.print_exc()
 
-    def extract_team_links(self, html: str) -> List[str]:
-        """Extract team URLs from the NFL teams page"""
+    @staticmethod
+    def extract_team_links(html: str, base_url: str = BASE_URL) -> List[str]:
+        """Extract team URLs from a league's teams page"""
         soup = BeautifulSoup(html, "html.parser")
         team_links = []
         # Adjust the selector based on the actual HTML structure
@@ -423,11 +393,12 @@ class SportsDBCrawler:
         for a_tag in soup.find_all("a", href=re.compile(r"^/team/\d+-")):
             href = a_tag.get("href")
             if href:
-                full_url = urljoin(self.base_url, href)
+                full_url = urljoin(base_url, href)
                 team_links.append(full_url)
         return list(set(team_links))  # Remove duplicates
 
-    def extract_player_links(self, html: str) -> List[str]:
+    @staticmethod
+    def extract_player_links(html: str, base_url: str = BASE_URL) -> List[str]:
         """Extract player URLs from a team page"""
         soup = BeautifulSoup(html, "html.parser")
         player_links = []
@@ -436,17 +407,118 @@ class SportsDBCrawler:
         for a_tag in soup.find_all("a", href=re.compile(r"^/player/\d+-")):
             href = a_tag.get("href")
             if href:
-                full_url = urljoin(self.base_url, href)
+                full_url = urljoin(base_url, href)
                 player_links.append(full_url)
         return list(set(player_links))  # Remove duplicates
 
-    def run(self):
+    def refresh(self, league: str = "NFL") -> List[str]:
+        """
+        Incremental crawl: diff team rosters against the last run and only
+        re-parse player pages that are new or whose content hash changed.
+
+        Each team's changes are written as a delta file and applied to
+        players.json before that team's new hashes are committed, so a crash
+        can only lose work that the next refresh redoes, never changes it
+        would consider already seen. The API's index refresher then embeds
+        only the changed players. Returns the delta files written.
+        """
+        state = RefreshState()
+        start_time = datetime.now()
+        league_html = self.fetch_page(urljoin(self.base_url, LEAGUES.get(league, league)))
+        if not league_html:
+            print(f"Failed to fetch {league} teams page, nothing refreshed")
+            return []
+
+        delta_files = []
+        previous_players, current_players = set(), set()
+        stats = {"teams": 0, "new": 0, "changed": 0, "unchanged": 0, "failed": 0}
+        self.progress.start()
+
+        def save(upserts, removed, delta_stats, always=False):
+            """Delta and players.json first; only then may the state remember these pages"""
+            if upserts or removed or always:
+                with self.progress.stage("save"):
+                    delta_files.append(write_delta(upserts, removed, delta_stats))
+                    apply_pending_deltas(self.players_writer)
+            state.commit()
+
+        try:
+            for team_url in self.extract_team_links(league_html):
+                previous = state.roster(team_url)
+                previous_players |= previous
+                team_html = self.fetch_page(team_url)
+                if not team_html:
+                    # Keep the old roster so an outage is not mistaken for removals
+                    current_players |= previous
+                    continue
+
+                roster = set(self.extract_player_links(team_html))
+                current_players |= roster
+                stats["teams"] += 1
+                self.progress.add_total(len(roster))
+                print(
+                    f"{team_url}: {len(roster - previous)} added, {len(previous - roster)} removed"
+                )
+
+                upserts = []
+                for player_url in sorted(roster):
+                    player_html = self.fetch_page(player_url)
+                    sleep(1)  # Be polite to the server
+                    if not player_html:
+                        stats["failed"] += 1
+                        self.progress.item("failed")
+                        continue
+
+                    digest = content_hash(player_html)
+                    known = state.content_hash(player_url)
+                    if known == digest:
+                        state.seen(player_url, digest, changed=False)
+                        stats["unchanged"] += 1
+                        self.progress.item("unchanged")
+                        continue
+
+                    with self.progress.stage("parse"):
+                        player_data = self.parse_player_data(player_html, player_url)
+                    player_data["league"] = league
+                    self.progress.missing_fields(player_data, TRACKED_FIELDS)
+                    if player_data["name"] and player_data["description"] != "--- add one?":
+                        upserts.append(player_data)
+                        stats["changed" if known else "new"] += 1
+                        self.progress.item("saved")
+                    else:
+                        self.progress.item("skipped")
+                    state.seen(player_url, digest, changed=True)
+
+                state.set_roster(team_url, roster)
+                save(upserts, set(), {"team": team_url, "upserts": len(upserts)})
+
+            removed = previous_players - current_players
+            state.forget(removed)
+            stats["removed"] = len(removed)
+            stats["duration_s"] = (datetime.now() - start_time).total_seconds()
+            save([], removed, stats, always=True)
+        finally:
+            state.close()
+            self.progress.stop()
+
+        print(f"Refresh complete: {stats}")
+        print(f"Applied {len(delta_files)} delta files to {self.players_writer.path}")
+        return delta_files
+
+    def run(self, league: str = "NFL"):
         """Run the crawler"""
-        print("Starting NFL teams crawl...")
-        self.crawl_nfl_teams()
+        self.crawl_league(league)
         print("Crawl finished.")
 
 
+def replay_parse(html: str, url: str) -> Optional[Dict]:
+    """Worker entry point for --replay: parse one cached player page"""
+    player_data = SportsDBCrawler.parse_player_data(html, url)
+    if not player_data["name"] or player_data["description"] == "--- add one?":
+        return None
+    return player_data
+
+
 if __name__ == "__main__":
     crawler = SportsDBCrawler()
     crawler.run()
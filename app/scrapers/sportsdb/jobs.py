@@ -0,0 +1,369 @@
+# jobs.py
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+import traceback
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from app.scrapers.http_client import get_client
+from app.scrapers.sportsdb.crawler import BASE_URL, LEAGUES, SportsDBCrawler
+from app.scrapers.sportsdb.refresh import content_hash
+from app.storage.player_store import PlayerStore
+
+QUEUE_FILE = "app/data/crawl_jobs.sqlite3"
+
+# Discovery tasks are leased first so the queue fills up quickly
+KIND_PRIORITY = {"league": 0, "team": 1, "player": 2}
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Crawl tasks (league -> teams -> players) shared by any number of workers.
+
+    SQLite in WAL mode stands in for a shared queue service. Tasks are keyed
+    by URL so re-discovering a page is a no-op; workers lease tasks for a
+    fixed time and a lease that expires (crashed worker) is handed out again
+    until the task has used up `max_attempts`.
+    Player results are upserted by URL, so re-running a task is idempotent.
+    The same database holds the per-host schedule for the global rate limit.
+    """
+
+    def __init__(self, path: str = QUEUE_FILE, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                league TEXT NOT NULL,
+                parent TEXT,
+                priority INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (state, priority, lease_expires);
+            CREATE TABLE IF NOT EXISTS players (
+                url TEXT PRIMARY KEY,
+                league TEXT NOT NULL,
+                team_url TEXT,
+                data TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS host_schedule (
+                host TEXT PRIMARY KEY,
+                next_at REAL NOT NULL
+            );
+            """
+        )
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so two workers can't lease the same task
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def enqueue(self, tasks: Iterable[Tuple[str, str, str, Optional[str]]]) -> int:
+        """Add (kind, url, league, parent) tasks; URLs already queued are ignored"""
+        now = time.time()
+        rows = [(url, kind, league, parent, KIND_PRIORITY[kind], now) for kind, url, league, parent in tasks]
+        self._transaction()
+        try:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (url, kind, league, parent, priority, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def seed(self, leagues: Dict[str, str], base_url: str = BASE_URL) -> int:
+        return self.enqueue(
+            ("league", urljoin(base_url, path), name, None) for name, path in leagues.items()
+        )
+
+    def lease(self, owner: str, lease_seconds: float = 120.0) -> Optional[Dict]:
+        """Claim the next ready task, or None if nothing is ready"""
+        now = time.time()
+        self._transaction()
+        try:
+            # A lease that expired on its last attempt (the worker kept crashing on it) is parked
+            self.conn.execute(
+                "UPDATE tasks SET state = 'failed', lease_owner = NULL, "
+                "error = 'lease expired on the last attempt', updated = ? "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = self.conn.execute(
+                "SELECT url, kind, league, parent, attempts FROM tasks "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ? AND attempts < ?) "
+                "ORDER BY priority, updated LIMIT 1",
+                (now, self.max_attempts),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE tasks SET state = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated = ? WHERE url = ?",
+                (owner, now + lease_seconds, now, row[0]),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        url, kind, league, parent, attempts = row
+        return {"url": url, "kind": kind, "league": league, "parent": parent, "attempt": attempts + 1}
+
+    def complete(self, url: str, owner: str):
+        self.conn.execute(
+            "UPDATE tasks SET state = 'done', lease_owner = NULL, error = NULL, updated = ? "
+            "WHERE url = ? AND lease_owner = ?",
+            (time.time(), url, owner),
+        )
+
+    def fail(self, url: str, owner: str, error: str):
+        """Release a failed task for retry, or park it once it has used up its attempts"""
+        self.conn.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_owner = NULL, error = ?, updated = ? WHERE url = ? AND lease_owner = ?",
+            (self.max_attempts, error[:500], time.time(), url, owner),
+        )
+
+    def save_player(self, player: Dict, league: str, team_url: Optional[str], digest: str):
+        self.conn.execute(
+            "INSERT INTO players (url, league, team_url, data, content_hash, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET league = excluded.league, team_url = excluded.team_url, "
+            "data = excluded.data, content_hash = excluded.content_hash, updated = excluded.updated",
+            (player["url"], league, team_url, json.dumps(player, ensure_ascii=False), digest, time.time()),
+        )
+
+    def wait_for_host(self, url: str, min_interval: float) -> float:
+        """
+        Global per-host politeness: reserve the host's next free slot and sleep
+        until it. Every worker sharing this database draws from one schedule,
+        so the host sees at most one request per `min_interval` in total.
+        """
+        if min_interval <= 0:
+            return 0.0
+        host = urlsplit(url).netloc
+        self._transaction()
+        try:
+            now = time.time()
+            row = self.conn.execute(
+                "SELECT next_at FROM host_schedule WHERE host = ?", (host,)
+            ).fetchone()
+            slot = max(now, row[0] if row else now)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO host_schedule (host, next_at) VALUES (?, ?)",
+                (host, slot + min_interval),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        counts: Dict[str, Dict[str, int]] = {}
+        for kind, state, n in self.conn.execute(
+            "SELECT kind, state, COUNT(*) FROM tasks GROUP BY kind, state"
+        ):
+            counts.setdefault(kind, {})[state] = n
+        return counts
+
+    def pending(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE state IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+    def iter_players(self, leagues: Optional[List[str]] = None) -> Iterable[Dict]:
+        query = "SELECT data, league FROM players"
+        params: Tuple = ()
+        if leagues:
+            query += f" WHERE league IN ({','.join('?' * len(leagues))})"
+            params = tuple(leagues)
+        for data, league in self.conn.execute(query + " ORDER BY league, url", params):
+            player = json.loads(data)
+            player["league"] = league
+            yield player
+
+    def close(self):
+        self.conn.close()
+
+
+class CrawlWorker:
+    """Leases tasks from a JobQueue until it is drained"""
+
+    def __init__(self, queue: JobQueue, min_interval: float = 1.0, owner: Optional[str] = None):
+        self.queue = queue
+        self.min_interval = min_interval
+        self.owner = owner or worker_name()
+        self.http = get_client()
+        self.stats = {"league": 0, "team": 0, "player": 0, "players_saved": 0, "failed": 0}
+
+    def fetch(self, url: str) -> str:
+        self.queue.wait_for_host(url, self.min_interval)
+        return self.http.get(url).text
+
+    def handle(self, task: Dict):
+        url, league = task["url"], task["league"]
+        html = self.fetch(url)
+        if task["kind"] == "league":
+            teams = SportsDBCrawler.extract_team_links(html, base_url=url)
+            added = self.queue.enqueue(("team", team, league, url) for team in teams)
+            print(f"[{self.owner}] {league}: {len(teams)} teams ({added} new)")
+        elif task["kind"] == "team":
+            players = SportsDBCrawler.extract_player_links(html, base_url=url)
+            added = self.queue.enqueue(("player", player, league, url) for player in players)
+            print(f"[{self.owner}] {url}: {len(players)} players ({added} new)")
+        else:
+            player = SportsDBCrawler.parse_player_data(html, url)
+            if player["name"] and player["description"] != "--- add one?":
+                self.queue.save_player(player, league, task["parent"], content_hash(html))
+                self.stats["players_saved"] += 1
+        self.stats[task["kind"]] += 1
+
+    def run(self, idle_timeout: float = 5.0) -> Dict:
+        """Work until no task has been ready for `idle_timeout` seconds and none are leased"""
+        idle_since = None
+        while True:
+            task = self.queue.lease(self.owner)
+            if task is None:
+                # Other workers may still be expanding leagues/teams into new tasks
+                if self.queue.pending() == 0:
+                    break
+                idle_since = idle_since or time.time()
+                if time.time() - idle_since > idle_timeout:
+                    break
+                time.sleep(0.2)
+                continue
+            idle_since = None
+            try:
+                self.handle(task)
+                self.queue.complete(task["url"], self.owner)
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"[{self.owner}] Error on {task['kind']} task {task['url']}: {e}")
+                self.queue.fail(task["url"], self.owner, str(e))
+        return self.stats
+
+
+def _run_worker(path: str, min_interval: float, idle_timeout: float, results):
+    try:
+        worker = CrawlWorker(JobQueue(path), min_interval=min_interval)
+        stats = worker.run(idle_timeout=idle_timeout)
+        stats["fetch"] = worker.http.metrics.snapshot()["requests"]
+        results.put(stats)
+    except Exception as e:
+        print(f"Crawl worker failed: {e}")
+        traceback.print_exc()
+        results.put({})
+
+
+def run_workers(
+    processes: int, path: str = QUEUE_FILE, min_interval: float = 1.0, idle_timeout: float = 5.0
+) -> Dict:
+    """Drain the queue with `processes` worker processes on this node"""
+    start = time.perf_counter()
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_run_worker, args=(path, min_interval, idle_timeout, results))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    totals: Dict[str, int] = {}
+    for _ in workers:
+        for key, value in results.get().items():
+            totals[key] = totals.get(key, 0) + value
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    totals["seconds"] = round(elapsed, 2)
+    totals["pages_per_s"] = round(totals.get("fetch", 0) / elapsed, 2) if elapsed else 0.0
+    print(f"{processes} workers finished: {totals}")
+    return totals
+
+
+def export_players(path: str = QUEUE_FILE, output: str = "app/data/players.json", leagues=None) -> int:
+    """Upsert every crawled player (with its league) into `output` by URL"""
+    queue = JobQueue(path)
+    store = PlayerStore(output, key="url")
+    count = 0
+    for player in queue.iter_players(leagues):
+        store.upsert(player)
+        count += 1
+    store.commit()
+    queue.close()
+    print(f"Exported {count} players to {output} ({len(store)} players in total)")
+    return count
+
+
+def _parse_leagues(values: List[str]) -> Dict[str, str]:
+    leagues = {}
+    for value in values:
+        name, _, path = value.partition("=")
+        name = name.upper()
+        if not path and name not in LEAGUES:
+            raise SystemExit(f"Unknown league {name}; use NAME=/league/<id>-<slug>")
+        leagues[name] = path or LEAGUES[name]
+    return leagues
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-league TheSportsDB crawl job queue")
+    parser.add_argument("command", choices=["seed", "work", "export", "status"])
+    parser.add_argument("--queue", default=QUEUE_FILE)
+    parser.add_argument("--leagues", nargs="+", help="e.g. NFL NBA MLB NHL (seed defaults to NFL)")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument(
+        "--min-interval", type=float, default=1.0, help="Seconds between requests to one host, across all workers"
+    )
+    parser.add_argument("--idle-timeout", type=float, default=5.0)
+    parser.add_argument("--output", default="app/data/players.json")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        queue = JobQueue(args.queue)
+        added = queue.seed(_parse_leagues(args.leagues or ["NFL"]), args.base_url)
+        print(f"Seeded {added} league tasks into {args.queue}")
+    elif args.command == "work":
+        print(f"Starting {args.processes} crawl workers at {datetime.now()}")
+        run_workers(args.processes, args.queue, args.min_interval, args.idle_timeout)
+    elif args.command == "export":
+        leagues = list(_parse_leagues(args.leagues)) if args.leagues else None
+        export_players(args.queue, args.output, leagues)
+    else:
+        print(json.dumps(JobQueue(args.queue).counts(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# refresh.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from app.storage.durable import DurableWriter
+from app.storage.players import iter_players
+
+STATE_FILE = "app/data/refresh_state.sqlite3"
+DELTA_DIR = "app/data/deltas"
+
+# Scripts, styles and comments carry ad slots / timestamps that change on every fetch
+_VOLATILE = re.compile(r"<script.*?</script>|<style.*?</style>|<!--.*?-->", re.S | re.I)
+
+
+def content_hash(html: str) -> str:
+    """Hash of a page with its volatile markup removed"""
+    stable = _VOLATILE.sub("", html)
+    stable = re.sub(r"\s+", " ", stable)
+    return hashlib.sha256(stable.encode("utf-8")).hexdigest()
+
+
+class RefreshState:
+    """Per-URL content hashes and last-seen times, plus the last known team rosters"""
+
+    def __init__(self, path: str = STATE_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                last_seen REAL NOT NULL,
+                last_changed REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rosters (
+                team_url TEXT NOT NULL,
+                player_url TEXT NOT NULL,
+                PRIMARY KEY (team_url, player_url)
+            );
+            """
+        )
+        self.conn.commit()
+
+    def content_hash(self, url: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT content_hash FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def seen(self, url: str, digest: str, changed: bool):
+        now = time.time()
+        if changed:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, last_seen, last_changed) "
+                "VALUES (?, ?, ?, ?)",
+                (url, digest, now, now),
+            )
+        else:
+            self.conn.execute("UPDATE pages SET last_seen = ? WHERE url = ?", (now, url))
+
+    def roster(self, team_url: str) -> Set[str]:
+        rows = self.conn.execute(
+            "SELECT player_url FROM rosters WHERE team_url = ?", (team_url,)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def set_roster(self, team_url: str, player_urls: Iterable[str]):
+        self.conn.execute("DELETE FROM rosters WHERE team_url = ?", (team_url,))
+        self.conn.executemany(
+            "INSERT INTO rosters (team_url, player_url) VALUES (?, ?)",
+            [(team_url, url) for url in player_urls],
+        )
+
+    def forget(self, urls: Iterable[str]):
+        self.conn.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in urls])
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        """Close the database; anything not committed is discarded"""
+        self.conn.close()
+
+
+def write_delta(upserts, removed, stats: Dict, delta_dir: str = DELTA_DIR) -> str:
+    """Durably write a delta file; `apply_pending_deltas` folds it into players.json"""
+    os.makedirs(delta_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(delta_dir, f"players_delta_{stamp}.json")
+    delta = {
+        "generated_at": time.time(),
+        "upserts": list(upserts),
+        "removed": sorted(removed),
+        "stats": stats,
+    }
+    DurableWriter(path).write_json(delta)
+    return path
+
+
+def apply_delta(players: Iterable[Dict], delta: Dict) -> Iterator[Dict]:
+    """
+    Apply a delta to a stream of players keyed by URL.
+
+    A changed player replaces its first record in place and removed players
+    are dropped; any further records with an upserted or removed URL (older
+    crawls appended the same player more than once) are dropped too, so no
+    stale copy survives. New players are appended at the end.
+    """
+    upserts = {player["url"]: player for player in delta.get("upserts", [])}
+    removed = set(delta.get("removed", []))
+    written = set()
+    for player in players:
+        url = player.get("url")
+        if url in removed or url in written:
+            continue
+        if url in upserts:
+            written.add(url)
+            yield upserts[url]
+        else:
+            yield player
+    for url, player in upserts.items():
+        if url not in written:
+            yield player
+
+
+def pending_deltas(delta_dir: str = DELTA_DIR) -> List[str]:
+    """Delta files not yet applied, oldest first"""
+    if not os.path.isdir(delta_dir):
+        return []
+    names = sorted(n for n in os.listdir(delta_dir) if n.startswith("players_delta_") and n.endswith(".json"))
+    return [os.path.join(delta_dir, name) for name in names]
+
+
+def apply_pending_deltas(writer: DurableWriter, delta_dir: str = DELTA_DIR) -> int:
+    """
+    Fold every pending delta into the players file in one streaming rewrite,
+    then move the deltas to `applied/`. Upserts and removals are keyed by
+    URL, so re-applying a delta after a crash in between is harmless. The
+    API's index refresher picks the new file up and only embeds the players
+    whose description changed.
+    """
+    paths = pending_deltas(delta_dir)
+    if not paths:
+        return 0
+    players: Iterable[Dict] = iter_players(writer.path)
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            players = apply_delta(players, json.load(f))
+    writer.write_players(players)
+
+    applied_dir = os.path.join(delta_dir, "applied")
+    os.makedirs(applied_dir, exist_ok=True)
+    for path in paths:
+        os.replace(path, os.path.join(applied_dir, os.path.basename(path)))
+    return len(paths)
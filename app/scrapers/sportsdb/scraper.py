@@ -1,11 +1,15 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
 import hashlib
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+from app.scrapers.http_client import get_client
+from app.storage.player_store import PlayerStore
 
 
 class SportsDBScraper:
@@ -15,6 +19,7 @@ class SportsDBScraper:
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
+        self.http = get_client()
         # Set up data directory in the app root
         self.data_dir = os.path.join(os.path.dirname(__file__), "..", "..", "data")
         self.players_file = os.path.join(self.data_dir, "players.json")
@@ -24,13 +29,7 @@ class SportsDBScraper:
     def fetch_player_page(self, url: str) -> Optional[str]:
         """Fetch the HTML content of a player's page"""
         print(f"\nFetching page: {url}")
-        try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            print(f"Error fetching {url}: {e}")
-            return None
+        return self.http.fetch_text(url, headers=self.headers) or None
 
     def parse_player_info(self, html: str) -> Dict:
         """Parse player information from HTML"""
@@ -68,36 +67,15 @@ class SportsDBScraper:
         return player_data
 
     def save_players_json(self, player_data: Dict):
-        """Save or update players.json file"""
+        """Save or update a single player in players.json"""
         print("\nSaving to players.json...")
-        existing_data = []
-
-        # Read existing data if file exists
-        if os.path.exists(self.players_file):
-            with open(self.players_file, "r") as f:
-                try:
-                    existing_data = json.load(f)
-                except json.JSONDecodeError:
-                    print("Error reading existing JSON file, starting fresh")
-                    existing_data = []
-
-        # Check if player already exists
-        player_exists = False
-        for i, player in enumerate(existing_data):
-            if player.get("name") == player_data["name"]:
-                existing_data[i] = player_data
-                player_exists = True
-                print(f"Updated existing player: {player_data['name']}")
-                break
-
-        # Add new player if doesn't exist
-        if not player_exists:
-            existing_data.append(player_data)
+        # Read fresh each time so writes by the crawler since the last save are kept
+        store = PlayerStore(self.players_file)
+        if store.upsert(player_data):
+            print(f"Updated existing player: {player_data['name']}")
+        else:
             print(f"Added new player: {player_data['name']}")
-
-        # Write back to file
-        with open(self.players_file, "w", encoding="utf-8") as f:
-            json.dump(existing_data, f, indent=4, ensure_ascii=False)
+        store.commit()
         print(f"Successfully saved to: {self.players_file}")
 
     def process_player(self, url: str):
@@ -105,6 +83,50 @@ class SportsDBScraper:
         html = self.fetch_player_page(url)
         if html:
             player_data = self.parse_player_info(html)
+            player_data["url"] = url
             self.save_players_json(player_data)
             return True
         return False
+
+    def process_players(self, urls: List[str], workers: int = 8) -> Dict:
+        """
+        Fetch many player pages concurrently, parse them and commit once.
+
+        The file is rewritten a single time per batch (temp file + rename)
+        instead of once per player. It is read only after fetching, so the
+        merge starts from the current file rather than a stale copy.
+        """
+        urls = list(dict.fromkeys(urls))
+        parsed = []
+        start = time.perf_counter()
+        bytes_before = self.http.metrics.snapshot()["bytes_wire"]
+        stats = {"urls": len(urls), "added": 0, "updated": 0, "failed": 0}
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for url, html in zip(urls, pool.map(self.fetch_player_page, urls)):
+                if not html:
+                    stats["failed"] += 1
+                    continue
+                try:
+                    player_data = self.parse_player_info(html)
+                except Exception as e:
+                    print(f"Error parsing {url}: {e}")
+                    stats["failed"] += 1
+                    continue
+                player_data["url"] = url
+                parsed.append(player_data)
+
+        store = PlayerStore(self.players_file)
+        for player_data in parsed:
+            stats["updated" if store.upsert(player_data) else "added"] += 1
+        store.commit()
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = round(elapsed, 2)
+        stats["pages_per_sec"] = round(len(urls) / elapsed, 1) if elapsed else 0.0
+        stats["bytes"] = self.http.metrics.snapshot()["bytes_wire"] - bytes_before
+        print(
+            f"Processed {stats['urls']} players in {stats['seconds']}s "
+            f"({stats['pages_per_sec']} pages/s): {stats['added']} added, "
+            f"{stats['updated']} updated, {stats['failed']} failed, {stats['bytes'] / 1e6:.1f} MB"
+        )
+        return stats
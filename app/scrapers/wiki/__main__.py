@@ -1,14 +1,54 @@
-import chromadb
+import argparse
 import os
-from .crawler import WikipediaCrawler
+
+import chromadb
+from app.scrapers.page_cache import PageCache, replay
+from app.storage.durable import DurableWriter
+from .crawler import BASE_WIKI_URL, WikipediaCrawler, replay_parse
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Crawl Wikipedia pages for known players")
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Re-parse cached Wikipedia pages instead of crawling",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--metrics-port", type=int, default=None, help="Serve crawl metrics on this port"
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        default=None,
+        help="Write crawl metrics here (Prometheus textfile format) with each progress line",
+    )
+    parser.add_argument(
+        "--progress-interval", type=float, default=None, help="Seconds between progress lines"
+    )
+    parser.add_argument("--output", default="app/data/players_wiki.json")
+    args = parser.parse_args()
+
+    if args.replay:
+        print("Replaying cached Wikipedia pages")
+        players = replay(
+            PageCache(), replay_parse, prefix=BASE_WIKI_URL, workers=args.workers
+        )
+        DurableWriter(args.output).write_players(players)
+        print(f"Wrote {len(players)} players to {args.output}")
+        return
+
     # Initialize ChromaDB client
     chroma_client = chromadb.Client()
 
     # Create crawler instance
     crawler = WikipediaCrawler()
+    if args.metrics_port:
+        crawler.progress.port = args.metrics_port
+    if args.metrics_textfile:
+        crawler.progress.textfile = args.metrics_textfile
+    if args.progress_interval:
+        crawler.progress.interval = args.progress_interval
     # Start crawling from NFL league page
     print("Starting to crawl Wikipedia data")
     #print(crawler.players_data)
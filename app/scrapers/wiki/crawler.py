@@ -1,13 +1,29 @@
 # crawler.py
 from bs4 import BeautifulSoup
 from time import sleep
-import json
 import os
-import requests
 from datetime import datetime
 import re
 import traceback
 
+from app.scrapers.crawl_metrics import CrawlProgress
+from app.scrapers.http_client import get_client
+from app.storage.durable import DurableWriter
+from app.storage.players import iter_players
+
+BASE_WIKI_URL = "https://en.wikipedia.org/wiki/"
+
+# Some headings we might skip because we usually don't care about them
+# or they are typically empty:
+HEADINGS_TO_SKIP = {
+    "Contents",
+    "References",
+    "External_links",
+    "Further_reading",
+    "See_also",
+    "Notes"
+}
+
 
 class WikipediaCrawler:
     def __init__(self):
@@ -17,51 +33,41 @@ class WikipediaCrawler:
         - We parse top-level <h2> headings inside .mw-parser-output, ignoring typical 'References', 'External links', etc.
         - We skip loading old JSON; each run overwrites players_wiki.json with fresh data.
         """
-        self.base_wiki_url = "https://en.wikipedia.org/wiki/"
+        self.base_wiki_url = BASE_WIKI_URL
         self.players_data = []       # holds new players data for this run
         self.processed_players = set()
 
         self.save_frequency = 5
         self.backup_frequency = 10
         self.player_count = 0
+        self.http = get_client()
+        self.progress = CrawlProgress("wiki", self.http)
 
         os.makedirs("app/data/backups", exist_ok=True)
         os.makedirs("app/data", exist_ok=True)
 
         self.players_file = "app/data/players_wiki.json"
         self.players_orig = "app/data/players.json"
+        self.players_writer = DurableWriter(
+            self.players_file, backup_dir="app/data/backups", keep=5
+        )
+        # Copies from before backup generations (wiki_players_backup_<count>.json)
+        self.players_writer.adopt_legacy_backups("wiki_players")
 
-        # Load your original players, turning their 'name' into wiki slugs
-        with open(self.players_orig, "r", encoding="utf-8") as f:
-            players_json = json.load(f)
-            # For each player, we convert e.g. "Zach Thomas" to "Zach_Thomas"
-            self.players_names = [
-                player['name'].replace(' ', '_') for player in players_json['players']
-            ]
-
-        # Some headings we might skip because we usually don't care about them
-        # or they are typically empty:
-        self.headings_to_skip = {
-            "Contents",
-            "References",
-            "External_links",
-            "Further_reading",
-            "See_also",
-            "Notes"
-        }
+        # Stream just the 'name' field of the original players, turning it into wiki slugs
+        # For each player, we convert e.g. "Zach Thomas" to "Zach_Thomas"
+        self.players_names = [
+            player['name'].replace(' ', '_')
+            for player in iter_players(self.players_orig, fields=("name",))
+        ]
 
     def fetch_page(self, wiki_slug: str) -> str:
         """Fetch the Wikipedia HTML for a player's page."""
         full_url = self.base_wiki_url + wiki_slug
-        try:
-            response = requests.get(full_url, timeout=10)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            print(f"Error fetching {full_url}: {str(e)}")
-            return ""
-
-    def parse_player_page(self, html: str, wiki_slug: str):
+        return self.http.fetch_text(full_url)
+
+    @staticmethod
+    def parse_player_page(html: str, wiki_slug: str):
         """
         Parse the Wikipedia page for a single NFL player:
           - Grab <h2> sections from the main content.
@@ -85,9 +91,9 @@ class WikipediaCrawler:
         all_h2 = main_content.find_all("h2")
         # parse each heading's text
         for h2 in all_h2:
-            section_title = self._get_section_title(h2)
-            # skip if heading is empty or in headings_to_skip
-            if not section_title or section_title in self.headings_to_skip:
+            section_title = WikipediaCrawler._get_section_title(h2)
+            # skip if heading is empty or in HEADINGS_TO_SKIP
+            if not section_title or section_title in HEADINGS_TO_SKIP:
                 continue
 
             # gather paragraphs from this h2 until next h2
@@ -111,9 +117,9 @@ class WikipediaCrawler:
             if caption_tag:
                 table_title = caption_tag.get_text(strip=True)
             else:
-                table_title = self._guess_table_title(tbl)
+                table_title = WikipediaCrawler._guess_table_title(tbl)
 
-            table_data = self._parse_html_table(tbl)
+            table_data = WikipediaCrawler._parse_html_table(tbl)
             if table_data:
                 player_data["tables"].append({
                     "title": table_title,
@@ -123,7 +129,8 @@ class WikipediaCrawler:
 
         return player_data
 
-    def _parse_html_table(self, table_soup):
+    @staticmethod
+    def _parse_html_table(table_soup):
         """Parse a 'wikitable' into a list of row dicts."""
         rows = table_soup.find_all("tr")
         if not rows:
@@ -150,18 +157,61 @@ class WikipediaCrawler:
                     row_dict[col_name] = val
                 data_rows.append(row_dict)
 
+        # Career stat tables use a two-row header ("Receiving" over "Rec Yds TD"),
+        # so the first header row alone never matches the data rows
+        if not data_rows:
+            data_rows = WikipediaCrawler._parse_grouped_table(rows)
+
+        return data_rows
+
+    @staticmethod
+    def _parse_grouped_table(rows):
+        """Parse a table whose columns are named by a grouped two-row header."""
+        header_rows = []
+        for row in rows:
+            if row.find("td"):
+                break
+            if row.find_all("th"):
+                header_rows.append(row)
+        if len(header_rows) < 2:
+            return []
+
+        def span(cell, attr):
+            match = re.match(r"\d+", str(cell.get(attr, "1")))
+            return int(match.group()) if match else 1
+
+        # Expand colspans of the top row; cells spanning both rows name the column alone
+        top = []
+        for th in header_rows[0].find_all("th"):
+            top.extend([(th.get_text(strip=True), span(th, "rowspan") > 1)] * span(th, "colspan"))
+        sub_headers = iter(th.get_text(strip=True) for th in header_rows[1].find_all("th"))
+        headers = [
+            text if full_height else f"{text} {next(sub_headers, '')}".strip()
+            for text, full_height in top
+        ]
+
+        data_rows = []
+        for row in rows[len(header_rows):]:
+            # The season cell is often a <th>, so take both cell types in order
+            cells = row.find_all(["th", "td"])
+            if len(cells) == len(headers) and row.find("td"):
+                data_rows.append(
+                    {headers[i]: cell.get_text(" ", strip=True) for i, cell in enumerate(cells)}
+                )
         return data_rows
 
-    def _guess_table_title(self, tbl_soup):
+    @staticmethod
+    def _guess_table_title(tbl_soup):
         """If table lacks <caption>, guess from preceding heading."""
         prev = tbl_soup.find_previous_sibling(
             lambda x: x.name in ("h2","h3","h4","h5")
         )
         if prev:
-            return self._get_section_title(prev)
+            return WikipediaCrawler._get_section_title(prev)
         return "Unknown Table"
 
-    def _get_section_title(self, heading_tag):
+    @staticmethod
+    def _get_section_title(heading_tag):
         """
         Extract text from the heading. If <span class="mw-headline"> is present, use that.
         Then remove trailing '[edit]' if present.
@@ -184,20 +234,21 @@ class WikipediaCrawler:
     def crawl_player(self, wiki_slug: str):
         """Crawl one player wiki page. Skip if we already did it."""
         if wiki_slug in self.processed_players:
-            print(f"Skipping already processed: {wiki_slug}")
+            self.progress.item("skipped")
             return
 
-        print(f"Fetching: {wiki_slug}")
         html = self.fetch_page(wiki_slug)
         if not html:
-            print(f"Failed to fetch: {wiki_slug}")
+            self.progress.item("failed")
             return
 
         try:
-            data = self.parse_player_page(html, wiki_slug)
+            with self.progress.stage("parse"):
+                data = self.parse_player_page(html, wiki_slug)
             self.players_data.append(data)
             self.processed_players.add(wiki_slug)
             self.player_count += 1
+            self.progress.item("saved" if data["sections"] or data["tables"] else "skipped")
 
             if self.player_count % self.save_frequency == 0:
                 self.save_players()
@@ -208,21 +259,17 @@ class WikipediaCrawler:
         except Exception as e:
             print(f"Error crawling {wiki_slug}: {e}")
             traceback.print_exc()
+            self.progress.item("failed")
             self.save_players(backup=True)
 
     def save_players(self, backup=False):
-        """Save players to the main JSON or create a backup if backup=True."""
-        data_out = {"players": self.players_data}
+        """Save players to the main JSON, then hard-link it as a backup generation if backup=True."""
         try:
-            if backup:
-                fname = f"app/data/backups/wiki_players_backup_{self.player_count}.json"
-                with open(fname, "w", encoding="utf-8") as bf:
-                    json.dump(data_out, bf, indent=2, ensure_ascii=False)
-                print(f"[Backup] wrote: {fname}")
-            else:
-                with open(self.players_file, "w", encoding="utf-8") as f:
-                    json.dump(data_out, f, indent=2, ensure_ascii=False)
-                print(f"[Save] wrote {len(self.players_data)} players to {self.players_file}")
+            with self.progress.stage("save"):
+                self.players_writer.write_players(self.players_data)
+                if backup:
+                    self.players_writer.snapshot()
+            print(f"[Save] wrote {len(self.players_data)} players to {self.players_file}")
         except Exception as e:
             print(f"Error saving players: {e}")
             traceback.print_exc()
@@ -231,17 +278,28 @@ class WikipediaCrawler:
         """Crawl them all, then do a final save."""
         start = datetime.now()
         print("=== Starting Wikipedia Crawler ===")
+        self.progress.add_total(len(list_of_player_slugs))
+        self.progress.start()
 
-        for slug in list_of_player_slugs:
-            self.crawl_player(slug)
-            sleep(1.0)  # rate limit
+        try:
+            for slug in list_of_player_slugs:
+                self.crawl_player(slug)
+                sleep(1.0)  # rate limit
 
-        if self.players_data:
-            self.save_players()
+            if self.players_data:
+                self.save_players()
+        finally:
+            self.progress.stop()
 
         dur = datetime.now() - start
         print(f"Done crawling. Duration: {dur}")
         print(f"Total players: {len(self.players_data)}")
+        print(f"Fetch stats: {self.http.metrics.summary()}")
+
+
+def replay_parse(html: str, url: str):
+    """Worker entry point for --replay: parse one cached Wikipedia page"""
+    return WikipediaCrawler.parse_player_page(html, url[len(BASE_WIKI_URL):])
 
 
 if __name__ == "__main__":
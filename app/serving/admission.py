@@ -0,0 +1,157 @@
+# admission.py
+import asyncio
+import re
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+ASK_IN_FLIGHT = Gauge("sports_ask_in_flight", "Requests currently being answered")
+ASK_QUEUE_DEPTH = Gauge("sports_ask_queue_depth", "Requests waiting for an answer slot")
+ASK_SHED = Counter("sports_ask_shed_total", "Requests rejected by admission control", ["reason"])
+ASK_DEGRADED = Counter(
+    "sports_ask_degraded_total", "Answers served from retrieved docs without the LLM"
+)
+
+
+class Rejected(Exception):
+    """Raised when a request is shed; maps onto an HTTP status with Retry-After"""
+
+    def __init__(self, status: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class TokenBucket:
+    """Classic token bucket; `take()` returns 0 on success or seconds until a token is free"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, n: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return 0.0
+            return (n - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class AdmissionController:
+    """
+    Bounded concurrency for /ask with a short, deadline-aware queue.
+
+    - At most `max_in_flight` requests run at once; up to `max_queue` wait.
+    - A request is rejected up front (503) if the queue is full or the
+      estimated wait (queue position x average service time) would blow its
+      deadline, and rejected later if it is still queued at the deadline.
+    - Each client gets a token bucket; an empty bucket is a 429. `limit()`
+      charges it on its own, for callers that may never need a slot (e.g.
+      requests that join an identical in-flight one).
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        max_queue: int = 32,
+        queue_timeout: float = 10.0,
+        client_rate: float = 2.0,
+        client_burst: float = 10.0,
+        max_clients: int = 10000,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+        self.in_flight = 0
+        self.queued = 0
+        self.avg_service_time = 1.0
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, client_id: str) -> TokenBucket:
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                # Drop the oldest clients rather than growing without bound
+                for key in list(self._buckets)[: self.max_clients // 10 or 1]:
+                    del self._buckets[key]
+            bucket = self._buckets[client_id] = TokenBucket(self.client_rate, self.client_burst)
+        return bucket
+
+    def _shed(self, status: int, reason: str, retry_after: float):
+        ASK_SHED.labels(reason=reason).inc()
+        raise Rejected(status, reason, retry_after)
+
+    def limit(self, client_id: str):
+        """Charge one request to the client's bucket; raises Rejected (429) when it is empty"""
+        wait = self._bucket(client_id).take()
+        if wait:
+            self._shed(429, "rate_limited", wait)
+
+    @asynccontextmanager
+    async def admit(self, client_id: Optional[str] = None, timeout: Optional[float] = None):
+        """Wait for a slot; pass `client_id` to charge its bucket first (None: already charged)"""
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+
+        if client_id is not None:
+            self.limit(client_id)
+
+        # Requests ahead of this one that still need a slot
+        waiting = self.in_flight + self.queued - self.max_in_flight
+        if waiting >= 0:
+            if waiting >= self.max_queue:
+                self._shed(503, "queue_full", self.avg_service_time)
+            estimated_wait = (waiting + 1) * self.avg_service_time / self.max_in_flight
+            if estimated_wait > timeout:
+                self._shed(503, "deadline", estimated_wait)
+
+        self.queued += 1
+        ASK_QUEUE_DEPTH.set(self.queued)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._shed(503, "queue_timeout", self.avg_service_time)
+        finally:
+            self.queued -= 1
+            ASK_QUEUE_DEPTH.set(self.queued)
+
+        self.in_flight += 1
+        ASK_IN_FLIGHT.set(self.in_flight)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            # Exponentially weighted so the estimate follows current LLM latency
+            self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * elapsed
+            self.in_flight -= 1
+            ASK_IN_FLIGHT.set(self.in_flight)
+            self._semaphore.release()
+
+
+def fallback_answer(question: str, docs: List[str], max_docs: int = 3) -> str:
+    """Cheap answer built only from retrieved docs, for when the LLM budget is spent"""
+    snippets = []
+    for doc in docs[:max_docs]:
+        first_sentence = re.split(r"(?<=[.!?])\s+", doc.strip(), maxsplit=1)[0]
+        if first_sentence:
+            snippets.append(f"- {first_sentence}")
+    if not snippets:
+        return "I'm sorry, but I couldn't process your request at the moment."
+    return (
+        "We're handling a lot of questions right now, so here is what I found "
+        "without a full answer:\n" + "\n".join(snippets)
+    )
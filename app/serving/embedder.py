@@ -0,0 +1,267 @@
+# embedder.py
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import torch
+    import torch.nn.functional as F
+except ImportError:
+    torch = None
+
+try:
+    from transformers import AutoModel, AutoTokenizer
+except ImportError:
+    AutoModel = AutoTokenizer = None
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+from storage.players import DATA_DIR, PLAYERS_FILE, iter_players
+
+EMBEDDER_DIR = os.path.join(DATA_DIR, "embedder")
+BASE_MODEL = "bert-base-uncased"
+MAX_LENGTH = 512
+
+# Exported graph must match eager PyTorch this closely on the check texts
+CHECK_ATOL = 1e-4
+CHECK_MIN_COSINE = 0.9999
+
+
+if torch is not None:
+
+    class PooledEmbedder(torch.nn.Module):
+        """BERT + masked mean pooling + 768->384 avg-pool, as one graph"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            hidden = self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+            mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)  # [B, 768]
+            return F.avg_pool1d(pooled.unsqueeze(1), kernel_size=2).squeeze(1)  # [B, 384]
+
+
+def load_eager(model_name: str = BASE_MODEL):
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    # torchscript=True makes the model return tuples, which tracing and ONNX export need
+    model = AutoModel.from_pretrained(model_name, torchscript=True)
+    model.eval()
+    return tokenizer, PooledEmbedder(model).eval()
+
+
+def eager_embed(module, tokenizer, texts: Sequence[str]) -> np.ndarray:
+    inputs = tokenizer(list(texts), return_tensors="pt", padding=True, truncation=True, max_length=MAX_LENGTH)
+    with torch.no_grad():
+        return module(inputs["input_ids"], inputs["attention_mask"]).numpy()
+
+
+class CompiledEmbedder:
+    """
+    Runs an exported embedder graph (ONNX Runtime or TorchScript) with a
+    fixed number of intra-op threads. Produces the same 384-d vectors as
+    main.get_embeddings / get_embeddings_batch.
+    """
+
+    def __init__(self, path: str = EMBEDDER_DIR, threads: Optional[int] = None):
+        with open(os.path.join(path, "embedder.json")) as f:
+            self.meta = json.load(f)
+        self.format = self.meta["format"]
+        if AutoTokenizer is None:
+            raise RuntimeError("transformers is not installed; pip install transformers")
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        threads = threads or os.cpu_count() or 1
+
+        if self.format == "onnx":
+            if onnxruntime is None:
+                raise RuntimeError("onnxruntime is not installed; pip install onnxruntime")
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.session = onnxruntime.InferenceSession(
+                os.path.join(path, "embedder.onnx"), options, providers=["CPUExecutionProvider"]
+            )
+        else:
+            torch.set_num_threads(threads)
+            self.module = torch.jit.load(os.path.join(path, "embedder.pt"))
+            self.module = torch.jit.optimize_for_inference(self.module.eval())
+        print(f"Loaded {self.format} embedder from {path} ({threads} threads)")
+
+    def _run(self, texts: Sequence[str]) -> np.ndarray:
+        if self.format == "onnx":
+            inputs = self.tokenizer(list(texts), return_tensors="np", padding=True, truncation=True, max_length=MAX_LENGTH)
+            return self.session.run(
+                None,
+                {
+                    "input_ids": inputs["input_ids"].astype(np.int64),
+                    "attention_mask": inputs["attention_mask"].astype(np.int64),
+                },
+            )[0]
+        inputs = self.tokenizer(list(texts), return_tensors="pt", padding=True, truncation=True, max_length=MAX_LENGTH)
+        with torch.no_grad():
+            return self.module(inputs["input_ids"], inputs["attention_mask"]).numpy()
+
+    def embed(self, text: str) -> List[float]:
+        return self._run([text])[0].tolist()
+
+    def embed_batch(self, texts: Sequence[str], batch_size: int = 32) -> List[List[float]]:
+        results = []
+        for start in range(0, len(texts), batch_size):
+            results.extend(self._run(texts[start : start + batch_size]).tolist())
+        return results
+
+
+def sample_texts(players_file: str = PLAYERS_FILE, limit: int = 64) -> List[str]:
+    texts = []
+    for player in iter_players(players_file, fields=("description",)):
+        description = (player.get("description") or "").strip()
+        if len(description) > 40:
+            texts.append(description)
+        if len(texts) >= limit:
+            break
+    return texts or ["Lamar Jackson is an American football quarterback for the Baltimore Ravens."]
+
+
+def export(out_dir: str = EMBEDDER_DIR, fmt: str = "onnx", model_name: str = BASE_MODEL, players_file: str = PLAYERS_FILE):
+    """Export the pooled embedder, then refuse to keep it unless it matches eager PyTorch"""
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer, module = load_eager(model_name)
+    example = tokenizer(
+        ["an example sentence", "a second, somewhat longer example sentence"],
+        return_tensors="pt",
+        padding=True,
+    )
+    args = (example["input_ids"], example["attention_mask"])
+
+    start = time.perf_counter()
+    if fmt == "onnx":
+        torch.onnx.export(
+            module,
+            args,
+            os.path.join(out_dir, "embedder.onnx"),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["embedding"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "embedding": {0: "batch"},
+            },
+            opset_version=14,
+        )
+    else:
+        with torch.no_grad():
+            traced = torch.jit.trace(module, args)
+        traced.save(os.path.join(out_dir, "embedder.pt"))
+    tokenizer.save_pretrained(out_dir)
+    meta = {"format": fmt, "model": model_name, "dimensions": 384, "max_length": MAX_LENGTH}
+    with open(os.path.join(out_dir, "embedder.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    print(f"Exported {fmt} embedder to {out_dir} in {time.perf_counter() - start:.1f}s")
+
+    report = check(out_dir, players_file, tokenizer=tokenizer, module=module)
+    if not report["ok"]:
+        os.remove(os.path.join(out_dir, "embedder.json"))  # serving only loads exports with a manifest
+        raise ValueError(f"Exported embedder does not match eager PyTorch: {report}")
+    meta["check"] = report
+    with open(os.path.join(out_dir, "embedder.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def check(path: str = EMBEDDER_DIR, players_file: str = PLAYERS_FILE, tokenizer=None, module=None) -> dict:
+    """Compare the exported graph to eager PyTorch, one text at a time and batched"""
+    if module is None:
+        with open(os.path.join(path, "embedder.json")) as f:
+            tokenizer, module = load_eager(json.load(f)["model"])
+    compiled = CompiledEmbedder(path)
+    texts = sample_texts(players_file, limit=32)
+
+    expected = np.vstack([eager_embed(module, tokenizer, texts[i : i + 1]) for i in range(len(texts))])
+    single = np.array([compiled.embed(text) for text in texts])
+    batched = np.array(compiled.embed_batch(texts, batch_size=8))
+
+    def cosine(a, b):
+        return float(np.min((a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))))
+
+    report = {
+        "texts": len(texts),
+        "max_abs_diff_single": float(np.abs(single - expected).max()),
+        "max_abs_diff_batched": float(np.abs(batched - expected).max()),
+        "min_cosine": min(cosine(single, expected), cosine(batched, expected)),
+    }
+    report["ok"] = (
+        max(report["max_abs_diff_single"], report["max_abs_diff_batched"]) <= CHECK_ATOL
+        and report["min_cosine"] >= CHECK_MIN_COSINE
+    )
+    print(f"Numerical check: {report}")
+    return report
+
+
+def benchmark(path: str = EMBEDDER_DIR, players_file: str = PLAYERS_FILE, queries: int = 50, batch_size: int = 32, threads: Optional[int] = None):
+    """Per-query and per-batch latency of eager PyTorch vs the exported graph"""
+    with open(os.path.join(path, "embedder.json")) as f:
+        tokenizer, module = load_eager(json.load(f)["model"])
+    compiled = CompiledEmbedder(path, threads=threads)
+    if threads:
+        torch.set_num_threads(threads)
+    texts = sample_texts(players_file, limit=max(queries, batch_size))
+    questions = [" ".join(text.split()[:12]) for text in texts[:queries]]
+    batch = texts[:batch_size]
+
+    def timed(fn, repeats):
+        fn()  # warm-up
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples)
+
+    eager_query = statistics.median(
+        [timed(lambda q=q: eager_embed(module, tokenizer, [q]), 1) for q in questions]
+    )
+    compiled_query = statistics.median([timed(lambda q=q: compiled.embed(q), 1) for q in questions])
+    eager_batch = timed(lambda: eager_embed(module, tokenizer, batch), 5)
+    compiled_batch = timed(lambda: compiled.embed_batch(batch, batch_size=batch_size), 5)
+
+    report = {
+        "format": compiled.format,
+        "query_ms": {"eager": round(eager_query * 1000, 2), "compiled": round(compiled_query * 1000, 2)},
+        "query_speedup": round(eager_query / compiled_query, 2),
+        f"batch{batch_size}_ms": {"eager": round(eager_batch * 1000, 1), "compiled": round(compiled_batch * 1000, 1)},
+        "batch_speedup": round(eager_batch / compiled_batch, 2),
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export, check and benchmark the compiled embedder")
+    parser.add_argument("command", choices=["export", "check", "bench"])
+    parser.add_argument("--out", default=EMBEDDER_DIR)
+    parser.add_argument("--format", choices=["onnx", "torchscript"], default="onnx")
+    parser.add_argument("--model", default=BASE_MODEL)
+    parser.add_argument("--players", default=PLAYERS_FILE)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if torch is None or AutoModel is None:
+        raise SystemExit("Exporting and checking the embedder needs torch and transformers")
+    if args.command == "export":
+        export(args.out, args.format, args.model, args.players)
+    elif args.command == "check":
+        check(args.out, args.players)
+    else:
+        benchmark(args.out, args.players, args.queries, args.batch_size, args.threads)
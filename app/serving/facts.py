@@ -0,0 +1,255 @@
+# facts.py
+import argparse
+import json
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import Counter as MetricCounter, Histogram
+
+from serving.query_log import log_files
+from serving.singleflight import normalize_question
+from storage.entity_resolution import normalize_name
+from storage.player_table import PlayerTable
+from storage.players import PLAYERS_FILE, iter_players
+
+ASK_FAST_PATH = MetricCounter(
+    "sports_ask_fast_path_total", "/ask questions by whether the fact fast path answered", ["result"]
+)
+ASK_LATENCY = Histogram(
+    "sports_ask_latency_seconds",
+    "/ask answer latency by path",
+    ["path"],
+    buckets=(0.0001, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# Whole-question forms (after normalize_question) -> player field. A question
+# only takes the fast path if it is exactly one of these with a player name in
+# the slot, so qualifiers ("...in high school", "...in 2019") fall through.
+_NAME = r"([a-z0-9 ]+?)"  # the only capturing group in each form
+_WHAT_IS = r"(?:what is|whats)"
+FACT_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    (field, re.compile("(?:" + "|".join(forms) + r")(?: please)?"))
+    for field, forms in (
+        (
+            "position",
+            (
+                rf"(?:what|which) position (?:does|do) {_NAME} play",
+                rf"what position is {_NAME}",
+                rf"{_WHAT_IS} {_NAME} position",
+                rf"{_WHAT_IS} the position of {_NAME}",
+            ),
+        ),
+        (
+            "team",
+            (
+                rf"(?:what|which) (?:nfl )?team (?:is|does) {_NAME} (?:on|play for|playing for)",
+                rf"who does {_NAME} play for",
+                rf"who is {_NAME} playing for",
+            ),
+        ),
+        (
+            "birth_year",
+            (
+                rf"(?:when|what year) was {_NAME} born",
+                rf"{_WHAT_IS} {_NAME} birth year",
+            ),
+        ),
+        (
+            "height",
+            (
+                rf"how tall is {_NAME}",
+                rf"{_WHAT_IS} {_NAME} height",
+                rf"{_WHAT_IS} the height of {_NAME}",
+            ),
+        ),
+        (
+            "honors",
+            (
+                rf"what (?:honors|honours|awards|achievements|trophies) (?:has|did) {_NAME} (?:won|win|received|earned)",
+                rf"what are {_NAME} (?:honors|honours|awards|achievements|trophies)",
+            ),
+        ),
+    )
+]
+_MAX_NAME_TOKENS = 4
+
+
+def classify(question: str) -> Optional[Tuple[str, str]]:
+    """(player field, name slot) for a simple factual question, if it is one"""
+    text = normalize_question(question)
+    for field, pattern in FACT_PATTERNS:
+        match = pattern.fullmatch(text)
+        if match:
+            return field, next(name for name in match.groups() if name)
+    return None
+
+
+class FactIndex:
+    """
+    Answers single-player factual questions straight from the player table.
+
+    Names are indexed by their normalized form. A question is answered only
+    if it is one of FACT_PATTERNS with exactly a player's name in the slot,
+    and only for fields the table has any values for (e.g. "team" is empty
+    in HTML-crawled data). A name may map to several rows (duplicate crawl
+    records or namesakes); it is only answered when their non-empty values
+    agree.
+    """
+
+    def __init__(self, player_table: PlayerTable):
+        self.player_table = player_table
+        self.names: Dict[str, List[int]] = defaultdict(list)
+        for row in range(len(player_table)):
+            key = normalize_name(player_table.name(row))
+            if key:
+                self.names[key].append(row)
+        self.names = dict(self.names)
+        self.fields = {
+            field
+            for field, _ in FACT_PATTERNS
+            if any(player_table.field(row, field) for row in range(len(player_table)))
+        }
+
+    def lookup(self, name: str) -> Optional[List[int]]:
+        """Rows for a name slot; possessives arrive normalized ("jacksons", "andrewss")"""
+        key = normalize_name(name)
+        rows = self.names.get(key)
+        if rows is None and key.endswith("s"):
+            rows = self.names.get(key[:-1])
+        return rows
+
+    def find_players(self, question: str) -> List[List[int]]:
+        """Rows for each distinct player named in the question"""
+        tokens = normalize_name(re.sub(r"['’]s\b", "", question)).split()
+        players = []
+        i = 0
+        while i < len(tokens):
+            for size in range(min(_MAX_NAME_TOKENS, len(tokens) - i), 1, -1):
+                rows = self.names.get(" ".join(tokens[i : i + size]))
+                if rows is not None:
+                    if rows not in players:
+                        players.append(rows)
+                    i += size
+                    break
+            else:
+                i += 1
+        return players
+
+    def answer(self, question: str) -> Optional[Dict]:
+        """Answer from structured fields, or None to fall back to retrieval + LLM"""
+        intent = classify(question)
+        if intent is None or intent[0] not in self.fields:
+            return None
+        field, name = intent
+        rows = self.lookup(name)
+        if rows is None:
+            return None
+        values = {}
+        for row in rows:
+            value = self.player_table.field(row, field)
+            if value:
+                values.setdefault(repr(value), (row, value))
+        if len(values) != 1:
+            return None
+        row, value = next(iter(values.values()))
+
+        name = self.player_table.name(row)
+        if field == "position":
+            text = f"{name} plays {value}."
+        elif field == "team":
+            text = f"{name} plays for the {value}."
+        elif field == "birth_year":
+            text = f"{name} was born in {value}."
+        elif field == "height":
+            text = f"{name} is {value} tall."
+        else:
+            honors = ", ".join(
+                f"{h['honor']} ({h['year']})" if h["year"] else h["honor"] for h in value
+            )
+            text = f"{name}'s honors: {honors}."
+        return {"answer": text, "field": field, "id": self.player_table.field(row, "id")}
+
+
+def _sample_questions(player_table: PlayerTable, limit: int) -> List[str]:
+    """A mixed workload: one templated factual question per field plus open questions"""
+    templates = [
+        "What position does {} play?",
+        "What team is {} on?",
+        "When was {} born?",
+        "How tall is {}?",
+        "What honors has {} won?",
+        "Tell me about {}'s career",
+        "Is {} better than the other quarterbacks this year?",
+    ]
+    questions = []
+    for row in range(min(limit, len(player_table))):
+        name = player_table.name(row)
+        questions.append(templates[row % len(templates)].format(name))
+    return questions
+
+
+def load_questions(paths: List[str]) -> List[str]:
+    """Questions from query log files (JSONL with "q") or plain text, one per line"""
+    questions = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if path.endswith(".jsonl"):
+                    try:
+                        line = json.loads(line)["q"]
+                    except (ValueError, KeyError):
+                        continue  # torn last line from a crash
+                questions.append(line)
+    return questions
+
+
+def benchmark(path: str = PLAYERS_FILE, limit: int = 1000, question_files: Optional[List[str]] = None):
+    """
+    Report fast path coverage and per-question latency on logged questions
+    (`question_files`, else the query log); the templated workload is only a
+    fallback and overstates coverage, since every question names a player.
+    """
+    table = PlayerTable.from_records(iter_players(path))
+    start = time.perf_counter()
+    facts = FactIndex(table)
+    print(f"Indexed {len(facts.names)} player names in {time.perf_counter() - start:.3f}s")
+    print(f"Fields with data: {', '.join(sorted(facts.fields))}")
+
+    question_files = question_files or log_files()
+    if question_files:
+        questions = load_questions(question_files)[:limit]
+        source = f"{len(question_files)} question files"
+    else:
+        questions = _sample_questions(table, limit)
+        source = "templated questions (no query log found; coverage is optimistic)"
+
+    hits = Counter()
+    start = time.perf_counter()
+    for question in questions:
+        fact = facts.answer(question)
+        if fact is not None:
+            hits[fact["field"]] += 1
+    elapsed = time.perf_counter() - start
+    total = sum(hits.values())
+    print(
+        f"Fast path answered {total}/{len(questions)} questions from {source} "
+        f"({total / max(len(questions), 1):.0%}; {dict(hits)}), "
+        f"{elapsed / max(len(questions), 1) * 1e6:.1f} µs per question"
+    )
+    print("Compare with sports_ask_latency_seconds{path=\"rag\"} on /metrics for the LLM path")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Structured-fact fast path benchmark")
+    parser.add_argument("--players", default=PLAYERS_FILE)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument(
+        "--questions", nargs="+", help="Query log (.jsonl) or text files of real questions"
+    )
+    args = parser.parse_args()
+    benchmark(args.players, args.limit, args.questions)
@@ -0,0 +1,460 @@
+# generation.py
+import abc
+import argparse
+import json
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional
+
+import openai
+from prometheus_client import Histogram
+
+try:
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+except ImportError:
+    torch = None
+    AutoModelForCausalLM = AutoTokenizer = None
+
+GENERATION_SECONDS = Histogram(
+    "sports_generation_seconds",
+    "Answer generation time by backend",
+    ["backend"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32),
+)
+LOCAL_BATCH_SIZE = Histogram(
+    "sports_local_llm_batch_size", "Requests decoded together by the local LLM", buckets=(1, 2, 4, 8, 16)
+)
+
+SYSTEM_PROMPT = "You are an intelligent assistant knowledgeable about NFL players. Only answer questions about the NFL. If the question is not about the NFL, say 'I'm sorry, but I can only answer questions about the NFL.'"
+USER_INSTRUCTION = "Use the following context to answer the question like you are a sports expert."
+
+
+def user_prompt(question: str, context: str) -> str:
+    return f"{USER_INSTRUCTION}\n\nContext:\n{context}\n\nQuestion: {question}"
+
+
+class Generator(abc.ABC):
+    """Turns a question plus retrieved context into an answer"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def stream(self, question: str, context: str) -> Iterator[str]:
+        """Yield the answer in pieces as they are produced"""
+
+    def generate(self, question: str, context: str) -> str:
+        start = time.perf_counter()
+        try:
+            return "".join(self.stream(question, context)).strip()
+        finally:
+            GENERATION_SECONDS.labels(backend=self.name).observe(time.perf_counter() - start)
+
+
+class OpenAIGenerator(Generator):
+    """Remote chat completion; `api_base` can point at any OpenAI-compatible server"""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        max_tokens: int = 300,
+        temperature: float = 0.7,
+        api_base: Optional[str] = None,
+    ):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.api_base = api_base
+
+    def _create(self, question: str, context: str, stream: bool):
+        kwargs = {"api_base": self.api_base} if self.api_base else {}
+        return openai.ChatCompletion.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt(question, context)},
+            ],
+            max_tokens=self.max_tokens,
+            n=1,
+            stop=None,
+            temperature=self.temperature,
+            stream=stream,
+            **kwargs,
+        )
+
+    def generate(self, question: str, context: str) -> str:
+        # One round-trip without streaming overhead
+        start = time.perf_counter()
+        try:
+            response = self._create(question, context, stream=False)
+            return response.choices[0].message["content"].strip()
+        finally:
+            GENERATION_SECONDS.labels(backend=self.name).observe(time.perf_counter() - start)
+
+    def stream(self, question: str, context: str) -> Iterator[str]:
+        for chunk in self._create(question, context, stream=True):
+            piece = chunk.choices[0].delta.get("content")
+            if piece:
+                yield piece
+
+
+class FallbackGenerator(Generator):
+    """Use `primary`, switching to `secondary` when it raises (e.g. OpenAI unreachable)"""
+
+    def __init__(self, primary: Generator, secondary: Generator):
+        self.primary = primary
+        self.secondary = secondary
+        self.name = f"{primary.name}+{secondary.name}"
+
+    def generate(self, question: str, context: str) -> str:
+        try:
+            return self.primary.generate(question, context)
+        except Exception as e:
+            print(f"{self.primary.name} generation failed ({e}), using {self.secondary.name}")
+            return self.secondary.generate(question, context)
+
+    def stream(self, question: str, context: str) -> Iterator[str]:
+        produced = False
+        try:
+            for piece in self.primary.stream(question, context):
+                produced = True
+                yield piece
+            return
+        except Exception as e:
+            if produced:
+                raise
+            print(f"{self.primary.name} streaming failed ({e}), using {self.secondary.name}")
+        yield from self.secondary.stream(question, context)
+
+
+class _Request:
+    __slots__ = ("prompt_ids", "pieces", "enqueued")
+
+    def __init__(self, prompt_ids: List[int]):
+        self.prompt_ids = prompt_ids
+        self.pieces: "queue.Queue[Optional[object]]" = queue.Queue()
+        self.enqueued = time.perf_counter()
+
+
+class BatchScheduler:
+    """
+    Collects concurrent requests into batches for one model-owning thread.
+
+    The worker waits up to `max_wait` after the first request for up to
+    `max_batch` requests, then hands them to `run_batch`, which pushes text
+    pieces into each request's queue and a final None (or an exception).
+    Prompts longer than `max_prompt` tokens are rejected in `submit`, so one
+    oversized request fails on its own instead of failing its whole batch.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[_Request]], None],
+        max_batch: int = 8,
+        max_wait: float = 0.01,
+        max_prompt: Optional[int] = None,
+    ):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_prompt = max_prompt
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="local-llm", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt_ids: List[int]) -> Iterator[str]:
+        if not prompt_ids or (self.max_prompt is not None and len(prompt_ids) > self.max_prompt):
+            raise ValueError(
+                f"Prompt of {len(prompt_ids)} tokens does not fit the model (max {self.max_prompt})"
+            )
+        request = _Request(prompt_ids)
+        self._queue.put(request)
+        while True:
+            piece = request.pieces.get()
+            if piece is None:
+                return
+            if isinstance(piece, Exception):
+                raise piece
+            yield piece
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            LOCAL_BATCH_SIZE.observe(len(batch))
+            try:
+                self.run_batch(batch)
+            except Exception as e:
+                print(f"Local generation batch failed: {e}")
+                for request in batch:
+                    request.pieces.put(e)
+
+
+class LocalGenerator(Generator):
+    """
+    Small causal LM on CPU.
+
+    - The fixed system prompt + instruction prefix is run through the model
+      once at load time; its key/value cache is reused by every request, so
+      each prompt only pays for its own context and question tokens.
+    - Concurrent requests are decoded together in one batch (see
+      BatchScheduler), with per-row attention masks and positions so prompts
+      of different lengths share the cached prefix.
+    - Tokens are streamed to each caller as they are decoded.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_name: str = "distilgpt2",
+        max_new_tokens: int = 128,
+        max_batch: int = 8,
+        max_wait: float = 0.01,
+        temperature: float = 0.0,
+        threads: Optional[int] = None,
+    ):
+        if torch is None:
+            raise RuntimeError("The local LLM backend needs torch and transformers installed")
+        if threads:
+            torch.set_num_threads(threads)
+        self.model_name = model_name
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForCausalLM.from_pretrained(model_name)
+        self.model.eval()
+        self.eos_id = self.tokenizer.eos_token_id
+        self.pad_id = self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None else self.eos_id
+        self.max_positions = getattr(self.model.config, "n_positions", None) or getattr(
+            self.model.config, "max_position_embeddings", 1024
+        )
+
+        # Run the shared prefix once and keep its KV cache
+        prefix = f"{SYSTEM_PROMPT}\n\n{USER_INSTRUCTION}\n\nContext:\n"
+        self.prefix_ids = self.tokenizer(prefix, return_tensors="pt").input_ids
+        with torch.no_grad():
+            out = self.model(input_ids=self.prefix_ids, use_cache=True)
+        self.prefix_cache = tuple(tuple(t for t in layer) for layer in out.past_key_values)
+        self.prefix_len = self.prefix_ids.shape[1]
+        print(f"Local LLM {model_name} loaded, cached {self.prefix_len}-token prompt prefix")
+
+        self.scheduler = BatchScheduler(
+            self._run_batch,
+            max_batch=max_batch,
+            max_wait=max_wait,
+            max_prompt=self.max_positions - self.prefix_len - self.max_new_tokens,
+        )
+
+    def _prompt_ids(self, question: str, context: str) -> List[int]:
+        """Tokens after the cached prefix, trimming the context (not the question) to fit"""
+        tail = self.tokenizer(f"\n\nQuestion: {question}\nAnswer:").input_ids
+        budget = self.max_positions - self.prefix_len - self.max_new_tokens - len(tail)
+        context_ids = self.tokenizer(context).input_ids[: max(budget, 0)]
+        return context_ids + tail
+
+    def stream(self, question: str, context: str) -> Iterator[str]:
+        return self.scheduler.submit(self._prompt_ids(question, context))
+
+    def _expand_cache(self, batch_size: int):
+        return tuple(
+            tuple(t.expand(batch_size, *t.shape[1:]).contiguous() for t in layer)
+            for layer in self.prefix_cache
+        )
+
+    def _run_batch(self, batch: List[_Request]):
+        size = len(batch)
+        longest = max(len(r.prompt_ids) for r in batch)
+
+        # Left-pad prompts so every row's last prompt token is in the final column
+        input_ids = torch.full((size, longest), self.pad_id, dtype=torch.long)
+        mask = torch.zeros((size, self.prefix_len + longest), dtype=torch.long)
+        mask[:, : self.prefix_len] = 1
+        for i, request in enumerate(batch):
+            n = len(request.prompt_ids)
+            input_ids[i, longest - n :] = torch.tensor(request.prompt_ids, dtype=torch.long)
+            mask[i, self.prefix_len + longest - n :] = 1
+        # Positions continue from the prefix and skip the padding
+        positions = (mask.cumsum(dim=1) - 1).clamp(min=0)[:, self.prefix_len :]
+
+        generated: List[List[int]] = [[] for _ in batch]
+        emitted = [""] * size
+        finished = [False] * size
+        with torch.no_grad():
+            out = self.model(
+                input_ids=input_ids,
+                attention_mask=mask,
+                position_ids=positions,
+                past_key_values=self._expand_cache(size),
+                use_cache=True,
+            )
+            for _ in range(self.max_new_tokens):
+                logits = out.logits[:, -1, :]
+                if self.temperature > 0:
+                    probs = torch.softmax(logits / self.temperature, dim=-1)
+                    next_ids = torch.multinomial(probs, num_samples=1).squeeze(1)
+                else:
+                    next_ids = logits.argmax(dim=-1)
+
+                for i, token in enumerate(next_ids.tolist()):
+                    if finished[i]:
+                        continue
+                    if token == self.eos_id:
+                        finished[i] = True
+                        batch[i].pieces.put(None)
+                        continue
+                    generated[i].append(token)
+                    # Decode the whole answer so far so multi-token characters come out whole
+                    text = self.tokenizer.decode(generated[i], skip_special_tokens=True)
+                    if len(text) > len(emitted[i]) and not text.endswith("�"):
+                        batch[i].pieces.put(text[len(emitted[i]) :])
+                        emitted[i] = text
+                if all(finished):
+                    break
+
+                mask = torch.cat([mask, torch.ones((size, 1), dtype=torch.long)], dim=1)
+                positions = positions[:, -1:] + 1
+                out = self.model(
+                    input_ids=next_ids.unsqueeze(1),
+                    attention_mask=mask,
+                    position_ids=positions,
+                    past_key_values=out.past_key_values,
+                    use_cache=True,
+                )
+        for i, request in enumerate(batch):
+            if not finished[i]:
+                request.pieces.put(None)
+
+
+def create_generator(backend: str = "openai", **options) -> Generator:
+    """'openai', 'local', or 'openai+local' (remote with the local model as offline fallback)"""
+    remote_options = {k: options[k] for k in ("model", "api_base") if options.get(k)}
+    local_options = {k[len("local_"):]: v for k, v in options.items() if k.startswith("local_") and v}
+    if backend == "openai":
+        return OpenAIGenerator(**remote_options)
+    if backend == "local":
+        return LocalGenerator(**local_options)
+    if backend == "openai+local":
+        return FallbackGenerator(OpenAIGenerator(**remote_options), LocalGenerator(**local_options))
+    raise ValueError(f"Unknown LLM backend {backend!r}")
+
+
+# Benchmark against a stub OpenAI-compatible server
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    latency = 0.5
+    tokens = 60
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        words = [f"word{i} " for i in range(self.tokens)]
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            time.sleep(self.latency / 2)  # time to first token
+            for word in words:
+                chunk = {"choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(self.latency / 2 / len(words))
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+        time.sleep(self.latency)
+        data = json.dumps(
+            {
+                "id": "stub",
+                "object": "chat.completion",
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": "".join(words)}, "finish_reason": "stop"}
+                ],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve_stub(port: int = 8089, latency: float = 0.5, tokens: int = 60) -> ThreadingHTTPServer:
+    """Start a stub chat-completions server in the background (for benchmarks only)"""
+    _StubHandler.latency = latency
+    _StubHandler.tokens = tokens
+    server = ThreadingHTTPServer(("127.0.0.1", port), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def benchmark(generator: Generator, requests: int = 32, concurrency: int = 8) -> Dict:
+    """Latency percentiles, time to first token and throughput for `requests` answers"""
+    context = "Lamar Jackson (born January 7, 1997) is an American football quarterback for the Baltimore Ravens. " * 8
+
+    def one(i):
+        start = time.perf_counter()
+        first = None
+        for piece in generator.stream(f"Question {i}: how good is Lamar Jackson?", context):
+            if first is None:
+                first = time.perf_counter() - start
+        return time.perf_counter() - start, first or 0.0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(r[0] for r in results)
+    report = {
+        "backend": generator.name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "p50_s": round(statistics.median(latencies), 3),
+        "p95_s": round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+        "ttft_p50_s": round(statistics.median(r[1] for r in results), 3),
+        "throughput_rps": round(requests / elapsed, 2),
+    }
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark answer generation backends")
+    parser.add_argument("--backends", nargs="+", default=["openai", "local"])
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stub-latency", type=float, default=0.5, help="Seconds per stub completion")
+    parser.add_argument("--stub-port", type=int, default=8089)
+    parser.add_argument("--local-model", default="distilgpt2")
+    parser.add_argument("--local-max-new-tokens", type=int, default=64)
+    parser.add_argument("--local-threads", type=int, default=None)
+    args = parser.parse_args()
+
+    openai.api_key = openai.api_key or "stub"
+    stub = serve_stub(args.stub_port, args.stub_latency)
+    for backend in args.backends:
+        generator = create_generator(
+            backend,
+            api_base=f"http://127.0.0.1:{args.stub_port}/v1",
+            local_model_name=args.local_model,
+            local_max_new_tokens=args.local_max_new_tokens,
+            local_threads=args.local_threads,
+        )
+        benchmark(generator, args.requests, args.concurrency)
+    stub.shutdown()
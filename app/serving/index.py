@@ -0,0 +1,391 @@
+# index.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import Gauge
+
+from serving.facts import FactIndex
+from serving.rerank import description_terms
+from serving.router import shard_name
+from storage.dedup import collapse_duplicates
+from storage.player_table import PlayerTable
+from storage.players import DATA_DIR
+
+INDEX_GENERATION = Gauge("sports_index_generation", "Generation number of the live index")
+INDEX_BUILD_SECONDS = Gauge(
+    "sports_index_build_seconds", "Wall time spent building the live index generation"
+)
+INDEX_DOCUMENTS = Gauge("sports_index_documents", "Documents in the live index generation")
+INDEX_EMBEDDED = Gauge(
+    "sports_index_embedded_documents",
+    "Documents the last build had to embed (the rest reused the previous generation's vectors)",
+)
+
+COLLECTION_PREFIX = "sports"
+
+# Recommended HNSW/metric settings written by `python -m serving.index_tuning`
+INDEX_CONFIG_FILE = os.path.join(DATA_DIR, "index_config.json")
+
+
+def load_index_config(path: str = INDEX_CONFIG_FILE) -> Optional[Dict]:
+    """Collection metadata (hnsw:space, hnsw:M, ...) from the tuning report, or None for Chroma's defaults"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)["collection_metadata"]
+        print(f"Using index config from {path}: {metadata}")
+        return metadata
+    except Exception as e:
+        print(f"Error reading index config {path}, using defaults: {e}")
+        return None
+
+
+class IndexGeneration:
+    """One immutable, fully built index: per-league Chroma collections plus the table they point into"""
+
+    __slots__ = (
+        "number",
+        "shards",
+        "shard_sizes",
+        "player_table",
+        "ids",
+        "source",
+        "build_seconds",
+        "facts",
+        "team_patterns",
+        "terms",
+        "text_index",
+        "embedded",
+    )
+
+    def __init__(
+        self, number, shards, shard_sizes, player_table, ids, source, build_seconds, text_index=None, embedded=0
+    ):
+        self.number = number
+        self.shards = shards
+        self.shard_sizes = shard_sizes
+        self.player_table = player_table
+        self.ids = ids
+        self.source = source
+        self.build_seconds = build_seconds
+        self.facts = FactIndex(player_table)
+        self.team_patterns = _team_patterns(player_table, shard_sizes)
+        self.terms = description_terms(player_table)
+        # sha1(document text) -> (shard, id), so the next build can reuse this generation's vectors
+        self.text_index: Dict[str, Tuple[str, str]] = text_index or {}
+        self.embedded = embedded
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _reused_embeddings(previous: Optional[IndexGeneration], keys: List[str]) -> Dict[str, List[float]]:
+    """Vectors the previous generation already computed for these texts"""
+    if previous is None:
+        return {}
+    wanted: Dict[str, Dict[str, str]] = {}
+    for key in keys:
+        location = previous.text_index.get(key)
+        if location and location[0] in previous.shards:
+            wanted.setdefault(location[0], {})[location[1]] = key
+    found = {}
+    for shard, by_id in wanted.items():
+        try:
+            result = previous.shards[shard].get(ids=list(by_id), include=["embeddings"])
+        except Exception as e:
+            print(f"Could not read embeddings from generation {previous.number} ({shard}): {e}")
+            continue
+        for doc_id, embedding in zip(result["ids"], result["embeddings"]):
+            found[by_id[doc_id]] = [float(x) for x in embedding]
+    return found
+
+
+def _team_patterns(player_table, shards) -> Dict[str, re.Pattern]:
+    """Per-shard regex of the team names seen in that league, for query routing"""
+    teams: Dict[str, set] = {}
+    for row in range(len(player_table)):
+        team = player_table.field(row, "team").strip().lower()
+        if len(team) > 3:
+            teams.setdefault(shard_name(player_table.field(row, "league")), set()).add(team)
+    return {
+        shard: re.compile(r"\b(" + "|".join(map(re.escape, sorted(names))) + r")\b")
+        for shard, names in teams.items()
+        if shard in shards
+    }
+
+
+def build_generation(
+    number: int,
+    chroma_client,
+    embed: Callable[[str], List[float]],
+    players: Iterable[dict],
+    source=None,
+    collection_metadata: Optional[Dict] = None,
+    previous: Optional[IndexGeneration] = None,
+) -> IndexGeneration:
+    """
+    Build collections `sports_g<number>_<league>` from `players` without
+    touching the live generation; players without a league go to the NFL shard.
+    `collection_metadata` sets the HNSW parameters and distance metric.
+
+    Descriptions whose text is unchanged since `previous` reuse its vectors,
+    so after an incremental refresh only the new and changed players are
+    embedded and removed ones simply drop out.
+    """
+    start = time.perf_counter()
+
+    # Load players into the compact columnar table used for serving
+    player_table = PlayerTable.from_records(players)
+    print(f"\nLoaded {len(player_table)} players from JSON")
+
+    # Convert to documents format; descriptions stay in the table, we only track rows
+    rows = []
+    ids = []
+    seen_names = set()
+
+    for idx in range(len(player_table)):
+        # Only process if we have a description and it's not a placeholder
+        description = player_table.description(idx).strip()
+        if description and description != "--- add one?":
+            # Extract name from description (usually first sentence up to first parenthesis)
+            name_match = re.match(r"^([^(]+)", description)
+            if name_match:
+                name = name_match.group(1).strip()
+
+                # Prefer the stable id from entity resolution, else derive one from the name
+                unique_id = player_table.field(idx, "id") or f"{name}_{idx}"
+
+                if unique_id in seen_names:
+                    print(f"Skipping duplicate player: {unique_id}")
+                    continue
+
+                seen_names.add(unique_id)
+                rows.append(idx)
+                ids.append(unique_id)
+
+    # Collapse duplicate and near-identical biographies before embedding
+    id_by_row = dict(zip(rows, ids))
+    rows, collapsed = collapse_duplicates(
+        (row, player_table.description(row), player_table.field(row, "name")) for row in rows
+    )
+    ids = [id_by_row[row] for row in rows]
+    print(f"Collapsed {collapsed} near-duplicate descriptions")
+
+    # Partition by league so each question only searches the leagues it is about
+    by_shard: Dict[str, List[Tuple[int, str]]] = {}
+    for row, unique_id in zip(rows, ids):
+        shard = shard_name(player_table.field(row, "league"))
+        by_shard.setdefault(shard, []).append((row, unique_id))
+
+    shards, shard_sizes = {}, {}
+    text_index: Dict[str, Tuple[str, str]] = {}
+    embedded = 0
+    for shard, members in sorted(by_shard.items()):
+        name = f"{COLLECTION_PREFIX}_g{number}_{shard}"
+        try:
+            chroma_client.delete_collection(name=name)
+        except Exception:
+            pass
+        collection = chroma_client.get_or_create_collection(name=name, metadata=collection_metadata)
+
+        # Generate embeddings, reusing the previous generation's for unchanged texts
+        print(f"Processing {len(members)} unique players for shard {shard}...")
+        texts = [player_table.description(row).strip() for row, _ in members]
+        keys = [text_key(text) for text in texts]
+        reused = _reused_embeddings(previous, keys)
+        embeddings = []
+        for text, key in zip(texts, keys):
+            if key not in reused:
+                reused[key] = embed(text)
+                embedded += 1
+            embeddings.append(reused[key])
+        for key, (_, unique_id) in zip(keys, members):
+            text_index.setdefault(key, (shard, unique_id))
+
+        # Add to collection; the table row is the only copy of the text we keep
+        collection.add(
+            embeddings=embeddings,
+            metadatas=[{"row": row} for row, _ in members],
+            ids=[unique_id for _, unique_id in members],
+        )
+        shards[shard] = collection
+        shard_sizes[shard] = len(members)
+        print(f"Added {len(members)} players to vector database ({name})")
+
+    if not shards:
+        print("No players to add to vector database!")
+    print(f"Embedded {embedded} documents, reused {len(ids) - embedded} from the previous generation")
+
+    return IndexGeneration(
+        number,
+        shards,
+        shard_sizes,
+        player_table,
+        ids,
+        source,
+        time.perf_counter() - start,
+        text_index,
+        embedded,
+    )
+
+
+class IndexRefresher:
+    """
+    Holds the live index generation and rebuilds it in the background.
+
+    A watcher thread polls the player data (file mtime/size plus an optional
+    version file). When it changes, a new generation is built off the
+    request path and swapped in with a single reference assignment.
+    Requests that query Chroma pin a generation with `acquire()`, so in-flight
+    ones finish on the generation they started with. Retired generations
+    beyond the newest `retain` have their collections dropped once no request
+    holds them any more, however quickly swaps follow each other.
+    """
+
+    def __init__(
+        self,
+        chroma_client,
+        embed: Callable[[str], List[float]],
+        source: Callable[[], str],
+        load: Callable[[str], Iterable[dict]],
+        version_file: Optional[str] = None,
+        interval: float = 60.0,
+        retain: int = 1,
+        collection_metadata: Optional[Dict] = None,
+    ):
+        self.chroma_client = chroma_client
+        self.embed = embed
+        self.source = source
+        self.load = load
+        self.version_file = version_file
+        self.interval = interval
+        self.retain = retain
+        self.collection_metadata = collection_metadata
+        self.current: Optional[IndexGeneration] = None
+        self._retired: List[IndexGeneration] = []
+        self._users: Dict[int, int] = {}  # generation number -> requests holding it
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _signature(self) -> Tuple:
+        path = self.source()
+        try:
+            stat = os.stat(path)
+            signature = (path, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = (path, None, None)
+        if self.version_file and os.path.exists(self.version_file):
+            with open(self.version_file, "r", encoding="utf-8") as f:
+                signature += (f.read().strip(),)
+        return signature
+
+    def drop_stale_collections(self):
+        """Remove index collections left behind by previous processes"""
+        for collection in self.chroma_client.list_collections():
+            # chromadb >= 0.6 lists names; older versions list Collection objects
+            name = collection if isinstance(collection, str) else collection.name
+            if name == COLLECTION_PREFIX or name.startswith(COLLECTION_PREFIX + "_g"):
+                self.chroma_client.delete_collection(name=name)
+                print(f"Deleted existing collection {name}")
+
+    def rebuild(self) -> IndexGeneration:
+        """Build the next generation and swap it in"""
+        with self._build_lock:
+            signature = self._signature()
+            number = self.current.number + 1 if self.current else 1
+            print(f"\nBuilding index generation {number} from {signature[0]}")
+            generation = build_generation(
+                number,
+                self.chroma_client,
+                self.embed,
+                self.load(signature[0]),
+                signature,
+                self.collection_metadata,
+                previous=self.current,
+            )
+            self._swap(generation)
+            return generation
+
+    @contextmanager
+    def acquire(self):
+        """Pin the live generation so its collections outlive a swap until released"""
+        with self._lock:
+            generation = self.current
+            self._users[generation.number] = self._users.get(generation.number, 0) + 1
+        try:
+            yield generation
+        finally:
+            with self._lock:
+                self._users[generation.number] -= 1
+                if not self._users[generation.number]:
+                    del self._users[generation.number]
+                dropped = self._collect()
+            self._drop(dropped)
+
+    def _collect(self) -> List[IndexGeneration]:
+        """Take the retired generations past `retain` that no request holds (caller has the lock)"""
+        expired = self._retired[: max(len(self._retired) - self.retain, 0)]
+        dropped = [old for old in expired if old.number not in self._users]
+        for old in dropped:
+            self._retired.remove(old)
+        return dropped
+
+    def _drop(self, generations: List[IndexGeneration]):
+        for old in generations:
+            for collection in old.shards.values():
+                try:
+                    self.chroma_client.delete_collection(name=collection.name)
+                except Exception as e:
+                    print(f"Error dropping index generation {old.number} ({collection.name}): {e}")
+
+    def _swap(self, generation: IndexGeneration):
+        with self._lock:
+            previous = self.current
+            self.current = generation  # atomic reference swap
+            if previous is not None:
+                self._retired.append(previous)
+            dropped = self._collect()
+        INDEX_GENERATION.set(generation.number)
+        INDEX_BUILD_SECONDS.set(generation.build_seconds)
+        INDEX_DOCUMENTS.set(len(generation.ids))
+        INDEX_EMBEDDED.set(generation.embedded)
+        print(
+            f"Index generation {generation.number} live "
+            f"({len(generation.ids)} docs in shards {generation.shard_sizes}, "
+            f"built in {generation.build_seconds:.1f}s)"
+        )
+
+        self._drop(dropped)
+
+    def changed(self) -> bool:
+        return self.current is None or self._signature() != self.current.source
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if self.changed():
+                    self.rebuild()
+            except Exception as e:
+                print(f"Background index refresh failed: {e}")
+                traceback.print_exc()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="index-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
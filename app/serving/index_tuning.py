@@ -0,0 +1,237 @@
+# index_tuning.py
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import chromadb
+except ImportError:
+    chromadb = None
+
+from serving.index import INDEX_CONFIG_FILE
+from storage.players import DATA_DIR, PLAYERS_FILE, iter_players
+
+TUNING_DIR = os.path.join(DATA_DIR, "index_tuning")
+VECTORS_FILE = os.path.join(TUNING_DIR, "vectors.npz")
+REPORT_FILE = os.path.join(TUNING_DIR, "report.json")
+
+SPACES = ("l2", "cosine", "ip")
+GRID = {
+    "hnsw:M": (8, 16, 32),
+    "hnsw:construction_ef": (100, 200),
+    "hnsw:search_ef": (10, 50, 100),
+}
+QUESTION_TEMPLATES = (
+    "Who is {name}?",
+    "Tell me about {name}",
+    "Which team does {name} play for?",
+    "What position does {name} play?",
+)
+
+
+def build_vectors(players_file: str = PLAYERS_FILE, queries: int = 300, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Embed the roster descriptions and questions about sampled players with
+    the serving embedder. `targets` is the doc each question is about.
+    """
+    from serving.embedder import EMBEDDER_DIR, CompiledEmbedder, eager_embed, load_eager
+
+    names, texts = [], []
+    for player in iter_players(players_file, fields=("name", "description")):
+        description = (player.get("description") or "").strip()
+        if description and description != "--- add one?":
+            names.append(player.get("name") or description.split("(")[0].strip())
+            texts.append(description)
+
+    rng = random.Random(seed)
+    targets = [rng.randrange(len(texts)) for _ in range(queries)]
+    questions = [rng.choice(QUESTION_TEMPLATES).format(name=names[t]) for t in targets]
+
+    if os.path.exists(os.path.join(EMBEDDER_DIR, "embedder.json")):
+        embed_batch = CompiledEmbedder(EMBEDDER_DIR).embed_batch
+    else:
+        tokenizer, module = load_eager()
+        def embed_batch(batch, batch_size=32):
+            return np.vstack(
+                [eager_embed(module, tokenizer, batch[i : i + batch_size]) for i in range(0, len(batch), batch_size)]
+            )
+
+    start = time.perf_counter()
+    docs = np.asarray(embed_batch(texts), dtype=np.float32)
+    query_vectors = np.asarray(embed_batch(questions), dtype=np.float32)
+    print(f"Embedded {len(texts)} docs and {len(questions)} questions in {time.perf_counter() - start:.1f}s")
+    return {"docs": docs, "queries": query_vectors, "targets": np.asarray(targets)}
+
+
+def exact_neighbors(docs: np.ndarray, queries: np.ndarray, space: str, k: int):
+    """Brute-force top-k doc indices per query and their distances, using Chroma's distance for `space`"""
+    if space == "l2":
+        distances = (queries ** 2).sum(axis=1)[:, None] - 2 * queries @ docs.T + (docs ** 2).sum(axis=1)[None, :]
+    elif space == "cosine":
+        unit_docs = docs / np.linalg.norm(docs, axis=1, keepdims=True).clip(min=1e-12)
+        unit_queries = queries / np.linalg.norm(queries, axis=1, keepdims=True).clip(min=1e-12)
+        distances = 1.0 - unit_queries @ unit_docs.T
+    elif space == "ip":
+        distances = 1.0 - queries @ docs.T
+    else:
+        raise ValueError(f"Unknown distance space {space!r}")
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    top_distances = np.take_along_axis(distances, top, axis=1)
+    order = top_distances.argsort(axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_distances, order, axis=1)
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux only)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def measure(client, docs: np.ndarray, queries: np.ndarray, kth_distance: np.ndarray, metadata: Dict, k: int) -> Dict:
+    """
+    Build one collection with `metadata`, then time every query and score
+    recall@k. A hit is any result no farther than the exact k-th neighbour,
+    so duplicate biographies at equal distance don't count as misses.
+    """
+    name = "tuning_" + "_".join(str(v) for v in metadata.values()).replace(":", "")
+    try:
+        client.delete_collection(name=name)
+    except Exception:
+        pass
+
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    collection = client.create_collection(name=name, metadata=metadata)
+    ids = [str(i) for i in range(len(docs))]
+    for offset in range(0, len(docs), 5000):
+        collection.add(ids=ids[offset : offset + 5000], embeddings=docs[offset : offset + 5000].tolist())
+    build_seconds = time.perf_counter() - start
+    rss_after = rss_bytes()
+
+    latencies, recalls = [], []
+    for query, kth in zip(queries, kth_distance):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=["distances"])
+        latencies.append(time.perf_counter() - start)
+        tolerance = 1e-4 * max(abs(kth), 1.0)
+        recalls.append(sum(d <= kth + tolerance for d in result["distances"][0]) / k)
+    client.delete_collection(name=name)
+
+    latencies.sort()
+    return {
+        **metadata,
+        "build_seconds": round(build_seconds, 3),
+        "rss_mb": round((rss_after - rss_before) / 2 ** 20, 1) if rss_before is not None else None,
+        # hnswlib keeps the float32 vectors plus 2*M level-0 links per element
+        "est_index_mb": round(len(docs) * (4 * docs.shape[1] + 8 * metadata["hnsw:M"] + 8) / 2 ** 20, 1),
+        "query_p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "query_p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 3),
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+    }
+
+
+def recommend(results: List[Dict], metric_hits: Dict[str, Optional[float]], k: int, min_recall: float) -> Dict:
+    """
+    Pick the metric that best finds the player a question is about (under
+    exact search), then its fastest HNSW settings that keep recall@k above
+    `min_recall`; when none do, its highest-recall settings.
+    """
+    scored = {space: hit for space, hit in metric_hits.items() if hit is not None}
+    space = max(scored, key=lambda s: (scored[s], s == "l2")) if scored else "l2"
+    candidates = [r for r in results if r["hnsw:space"] == space]
+    passing = [r for r in candidates if r[f"recall@{k}"] >= min_recall]
+    if passing:
+        best = min(passing, key=lambda r: (r["query_p95_ms"], r["build_seconds"]))
+    else:
+        best = max(candidates, key=lambda r: (r[f"recall@{k}"], -r["query_p95_ms"]))
+    return {
+        "collection_metadata": {key: best[key] for key in ("hnsw:space", *GRID)},
+        "measured": {key: value for key, value in best.items() if not key.startswith("hnsw:")},
+        "min_recall": min_recall,
+        "meets_min_recall": bool(passing),
+    }
+
+
+def sweep(
+    vectors: Dict[str, np.ndarray],
+    k: int = 10,
+    spaces: Sequence[str] = SPACES,
+    grid: Dict[str, Sequence[int]] = GRID,
+    min_recall: float = 0.95,
+) -> Dict:
+    if chromadb is None:
+        raise RuntimeError("chromadb is not installed")
+    docs, queries = vectors["docs"].astype(np.float32), vectors["queries"].astype(np.float32)
+    targets = vectors.get("targets")
+    client = chromadb.EphemeralClient()
+    print(f"Sweeping {len(spaces)} metrics x {np.prod([len(v) for v in grid.values()])} HNSW settings over {len(docs)} docs, {len(queries)} queries")
+
+    results, metric_hits = [], {}
+    for space in spaces:
+        truth, truth_distances = exact_neighbors(docs, queries, space, k)
+        # How often exact search under this metric surfaces the player the question names
+        metric_hits[space] = (
+            round(float(np.mean([t in row for t, row in zip(targets, truth)])), 4) if targets is not None else None
+        )
+        print(f"{space}: exact hit@{k} {metric_hits[space]}")
+        for values in itertools.product(*grid.values()):
+            metadata = {"hnsw:space": space, **dict(zip(grid.keys(), values))}
+            result = measure(client, docs, queries, truth_distances[:, -1], metadata, k)
+            results.append(result)
+            print(
+                f"  M={metadata['hnsw:M']:<3} construction_ef={metadata['hnsw:construction_ef']:<4} "
+                f"search_ef={metadata['hnsw:search_ef']:<4} recall@{k}={result[f'recall@{k}']:.3f} "
+                f"p95={result['query_p95_ms']:.2f}ms build={result['build_seconds']:.2f}s"
+            )
+
+    return {
+        "docs": len(docs),
+        "queries": len(queries),
+        "dimensions": int(docs.shape[1]),
+        "k": k,
+        "exact_hit_rate": metric_hits,
+        "results": results,
+        "recommended": recommend(results, metric_hits, k, min_recall),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HNSW parameter and distance metric sweep for the player index")
+    parser.add_argument("--players", default=PLAYERS_FILE)
+    parser.add_argument("--vectors", default=VECTORS_FILE, help="Cached doc/query embeddings (.npz); built if missing")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--spaces", nargs="+", default=list(SPACES), choices=SPACES)
+    parser.add_argument("--report", default=REPORT_FILE)
+    parser.add_argument("--config", default=INDEX_CONFIG_FILE, help="Where to write the recommended config")
+    args = parser.parse_args()
+
+    if os.path.exists(args.vectors):
+        vectors = dict(np.load(args.vectors))
+        print(f"Loaded cached embeddings from {args.vectors}")
+    else:
+        vectors = build_vectors(args.players, args.queries)
+        os.makedirs(os.path.dirname(args.vectors) or ".", exist_ok=True)
+        np.savez(args.vectors, **vectors)
+
+    report = sweep(vectors, args.k, args.spaces, min_recall=args.min_recall)
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    with open(args.config, "w") as f:
+        json.dump(report["recommended"], f, indent=2)
+    print(f"Report written to {args.report}")
+    print(f"Recommended config {report['recommended']['collection_metadata']} written to {args.config}")
+    if not report["recommended"]["meets_min_recall"]:
+        print(f"Warning: no setting reached recall@{args.k} >= {args.min_recall}; recommended the highest-recall one")
@@ -0,0 +1,178 @@
+# query_log.py
+import glob
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from prometheus_client import Counter as MetricCounter
+
+from serving.singleflight import normalize_question
+from storage.durable import file_sha256
+from storage.players import DATA_DIR
+
+QUERY_LOG_DIR = os.path.join(DATA_DIR, "query_log")
+WARM_START_FILE = os.path.join(DATA_DIR, "warm_start.json")
+
+QUERY_LOG_WRITTEN = MetricCounter("sports_query_log_written_total", "Questions appended to the query log")
+
+MAX_QUESTION_CHARS = 200
+
+# Scrubbed before anything touches disk: the log is for finding popular questions, not people
+_PII_PATTERNS = (
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"\+?\d[\d ()-]{7,}\d"), "<number>"),
+)
+
+# Dropped when grouping variants of a question ("tell me about lamar jackson" / "about lamar jackson")
+_CLUSTER_STOPWORDS = {"a", "an", "the", "me", "tell", "about", "please", "can", "you"}
+
+
+def scrub(question: str) -> str:
+    for pattern, placeholder in _PII_PATTERNS:
+        question = pattern.sub(placeholder, question)
+    return question[:MAX_QUESTION_CHARS]
+
+
+def cluster_key(normalized: str) -> str:
+    # Word order is kept: "did ravens beat steelers" and "did steelers beat ravens" differ
+    return " ".join(t for t in normalized.split() if t not in _CLUSTER_STOPWORDS) or normalized
+
+
+class QueryLog:
+    """
+    Sampled, append-only log of the questions /ask receives.
+
+    Only a `sample_rate` fraction of questions is kept, after PII scrubbing
+    and normalization; no client id, IP or answer is recorded and timestamps
+    are truncated to the hour. Lines go to one JSONL file per day from a
+    background thread, so logging never blocks a request.
+    """
+
+    def __init__(self, directory: str = QUERY_LOG_DIR, sample_rate: float = 0.1):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=10000)
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, name="query-log", daemon=True)
+        self._thread.start()
+
+    def log(self, question: str, endpoint: str):
+        if random.random() >= self.sample_rate:
+            return
+        normalized = normalize_question(scrub(question))
+        if not normalized:
+            return
+        hour = int(time.time()) // 3600 * 3600
+        try:
+            self._queue.put_nowait({"ts": hour, "q": normalized, "endpoint": endpoint})
+        except queue.Full:
+            pass  # sampling is lossy anyway; never slow /ask down
+
+    def _write_loop(self):
+        while True:
+            entry = self._queue.get()
+            day = time.strftime("%Y%m%d", time.gmtime(entry["ts"]))
+            try:
+                with open(os.path.join(self.directory, f"queries-{day}.jsonl"), "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+                    # Drain whatever queued up meanwhile in the same open
+                    while not self._queue.empty():
+                        f.write(json.dumps(self._queue.get_nowait()) + "\n")
+                        QUERY_LOG_WRITTEN.inc()
+                QUERY_LOG_WRITTEN.inc()
+            except Exception as e:
+                print(f"Error writing query log: {e}")
+
+
+def log_files(directory: str = QUERY_LOG_DIR, days: Optional[int] = None) -> List[str]:
+    paths = sorted(glob.glob(os.path.join(directory, "queries-*.jsonl")))
+    return paths[-days:] if days else paths
+
+
+def purge(directory: str = QUERY_LOG_DIR, keep_days: int = 30) -> int:
+    """Delete log files beyond the retention window"""
+    paths = log_files(directory)
+    old = paths[:-keep_days] if keep_days else paths
+    for path in old:
+        os.remove(path)
+    return len(old)
+
+
+def mine(paths: Iterable[str], top_n: int = 200, min_count: int = 3) -> List[Dict]:
+    """
+    Most frequent question clusters in the log. Variants that differ only
+    in filler words form one cluster, represented by its most common
+    wording. Clusters asked fewer than `min_count` times are never emitted,
+    so one-off questions don't leave the log.
+    """
+    variants: Dict[str, Counter] = defaultdict(Counter)
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    question = json.loads(line)["q"]
+                except (ValueError, KeyError):
+                    continue  # torn last line from a crash
+                variants[cluster_key(question)][question] += 1
+
+    clusters = []
+    for key, counter in variants.items():
+        total = sum(counter.values())
+        if total >= min_count:
+            clusters.append(
+                {
+                    "cluster": key,
+                    "question": counter.most_common(1)[0][0],
+                    "variants": [question for question, _ in counter.most_common()],
+                    "count": total,
+                }
+            )
+    clusters.sort(key=lambda cluster: (-cluster["count"], cluster["cluster"]))
+    return clusters[:top_n]
+
+
+class WarmStart:
+    """
+    Precomputed answers, contexts and embeddings for the most asked
+    questions (built by `python prewarm.py`), keyed by question cluster.
+    Entries whose answer could not be generated still carry their
+    retrieved docs, which saves the embedding and vector search.
+
+    The artifact records the players file it was built from and is only
+    used while the live index still serves that data.
+    """
+
+    def __init__(self, entries: List[Dict], players_sha256: str = ""):
+        self.players_sha256 = players_sha256
+        self.entries = {entry["cluster"]: entry for entry in entries}
+        self.generation: Optional[int] = None
+
+    @classmethod
+    def load(cls, path: str = WARM_START_FILE, players_file: Optional[str] = None) -> Optional["WarmStart"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+        if players_file and artifact.get("players_sha256") != file_sha256(players_file):
+            print(f"Warm-start artifact {path} was built from different player data, ignoring it")
+            return None
+        return cls(artifact["entries"], artifact.get("players_sha256", ""))
+
+    def attach(self, generation: int):
+        """Serve entries only while this index generation is live"""
+        self.generation = generation
+
+    def get(self, question: str, generation: Optional[int] = None) -> Optional[Dict]:
+        if generation is not None and generation != self.generation:
+            return None
+        return self.entries.get(cluster_key(normalize_question(question)))
+
+    def __len__(self):
+        return len(self.entries)
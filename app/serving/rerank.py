@@ -0,0 +1,146 @@
+# rerank.py
+import re
+import time
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+from prometheus_client import Histogram
+
+RETRIEVAL_STAGE_SECONDS = Histogram(
+    "sports_retrieval_stage_seconds",
+    "Time spent in each retrieval cascade stage",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PROMPT_CHARS = Histogram(
+    "sports_prompt_context_chars",
+    "Characters of retrieved context sent to the LLM",
+    buckets=(500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from has have he her his how in is it "
+    "of on or she that the their them they this to was what when where which who "
+    "whom why will with play plays played player players".split()
+)
+# Feature order for the weight vector
+FEATURES = ("vector", "lexical", "name", "metadata")
+DEFAULT_WEIGHTS = (1.0, 1.0, 2.0, 0.5)
+METADATA_FIELDS = ("position", "team", "nationality")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def description_terms(player_table) -> List[FrozenSet[str]]:
+    """Each row's description terms, built once per index generation instead of per request"""
+    return [frozenset(tokenize(player_table.description(row))) for row in range(len(player_table))]
+
+
+class Reranker:
+    """
+    Second stage of the retrieval cascade.
+
+    Stage one pulls `candidate_k` neighbours from Chroma by embedding
+    distance. This stage scores every candidate at once from a small feature
+    matrix and keeps the best `final_k`:
+
+    - vector: similarity from the first stage distance
+    - lexical: IDF-weighted share of question terms found in the description
+    - name: share of the player's name tokens mentioned in the question
+    - metadata: position/team/nationality values mentioned in the question
+    """
+
+    def __init__(
+        self,
+        candidate_k: int = 40,
+        final_k: int = 4,
+        weights: Sequence[float] = DEFAULT_WEIGHTS,
+    ):
+        self.candidate_k = candidate_k
+        self.final_k = final_k
+        self.weights = np.asarray(weights, dtype=np.float32)
+
+    def features(
+        self, question: str, player_table, rows: Sequence[int], distances, row_terms=None
+    ) -> np.ndarray:
+        """One row of FEATURES per candidate; `row_terms` is the generation's description_terms()"""
+        terms = sorted(set(tokenize(question)))
+        question_terms = set(terms)
+        n = len(rows)
+        matrix = np.zeros((n, len(FEATURES)), dtype=np.float32)
+        if n == 0:
+            return matrix
+
+        # Chroma reports distances where smaller is closer; min-max them into [0, 1]
+        distances = np.asarray(distances, dtype=np.float32)
+        spread = distances.max() - distances.min()
+        matrix[:, 0] = 1.0 - (distances - distances.min()) / spread if spread > 0 else 1.0
+
+        if terms:
+            # Term presence matrix [candidates x terms], weighted by IDF within the candidate set
+            presence = np.zeros((n, len(terms)), dtype=np.float32)
+            term_pos = {t: j for j, t in enumerate(terms)}
+            for i, row in enumerate(rows):
+                if row_terms is not None:
+                    doc_terms = row_terms[row]
+                else:
+                    doc_terms = tokenize(player_table.description(row))
+                for token in question_terms.intersection(doc_terms):
+                    presence[i, term_pos[token]] = 1.0
+            idf = np.log1p(n / (1.0 + presence.sum(axis=0)))
+            matrix[:, 1] = presence @ idf / max(idf.sum(), 1e-6)
+
+        lowered = question.lower()
+        for i, row in enumerate(rows):
+            name_tokens = _TOKEN.findall(player_table.name(row).lower())
+            if name_tokens:
+                matrix[i, 2] = sum(t in question_terms for t in name_tokens) / len(name_tokens)
+            matrix[i, 3] = sum(
+                1.0
+                for field in METADATA_FIELDS
+                if (value := player_table.field(row, field)) and value.lower() in lowered
+            )
+        return matrix
+
+    def rerank(
+        self,
+        question: str,
+        player_table,
+        rows: Sequence[int],
+        ids: Sequence[str],
+        distances: Optional[Sequence[float]] = None,
+        row_terms: Optional[Sequence[FrozenSet[str]]] = None,
+    ) -> Tuple[List[int], List[str]]:
+        """Return the top `final_k` rows and ids, best first"""
+        start = time.perf_counter()
+        if distances is None:
+            distances = range(len(rows))  # fall back to first-stage rank order
+        scores = self.features(question, player_table, rows, distances, row_terms) @ self.weights
+        # Stable sort so equal scores keep the first-stage order
+        order = np.argsort(-scores, kind="stable")[: self.final_k]
+        RETRIEVAL_STAGE_SECONDS.labels(stage="rerank").observe(time.perf_counter() - start)
+        return [rows[i] for i in order], [ids[i] for i in order]
+
+
+def retrieve(
+    index, query_embedding, question: str, reranker: Reranker, router
+) -> Tuple[List[int], List[str]]:
+    """Run the cascade against one index generation: wide routed vector search, then rerank"""
+    start = time.perf_counter()
+    results = router.query(
+        index, [question], [query_embedding], reranker.candidate_k, ["metadatas", "distances"]
+    )
+    RETRIEVAL_STAGE_SECONDS.labels(stage="candidates").observe(time.perf_counter() - start)
+    rows = [meta["row"] for meta in results["metadatas"][0]]
+    distances = results.get("distances")
+    return reranker.rerank(
+        question,
+        index.player_table,
+        rows,
+        results["ids"][0],
+        distances[0] if distances else None,
+        index.terms,
+    )
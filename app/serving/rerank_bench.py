@@ -0,0 +1,118 @@
+# rerank_bench.py
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+import chromadb
+
+from serving.embedder import EMBEDDER_DIR, CompiledEmbedder
+from serving.index import build_generation, load_index_config
+from serving.rerank import Reranker
+from serving.router import ShardRouter
+from storage.entity_resolution import normalize_name
+from storage.players import PLAYERS_FILE, iter_players
+
+
+def load_labelled(path: str) -> List[Tuple[str, str]]:
+    """(question, relevant player name) pairs from JSONL lines {"question": ..., "player": ...}"""
+    pairs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                pairs.append((record["question"], record["player"]))
+    return pairs
+
+
+def evaluate(
+    questions_file: str,
+    players_file: str = PLAYERS_FILE,
+    embedder_dir: str = EMBEDDER_DIR,
+    baseline_k: int = 10,
+) -> Dict:
+    """
+    Does the cascade put the relevant player in the prompt more often than
+    plain top-k by embedding distance? Builds a real index generation with
+    the exported embedder and runs labelled questions (taken from the query
+    log, not generated from player names) through the routed Chroma first
+    stage, then compares the prompt contexts each approach would send.
+    """
+    embedder = CompiledEmbedder(embedder_dir)
+    index = build_generation(
+        0,
+        chromadb.EphemeralClient(),
+        embedder.embed,
+        iter_players(players_file),
+        collection_metadata=load_index_config(),
+    )
+    reranker = Reranker()
+    router = ShardRouter(max_workers=2)
+    pairs = load_labelled(questions_file)
+
+    hits = {"top_final": 0, "top_baseline": 0, "cascade": 0}
+    chars = {"top_final": 0, "top_baseline": 0, "cascade": 0}
+    named = unknown = 0
+    rerank_seconds = 0.0
+    for question, player in pairs:
+        relevant = set(index.facts.names.get(normalize_name(player), []))
+        if not relevant:
+            unknown += 1
+            continue
+        named += any(rows == sorted(relevant) for rows in index.facts.find_players(question))
+
+        results = router.query(
+            index,
+            [question],
+            [embedder.embed(question)],
+            max(reranker.candidate_k, baseline_k),
+            ["metadatas", "distances"],
+        )
+        rows = [meta["row"] for meta in results["metadatas"][0]]
+        ids = results["ids"][0]
+        distances = results["distances"][0]
+
+        start = time.perf_counter()
+        cascade, _ = reranker.rerank(
+            question,
+            index.player_table,
+            rows[: reranker.candidate_k],
+            ids[: reranker.candidate_k],
+            distances[: reranker.candidate_k],
+            index.terms,
+        )
+        rerank_seconds += time.perf_counter() - start
+
+        for name, context in (
+            ("top_final", rows[: reranker.final_k]),
+            ("top_baseline", rows[:baseline_k]),
+            ("cascade", cascade),
+        ):
+            hits[name] += bool(relevant.intersection(context))
+            chars[name] += sum(len(index.player_table.description(row)) for row in context)
+
+    evaluated = max(len(pairs) - unknown, 1)
+    return {
+        "questions": len(pairs),
+        "unknown_players": unknown,
+        "name_in_question": round(named / evaluated, 3),
+        "k": {"candidate": reranker.candidate_k, "final": reranker.final_k, "baseline": baseline_k},
+        "recall": {name: round(count / evaluated, 3) for name, count in hits.items()},
+        "context_chars": {name: round(count / evaluated) for name, count in chars.items()},
+        "rerank_ms": round(rerank_seconds / evaluated * 1000, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Evaluate the rerank stage on labelled questions against a real Chroma first stage"
+    )
+    parser.add_argument(
+        "questions", help='JSONL of {"question": ..., "player": ...} labelled from real questions'
+    )
+    parser.add_argument("--players", default=PLAYERS_FILE)
+    parser.add_argument("--embedder", default=EMBEDDER_DIR, help="Output of `python -m serving.embedder export`")
+    parser.add_argument("--baseline-k", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(evaluate(args.questions, args.players, args.embedder, args.baseline_k), indent=2))
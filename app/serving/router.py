@@ -0,0 +1,139 @@
+# router.py
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from prometheus_client import Counter, Histogram
+
+ROUTER_SHARD_QUERIES = Counter(
+    "sports_router_shard_queries_total", "Queries sent to each league shard", ["shard"]
+)
+ROUTER_FANOUT = Histogram(
+    "sports_router_fanout", "Shards searched per question", buckets=(1, 2, 3, 4, 6, 8, 12)
+)
+
+# Records without a league come from the original NFL-only crawl
+DEFAULT_LEAGUE = "NFL"
+
+LEAGUE_KEYWORDS = {
+    "NFL": (
+        "nfl", "football", "quarterback", "touchdown", "super bowl", "linebacker",
+        "wide receiver", "running back", "tight end", "cornerback", "pro bowl",
+    ),
+    "NBA": (
+        "nba", "basketball", "point guard", "shooting guard", "power forward",
+        "rebounds", "dunk", "three-pointer", "nba finals",
+    ),
+    "MLB": (
+        "mlb", "baseball", "pitcher", "home run", "shortstop", "outfielder",
+        "world series", "batting average", "catcher",
+    ),
+    "NHL": ("nhl", "hockey", "goalie", "goaltender", "stanley cup", "defenceman", "puck"),
+}
+
+
+def shard_name(league: str) -> str:
+    """Collection-name-safe shard key for a league"""
+    return re.sub(r"[^a-z0-9]+", "_", (league or DEFAULT_LEAGUE).lower()).strip("_")
+
+
+class ShardRouter:
+    """
+    Picks which league shards of an index generation a question should search.
+
+    A question that names a known player or team, or uses league/sport
+    keywords, is sent only to those leagues' shards. Anything else fans out
+    to every shard concurrently and the hits are merged by distance (all
+    shards share one embedding space, so distances are comparable).
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard")
+        self._keywords = [
+            (shard_name(league), re.compile(r"\b(" + "|".join(map(re.escape, words)) + r")\b"))
+            for league, words in LEAGUE_KEYWORDS.items()
+        ]
+
+    def route(self, index, question: str) -> List[str]:
+        """Shards to search for `question`, all of them when nothing identifies a league"""
+        available = index.shards
+        if len(available) <= 1:
+            return list(available)
+
+        text = question.lower()
+        shards = set()
+        # Named players are the strongest signal
+        for rows in index.facts.find_players(question):
+            for row in rows:
+                shards.add(shard_name(index.player_table.field(row, "league")))
+        for shard, team_pattern in index.team_patterns.items():
+            if team_pattern.search(text):
+                shards.add(shard)
+        if not shards:
+            shards = {shard for shard, pattern in self._keywords if pattern.search(text)}
+
+        shards &= set(available)
+        return sorted(shards) if shards else list(available)
+
+    def _query_shard(self, index, shard: str, embeddings, n_results: int, include):
+        size = index.shard_sizes.get(shard, 0)
+        if size == 0:
+            return None
+        ROUTER_SHARD_QUERIES.labels(shard=shard).inc()
+        return index.shards[shard].query(
+            query_embeddings=embeddings, n_results=min(n_results, size), include=include
+        )
+
+    def query(
+        self,
+        index,
+        questions: Sequence[str],
+        embeddings: Sequence[List[float]],
+        n_results: int,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, List]:
+        """
+        Chroma-shaped results for several questions: each question is answered
+        from its own routed shards, but every shard is queried once for all of
+        the questions routed to it.
+        """
+        include = list(include or [])
+        for field in ("metadatas", "distances"):
+            if field not in include:
+                include.append(field)  # rows and distances are needed to merge across shards
+
+        routes = [self.route(index, question) for question in questions]
+        for route in routes:
+            ROUTER_FANOUT.observe(len(route))
+
+        # One concurrent query per shard, covering the questions routed to it
+        by_shard: Dict[str, List[int]] = {}
+        for i, route in enumerate(routes):
+            for shard in route:
+                by_shard.setdefault(shard, []).append(i)
+        futures = {
+            shard: self.executor.submit(
+                self._query_shard, index, shard, [embeddings[i] for i in members], n_results, include
+            )
+            for shard, members in by_shard.items()
+        }
+
+        hits: List[List[tuple]] = [[] for _ in questions]
+        for shard, future in futures.items():
+            results = future.result()
+            if results is None:
+                continue
+            for j, i in enumerate(by_shard[shard]):
+                for k, doc_id in enumerate(results["ids"][j]):
+                    hits[i].append(
+                        (results["distances"][j][k], doc_id, results["metadatas"][j][k])
+                    )
+
+        merged = {"ids": [], "metadatas": [], "distances": []}
+        for question_hits in hits:
+            question_hits.sort(key=lambda hit: hit[0])
+            top = question_hits[:n_results]
+            merged["distances"].append([hit[0] for hit in top])
+            merged["ids"].append([hit[1] for hit in top])
+            merged["metadatas"].append([hit[2] for hit in top])
+        return merged
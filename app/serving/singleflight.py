@@ -0,0 +1,67 @@
+# singleflight.py
+import asyncio
+import re
+import unicodedata
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from prometheus_client import Counter, Gauge
+
+ASK_COALESCED = Counter(
+    "sports_ask_coalesced_total", "Requests answered by joining an identical in-flight request"
+)
+ASK_SINGLEFLIGHT_KEYS = Gauge(
+    "sports_ask_singleflight_keys", "Distinct questions currently being computed"
+)
+
+T = TypeVar("T")
+
+
+def normalize_question(question: str) -> str:
+    """'Who is C.J. Stroud?' / 'who is  cj stroud' -> 'who is cj stroud'"""
+    question = unicodedata.normalize("NFKD", question or "")
+    question = "".join(c for c in question if not unicodedata.combining(c)).lower()
+    question = re.sub(r"[.'’`]", "", question)
+    question = re.sub(r"[^a-z0-9 ]+", " ", question)
+    return " ".join(question.split())
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one computation.
+
+    The first caller for a key starts the computation as its own task; callers
+    that arrive while it runs await that same task instead of starting another.
+    The key is forgotten as soon as the task finishes, so this only merges
+    bursts -- it never serves a stale result. A caller disconnecting doesn't
+    cancel the shared task, and if it fails each waiter retries on its own
+    rather than inheriting another client's error (e.g. a rate-limit rejection).
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            ASK_SINGLEFLIGHT_KEYS.set(len(self._calls))
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Result of `fn()` for `key`, and whether it was shared from another caller"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            ASK_SINGLEFLIGHT_KEYS.set(len(self._calls))
+            task.add_done_callback(lambda done: self._forget(key, done))
+            return await asyncio.shield(task), False
+
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise  # this caller went away
+            return await fn(), False
+        except Exception:
+            return await fn(), False
+        ASK_COALESCED.inc()
+        return result, True
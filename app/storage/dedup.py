@@ -0,0 +1,161 @@
+# dedup.py
+import argparse
+import hashlib
+import random
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .entity_resolution import normalize_name
+from .players import PLAYERS_FILE, iter_players
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# numpy multiplies in uint64, so the pure-Python path wraps the same way
+_MASK_64 = (1 << 64) - 1
+_TOKEN = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 5) -> set:
+    """Word n-gram shingles, hashed to 32-bit ints"""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < size:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little")
+        for g in grams
+    }
+
+
+class NearDuplicateDetector:
+    """
+    MinHash + LSH banding over document text.
+
+    Each document is signed once (O(shingles * num_perm)) and hashed into
+    `bands` buckets, so finding candidates is linear in the corpus size.
+    Candidates sharing a bucket are confirmed by estimated Jaccard similarity
+    and merged with union-find. Documents added with a `group` are only
+    merged with documents of the same group.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self.perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        if np is not None:
+            self._a = np.array([a for a, _ in self.perms], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self.perms], dtype=np.uint64)[:, None]
+        self.signatures: Dict[Hashable, Tuple[int, ...]] = {}
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+        self.parent: Dict[Hashable, Hashable] = {}
+        self.groups: Dict[Hashable, Optional[Hashable]] = {}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashed = shingles(text)
+        if not hashed:
+            return tuple([_MAX_HASH] * self.num_perm)
+        if np is not None:
+            # Vectorized over (permutation, shingle); a * h + b wraps modulo 2**64
+            h = np.fromiter(hashed, dtype=np.uint64, count=len(hashed))[None, :]
+            with np.errstate(over="ignore"):
+                values = ((self._a * h + self._b) % np.uint64(_MERSENNE_PRIME)) & np.uint64(_MAX_HASH)
+            return tuple(values.min(axis=1).tolist())
+        return tuple(
+            min((((a * h + b) & _MASK_64) % _MERSENNE_PRIME) & _MAX_HASH for h in hashed)
+            for a, b in self.perms
+        )
+
+    def similarity(self, key_a: Hashable, key_b: Hashable) -> float:
+        sig_a, sig_b = self.signatures[key_a], self.signatures[key_b]
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / self.num_perm
+
+    def _root(self, key: Hashable) -> Hashable:
+        while self.parent[key] != key:
+            self.parent[key] = self.parent[self.parent[key]]
+            key = self.parent[key]
+        return key
+
+    def add(self, key: Hashable, text: str, group: Optional[Hashable] = None):
+        sig = self.signature(text)
+        self.signatures[key] = sig
+        self.parent[key] = key
+        self.groups[key] = group
+        for band in range(self.bands):
+            chunk = sig[band * self.rows : (band + 1) * self.rows]
+            bucket = self.buckets[band][chunk]
+            for other in bucket:
+                if (
+                    self.groups[other] == group
+                    and self._root(other) != self._root(key)
+                    and self.similarity(key, other) >= self.threshold
+                ):
+                    self.parent[self._root(key)] = self._root(other)
+            bucket.append(key)
+
+    def clusters(self) -> List[List[Hashable]]:
+        groups = defaultdict(list)
+        for key in self.parent:
+            groups[self._root(key)].append(key)
+        return list(groups.values())
+
+
+def collapse_duplicates(
+    items: Iterable[Tuple[Hashable, str, str]], threshold: float = 0.8, min_tokens: int = 20
+) -> Tuple[List[Hashable], int]:
+    """
+    Keep one key per near-duplicate cluster (the one with the longest text).
+
+    `items` are (key, text, player name). Only records of the same player
+    (by normalized name) are collapsed, and texts under `min_tokens` words
+    only collapse when the same player's record repeats them verbatim: short
+    scraped boilerplate ("Available in:") is shared by unrelated players and
+    says nothing about them being duplicates.
+
+    Returns the surviving keys in input order and how many were collapsed.
+    """
+    detector = NearDuplicateDetector(threshold=threshold)
+    order = []
+    lengths = {}
+    short: Dict[Tuple[str, str], Hashable] = {}
+    for key, text, name in items:
+        order.append(key)
+        lengths[key] = len(text)
+        if len(_TOKEN.findall(text)) >= min_tokens:
+            detector.add(key, text, group=normalize_name(name))
+        else:
+            short.setdefault((normalize_name(name), text.strip()), key)
+
+    keep = set(short.values())
+    for cluster in detector.clusters():
+        keep.add(max(cluster, key=lambda k: lengths[k]))
+    survivors = [key for key in order if key in keep]
+    return survivors, len(order) - len(survivors)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report near-duplicate player descriptions")
+    parser.add_argument("--players", default=PLAYERS_FILE)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    docs = (
+        (idx, player.get("description", ""), player.get("name", ""))
+        for idx, player in enumerate(iter_players(args.players, fields=("description", "name")))
+    )
+    survivors, collapsed = collapse_duplicates(docs, args.threshold)
+    print(f"{len(survivors) + collapsed} descriptions, {collapsed} collapsed, {len(survivors)} kept")
@@ -0,0 +1,158 @@
+# doc_store.py
+import ast
+import hashlib
+import json
+import os
+import pprint
+import sqlite3
+from typing import Dict, Iterable, Iterator, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, "docs.sqlite3")
+
+
+class DocStore:
+    """
+    SQLite-backed document store keyed by `doc_key`: the metadata URL when
+    there is one, else the title, else a hash of the content. Scraped docs
+    often have empty titles, so the title alone is not unique.
+
+    - `key` is the primary key, so upserts are a B-tree lookup (O(log n)).
+    - Reads go through a cursor in chunks, so iterating never loads the whole
+      table into memory.
+    - `export_sample_data` regenerates `sample_data.py` for anyone still importing
+      `SPORTS_DOCS`.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, chunk_size: int = 500):
+        self.path = path
+        self.chunk_size = chunk_size
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(docs)")]
+            if columns and "key" not in columns:
+                # Stores created before docs were keyed by doc_key
+                self.conn.execute("ALTER TABLE docs RENAME TO docs_by_title")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS docs (
+                    key TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    metadata TEXT
+                )
+                """
+            )
+            if columns and "key" not in columns:
+                rows = self.conn.execute(
+                    "SELECT title, content, metadata FROM docs_by_title ORDER BY rowid"
+                )
+                self._upsert_rows(self._to_row(self._from_row(row)) for row in rows.fetchall())
+                self.conn.execute("DROP TABLE docs_by_title")
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM docs WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    @staticmethod
+    def doc_key(doc: Dict) -> str:
+        """URL if the doc has one, else its title, else a hash of its content"""
+        url = (doc.get("metadata") or {}).get("url")
+        if url:
+            return url
+        if doc.get("title"):
+            return doc["title"]
+        return "sha1:" + hashlib.sha1(doc.get("content", "").encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _to_row(cls, doc: Dict):
+        metadata = doc.get("metadata")
+        return (
+            cls.doc_key(doc),
+            doc.get("title", ""),
+            doc.get("content", ""),
+            json.dumps(metadata, ensure_ascii=False) if metadata is not None else None,
+        )
+
+    @staticmethod
+    def _from_row(row) -> Dict:
+        title, content, metadata = row
+        doc = {"title": title, "content": content}
+        if metadata is not None:
+            doc["metadata"] = json.loads(metadata)
+        return doc
+
+    def _upsert_rows(self, rows: Iterable):
+        self.conn.executemany(
+            """
+            INSERT INTO docs (key, title, content, metadata) VALUES (?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                title = excluded.title,
+                content = excluded.content,
+                metadata = excluded.metadata
+            """,
+            rows,
+        )
+
+    def upsert(self, doc: Dict):
+        """Insert or replace a single document by doc_key"""
+        self.upsert_many([doc])
+
+    def upsert_many(self, docs: Iterable[Dict]) -> int:
+        """Upsert documents in one transaction, consuming `docs` lazily"""
+        before = self.conn.total_changes
+        with self.conn:
+            self._upsert_rows(self._to_row(doc) for doc in docs)
+        return self.conn.total_changes - before
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT title, content, metadata FROM docs WHERE key = ?", (key,)
+        ).fetchone()
+        return self._from_row(row) if row else None
+
+    def iter_docs(self) -> Iterator[Dict]:
+        """Stream documents in insertion order"""
+        cursor = self.conn.execute(
+            "SELECT title, content, metadata FROM docs ORDER BY rowid"
+        )
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield self._from_row(row)
+
+    def import_sample_data(self, sample_data_path: str) -> int:
+        """One-time migration of an existing sample_data.py into the store"""
+        if not os.path.exists(sample_data_path):
+            return 0
+        with open(sample_data_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        start = content.find("[")
+        end = content.rfind("]") + 1
+        if start == -1 or end == 0:
+            return 0
+        # literal_eval only accepts Python literals, unlike the old eval()
+        docs = ast.literal_eval(content[start:end])
+        return self.upsert_many(docs)
+
+    def export_sample_data(self, sample_data_path: str):
+        """Stream the store back out as a Python module defining SPORTS_DOCS"""
+        tmp_path = sample_data_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("# sample_data.py\n# Generated from the doc store. Do not edit.\n\n")
+            f.write("SPORTS_DOCS = [\n")
+            for doc in self.iter_docs():
+                f.write(pprint.pformat(doc, indent=4, sort_dicts=False))
+                f.write(",\n")
+            f.write("]\n")
+        os.replace(tmp_path, sample_data_path)
@@ -0,0 +1,283 @@
+# durable.py
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .players import iter_players
+
+
+class _HashingWriter:
+    """File wrapper that hashes everything written through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        self.sha256.update(data)
+        self.size += len(data)
+        self.f.write(data)
+
+
+def _fsync_dir(directory: str):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows, where directories cannot be opened
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _last_char(path: str) -> str:
+    """Last non-whitespace character of a file, read from the end"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            tail = f.read(end - start).rstrip()
+            if tail:
+                return chr(tail[-1])
+            end = start
+    return ""
+
+
+def is_complete_json(path: str) -> bool:
+    """
+    Streaming check that a JSON file is whole: players files are parsed one
+    record at a time, so a truncated or corrupt file is caught without ever
+    holding it in memory.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            head = f.read(4096).lstrip()
+        if not head or head[0] not in "[{":
+            return False
+        for _ in iter_players(path, fields=()):
+            pass
+        return _last_char(path) == ("]" if head[0] == "[" else "}")
+    except (OSError, ValueError):
+        return False
+    except Exception:
+        # ijson reports malformed input with its own exception types
+        return False
+
+
+class DurableWriter:
+    """
+    Crash-safe JSON writer with generational backups.
+
+    Every write goes to a temp file in the same directory, is fsynced and then
+    atomically renamed over the target, so readers only ever see the old or
+    the new file, never a truncated one. Because each write produces a new
+    inode, `snapshot()` can keep the previous version by hard-linking it into
+    `backup_dir` instead of re-serializing it. Each generation's SHA-256 is
+    recorded in a manifest so `restore()` can pick the newest valid one,
+    and (with a `backup_dir`) the target's own SHA-256 and size go to a
+    `.sha256` file next to it so `is_valid()` does not have to parse it.
+    """
+
+    def __init__(self, path: str, backup_dir: Optional[str] = None, keep: int = 5):
+        self.path = path
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.name = os.path.basename(path)
+        if backup_dir:
+            os.makedirs(backup_dir, exist_ok=True)
+            self.manifest_path = os.path.join(backup_dir, f"{self.name}.generations.json")
+        self.checksum_path = f"{path}.sha256"
+
+    def _write(self, dump) -> str:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                out = _HashingWriter(f)
+                dump(out)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        _fsync_dir(directory)
+        digest = out.sha256.hexdigest()
+        if self.backup_dir:
+            self._save_checksum(digest, out.size)
+        return digest
+
+    def _save_checksum(self, digest: str, size: int):
+        tmp_path = f"{self.checksum_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sha256": digest, "size": size}, f)
+        os.replace(tmp_path, self.checksum_path)
+
+    def write_json(self, data, indent: int = 2) -> str:
+        """Atomically replace the target with `data`; returns its SHA-256"""
+        return self._write(lambda out: json.dump(data, out, indent=indent, ensure_ascii=False))
+
+    def write_players(self, players: Iterable[Dict], indent: int = 2) -> str:
+        """
+        Stream `{"players": [...]}` to disk one record at a time.
+
+        `players` may lazily read from the current target file: the target
+        is only replaced once the temp file is complete.
+        """
+        pad = " " * indent
+
+        def dump(out):
+            out.write('{\n' + pad + '"players": [')
+            first = True
+            for player in players:
+                out.write("\n" if first else ",\n")
+                body = json.dumps(player, indent=indent, ensure_ascii=False)
+                out.write(pad * 2 + body.replace("\n", "\n" + pad * 2))
+                first = False
+            out.write(("\n" + pad if not first else "") + "]\n}")
+
+        return self._write(dump)
+
+    # Generational backups
+
+    def generations(self) -> List[Dict]:
+        """Manifest entries, newest first"""
+        if not self.backup_dir or not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return sorted(json.load(f), key=lambda g: g["generation"], reverse=True)
+
+    def _save_manifest(self, generations: List[Dict]):
+        DurableWriter(self.manifest_path).write_json(generations)
+
+    def snapshot(self) -> Optional[int]:
+        """Hard-link the current file as a new backup generation"""
+        if not self.backup_dir or not os.path.exists(self.path):
+            return None
+        generations = self.generations()
+        generation = generations[0]["generation"] + 1 if generations else 1
+        backup_path = os.path.join(self.backup_dir, f"{self.name}.gen{generation:06d}")
+        try:
+            os.link(self.path, backup_path)
+        except OSError:
+            # Filesystems without hard links fall back to a plain copy
+            shutil.copy2(self.path, backup_path)
+
+        generations.insert(
+            0,
+            {
+                "generation": generation,
+                "file": os.path.basename(backup_path),
+                "sha256": file_sha256(backup_path),
+                "size": os.path.getsize(backup_path),
+                "created": time.time(),
+            },
+        )
+        for old in generations[self.keep :]:
+            old_path = os.path.join(self.backup_dir, old["file"])
+            if os.path.exists(old_path):
+                os.remove(old_path)
+        self._save_manifest(generations[: self.keep])
+        print(f"[Backup] generation {generation} -> {backup_path}")
+        return generation
+
+    def is_valid(self) -> bool:
+        """
+        True if the target is the file this writer last wrote (checksum) or,
+        failing that (older files, or a crash before the checksum was saved),
+        if it passes a streaming JSON check.
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.checksum_path, "r", encoding="utf-8") as f:
+                recorded = json.load(f)
+            if (
+                os.path.getsize(self.path) == recorded["size"]
+                and file_sha256(self.path) == recorded["sha256"]
+            ):
+                return True
+        except (OSError, ValueError, KeyError):
+            pass
+        return is_complete_json(self.path)
+
+    def adopt_legacy_backups(self, prefix: str) -> int:
+        """
+        Fold the old `<prefix>_backup_<count>.json` copies in `backup_dir`
+        into backup generations. They predate every generation, so they are
+        only adopted (the newest `keep` complete ones, oldest first) when
+        there are no generations yet; the rest are deleted.
+        """
+        if not self.backup_dir:
+            return 0
+        pattern = re.compile(re.escape(prefix) + r"_backup_(\d+)\.json$")
+        legacy = sorted(
+            (int(match.group(1)), name)
+            for name in os.listdir(self.backup_dir)
+            for match in [pattern.match(name)]
+            if match
+        )
+        if not legacy:
+            return 0
+
+        paths = [os.path.join(self.backup_dir, name) for _, name in legacy]
+        generations = self.generations()
+        adopted = [] if generations else [p for p in paths if is_complete_json(p)][-self.keep :]
+        for generation, path in enumerate(adopted, start=1):
+            backup_path = os.path.join(self.backup_dir, f"{self.name}.gen{generation:06d}")
+            os.replace(path, backup_path)
+            generations.insert(
+                0,
+                {
+                    "generation": generation,
+                    "file": os.path.basename(backup_path),
+                    "sha256": file_sha256(backup_path),
+                    "size": os.path.getsize(backup_path),
+                    "created": os.path.getmtime(backup_path),
+                },
+            )
+        for path in paths:
+            if path not in adopted:
+                os.remove(path)
+        if adopted:
+            self._save_manifest(generations)
+        print(f"[Backup] adopted {len(adopted)} of {len(paths)} legacy {prefix} backups")
+        return len(adopted)
+
+    def restore(self, force: bool = False) -> Optional[int]:
+        """
+        If the target is missing or corrupt (or `force`), replace it with the
+        newest backup generation whose checksum still matches.
+        """
+        if not force and self.is_valid():
+            return None
+        for gen in self.generations():
+            backup_path = os.path.join(self.backup_dir, gen["file"])
+            if not os.path.exists(backup_path) or file_sha256(backup_path) != gen["sha256"]:
+                print(f"Skipping corrupt backup generation {gen['generation']}")
+                continue
+            tmp_path = f"{self.path}.{os.getpid()}.restore"
+            shutil.copy2(backup_path, tmp_path)
+            os.replace(tmp_path, self.path)
+            print(f"Restored {self.path} from backup generation {gen['generation']}")
+            return gen["generation"]
+        print(f"No valid backup generation found for {self.path}")
+        return None
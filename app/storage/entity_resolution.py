@@ -0,0 +1,246 @@
+# entity_resolution.py
+import argparse
+import hashlib
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from .durable import DurableWriter
+from .players import DATA_DIR, PLAYERS_FILE, iter_players
+
+WIKI_PLAYERS_FILE = os.path.join(DATA_DIR, "players_wiki.json")
+MERGED_PLAYERS_FILE = os.path.join(DATA_DIR, "players_merged.json")
+
+_NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+_SPORTSDB_ID = re.compile(r"/player/(\d+)-")
+_BORN_YEAR = re.compile(r"\(born [^)]*?(\d{4})\)")
+
+
+def normalize_name(name: str) -> str:
+    """'C.J. Stroud Jr.' / 'C.J._Stroud' -> 'cj stroud'"""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    name = name.replace("_", " ").lower()
+    name = re.sub(r"[.'’`]", "", name)
+    name = re.sub(r"[^a-z0-9 ]+", " ", name)
+    tokens = [t for t in name.split() if t not in _NAME_SUFFIXES]
+    return " ".join(tokens)
+
+
+def sportsdb_id(url: str) -> Optional[str]:
+    match = _SPORTSDB_ID.search(url or "")
+    return match.group(1) if match else None
+
+
+def _wiki_birth_year(record: Dict) -> Optional[int]:
+    for text in record.get("sections", {}).values():
+        match = _BORN_YEAR.search(text)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+class Entity:
+    """One resolved person, accumulating records from every source"""
+
+    __slots__ = ("sportsdb", "wiki", "name", "birth_year", "team", "sportsdb_id")
+
+    def __init__(self):
+        self.sportsdb: List[Dict] = []
+        self.wiki: List[Dict] = []
+        self.name = ""
+        self.birth_year: Optional[int] = None
+        self.team = ""
+        self.sportsdb_id: Optional[str] = None
+
+    def compatible(self, birth_year: Optional[int], player_id: Optional[str]) -> bool:
+        if birth_year and self.birth_year and birth_year != self.birth_year:
+            return False
+        if player_id and self.sportsdb_id and player_id != self.sportsdb_id:
+            return False
+        return True
+
+    def stable_id(self) -> str:
+        if self.sportsdb_id:
+            return f"sportsdb:{self.sportsdb_id}"
+        if self.wiki:
+            return f"wiki:{self.wiki[0]['name']}"
+        key = f"{self.name}|{self.birth_year or ''}"
+        return "player:" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+    def merged(self) -> Dict:
+        """Collapse the member records into one player record"""
+        record: Dict = {}
+        # Later SportsDB records win for scalar fields, empty values never overwrite
+        for source in self.sportsdb:
+            for key, value in source.items():
+                if value not in ("", None, []) or key not in record:
+                    record[key] = value
+
+        description = (record.get("description") or "").strip()
+        if self.wiki:
+            wiki = self.wiki[0]
+            record.setdefault("name", wiki["name"].replace("_", " "))
+            record["wiki"] = {"slug": wiki["name"], "sections": wiki.get("sections", {})}
+            if wiki.get("tables"):
+                record["wiki"]["tables"] = wiki["tables"]
+            # Fall back to Wikipedia text when SportsDB has no usable bio
+            if len(description) < 40 or description == "--- add one?":
+                record["description"] = "\n\n".join(wiki.get("sections", {}).values())
+        if self.birth_year and not record.get("birth_year"):
+            record["birth_year"] = self.birth_year
+
+        record["id"] = self.stable_id()
+        record["sources"] = (["sportsdb"] if self.sportsdb else []) + (
+            ["wikipedia"] if self.wiki else []
+        )
+        return record
+
+
+class EntityResolver:
+    """
+    Joins SportsDB and Wikipedia player records.
+
+    Candidates come from hash lookups on blocking keys, strongest first:
+    (name, birth year), (name, team), then name alone. A candidate is only
+    accepted if birth year and SportsDB id do not conflict, so the work is
+    linear in the number of records rather than pairwise.
+    """
+
+    def __init__(self):
+        self.entities: List[Entity] = []
+        self.blocks: Dict[tuple, List[int]] = defaultdict(list)
+
+    @staticmethod
+    def _blocking_keys(name: str, birth_year: Optional[int], team: str) -> List[tuple]:
+        keys = []
+        if birth_year:
+            keys.append(("nb", name, birth_year))
+        if team:
+            keys.append(("nt", name, team))
+        keys.append(("n", name))
+        return keys
+
+    def _find(self, keys, birth_year, player_id) -> Optional[int]:
+        for key in keys:
+            for idx in self.blocks.get(key, ()):
+                if self.entities[idx].compatible(birth_year, player_id):
+                    return idx
+        return None
+
+    def _add(self, record: Dict, source: str, name: str, birth_year, team, player_id):
+        keys = self._blocking_keys(name, birth_year, team)
+        idx = self._find(keys, birth_year, player_id)
+        if idx is None:
+            idx = len(self.entities)
+            self.entities.append(Entity())
+        entity = self.entities[idx]
+
+        getattr(entity, source).append(record)
+        entity.name = entity.name or name
+        entity.birth_year = entity.birth_year or birth_year
+        entity.team = entity.team or team
+        entity.sportsdb_id = entity.sportsdb_id or player_id
+
+        # Register under the entity's (possibly enriched) keys for later records
+        for key in self._blocking_keys(name, entity.birth_year, entity.team):
+            if idx not in self.blocks[key]:
+                self.blocks[key].append(idx)
+
+    def add_sportsdb(self, record: Dict):
+        name = normalize_name(record.get("name", ""))
+        if not name:
+            return
+        self._add(
+            record,
+            "sportsdb",
+            name,
+            record.get("birth_year"),
+            normalize_name(record.get("team", "")),
+            sportsdb_id(record.get("url", "")),
+        )
+
+    def add_wiki(self, record: Dict):
+        name = normalize_name(record.get("name", ""))
+        if not name:
+            return
+        self._add(record, "wiki", name, _wiki_birth_year(record), "", None)
+
+    def resolve(self, sportsdb: Iterable[Dict], wiki: Iterable[Dict]) -> Iterable[Dict]:
+        for record in sportsdb:
+            self.add_sportsdb(record)
+        for record in wiki:
+            self.add_wiki(record)
+        for entity in self.entities:
+            yield entity.merged()
+
+
+def resolve_players(
+    players_file: str = PLAYERS_FILE,
+    wiki_file: str = WIKI_PLAYERS_FILE,
+    output_file: str = MERGED_PLAYERS_FILE,
+) -> int:
+    """Write one merged record per person to `output_file`"""
+    resolver = EntityResolver()
+    sportsdb_count = wiki_count = 0
+
+    def counted(records, source):
+        nonlocal sportsdb_count, wiki_count
+        for record in records:
+            if source == "sportsdb":
+                sportsdb_count += 1
+            else:
+                wiki_count += 1
+            yield record
+
+    merged = list(
+        resolver.resolve(
+            counted(iter_players(players_file), "sportsdb"),
+            counted(iter_players(wiki_file), "wiki"),
+        )
+    )
+
+    DurableWriter(output_file).write_players(merged)
+
+    print(
+        f"Resolved {sportsdb_count} SportsDB + {wiki_count} Wikipedia records "
+        f"into {len(merged)} players -> {output_file}"
+    )
+    return len(merged)
+
+
+def _mtime_ns(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def refresh_merged(
+    players_file: str = PLAYERS_FILE,
+    wiki_file: str = WIKI_PLAYERS_FILE,
+    output_file: str = MERGED_PLAYERS_FILE,
+) -> bool:
+    """
+    Re-run resolution when a crawl has rewritten either input since
+    `output_file` was built; returns True if it was rebuilt. The output is
+    stamped with the inputs' mtime as read, so a crawl that lands while
+    resolution runs is picked up on the next call.
+    """
+    inputs = max(_mtime_ns(players_file), _mtime_ns(wiki_file))
+    if inputs <= _mtime_ns(output_file):
+        return False
+    resolve_players(players_file, wiki_file, output_file)
+    os.utime(output_file, ns=(inputs, inputs))
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge SportsDB and Wikipedia players")
+    parser.add_argument("--players", default=PLAYERS_FILE)
+    parser.add_argument("--wiki", default=WIKI_PLAYERS_FILE)
+    parser.add_argument("--output", default=MERGED_PLAYERS_FILE)
+    args = parser.parse_args()
+    resolve_players(args.players, args.wiki, args.output)
@@ -0,0 +1,57 @@
+# player_store.py
+from typing import Dict, Iterator, List, Optional
+
+from .durable import DurableWriter
+from .players import PLAYERS_FILE, iter_players
+
+
+class PlayerStore:
+    """
+    In-memory player list with a name index, committed to disk atomically.
+
+    Upserts are O(1) dict lookups; nothing touches the file until `commit()`,
+    which writes a temp file next to the target and renames it over.
+    """
+
+    def __init__(self, path: str = PLAYERS_FILE, key: str = "name"):
+        self.path = path
+        self.key = key
+        self.players: List[Dict] = []
+        self.index: Dict[str, int] = {}
+        self.dirty = False
+        for player in iter_players(path):
+            if isinstance(player, dict):
+                self._insert(player)
+
+    def _insert(self, player: Dict):
+        value = player.get(self.key)
+        if value in self.index:
+            self.players[self.index[value]] = player
+        else:
+            if value:
+                self.index[value] = len(self.players)
+            self.players.append(player)
+
+    def upsert(self, player: Dict) -> bool:
+        """Insert or replace by key; returns True if the player already existed"""
+        existed = player.get(self.key) in self.index
+        self._insert(player)
+        self.dirty = True
+        return existed
+
+    def get(self, value: str) -> Optional[Dict]:
+        idx = self.index.get(value)
+        return self.players[idx] if idx is not None else None
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.players)
+
+    def commit(self):
+        """Write all players to a temp file and atomically rename it into place"""
+        if not self.dirty:
+            return
+        DurableWriter(self.path).write_players(self.players)
+        self.dirty = False
@@ -0,0 +1,194 @@
+# player_table.py
+import argparse
+import json
+import tracemalloc
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from .players import PLAYERS_FILE, iter_players
+
+# Low-cardinality fields stored as indexes into a shared string pool
+POOLED_FIELDS = (
+    "team",
+    "position",
+    "nationality",
+    "status",
+    "birth_place",
+    "number",
+    "height",
+    "weight",
+    "league",
+)
+# High-cardinality fields stored once in a UTF-8 buffer with offsets
+TEXT_FIELDS = ("id", "name", "url", "description")
+
+
+class StringPool:
+    """Interns strings so each distinct value is stored once"""
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def add(self, value: str) -> int:
+        idx = self._index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self._index[value] = idx
+            self.values.append(value)
+        return idx
+
+    def __getitem__(self, idx: int) -> str:
+        return self.values[idx]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class TextColumn:
+    """Variable-length strings packed into one buffer, addressed by offsets"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offsets = array("Q", [0])
+
+    def append(self, value: str):
+        self.buffer += value.encode("utf-8")
+        self.offsets.append(len(self.buffer))
+
+    def __getitem__(self, row: int) -> str:
+        return self.buffer[self.offsets[row] : self.offsets[row + 1]].decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+class PlayerTable:
+    """
+    Columnar, read-only player store for serving.
+
+    Replaces the list of per-player dicts (a dozen string keys each, plus
+    nested honor dicts) with array-backed columns. Rows are addressed by
+    their position in the source file.
+    """
+
+    def __init__(self):
+        self.pool = StringPool()
+        self.text = {field: TextColumn() for field in TEXT_FIELDS}
+        self.pooled = {field: array("I") for field in POOLED_FIELDS}
+        self.birth_year = array("H")  # 0 means unknown
+        # Honors are flattened: row i owns honor_names[honor_offsets[i]:honor_offsets[i + 1]]
+        self.honor_offsets = array("I", [0])
+        self.honor_names = array("I")
+        self.honor_years = array("I")
+        self.name_index: Dict[str, int] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "PlayerTable":
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    @classmethod
+    def from_json(cls, path: str = PLAYERS_FILE) -> "PlayerTable":
+        return cls.from_records(iter_players(path))
+
+    def __len__(self) -> int:
+        return len(self.birth_year)
+
+    def append(self, record: Dict) -> int:
+        row = len(self)
+        for field in TEXT_FIELDS:
+            self.text[field].append(record.get(field) or "")
+        for field in POOLED_FIELDS:
+            self.pooled[field].append(self.pool.add(record.get(field) or ""))
+        self.birth_year.append(record.get("birth_year") or 0)
+        for honor in record.get("honors") or []:
+            self.honor_names.append(self.pool.add(honor.get("honor", "")))
+            self.honor_years.append(self.pool.add(honor.get("year", "")))
+        self.honor_offsets.append(len(self.honor_names))
+
+        name = record.get("name")
+        if name:
+            self.name_index.setdefault(name, row)
+        return row
+
+    def description(self, row: int) -> str:
+        return self.text["description"][row]
+
+    def name(self, row: int) -> str:
+        return self.text["name"][row]
+
+    def field(self, row: int, field: str):
+        if field in self.text:
+            return self.text[field][row]
+        if field in self.pooled:
+            return self.pool[self.pooled[field][row]]
+        if field == "birth_year":
+            return self.birth_year[row] or None
+        if field == "honors":
+            return self.honors(row)
+        raise KeyError(field)
+
+    def honors(self, row: int) -> List[Dict]:
+        start, end = self.honor_offsets[row], self.honor_offsets[row + 1]
+        return [
+            {"honor": self.pool[self.honor_names[i]], "year": self.pool[self.honor_years[i]]}
+            for i in range(start, end)
+        ]
+
+    def find(self, name: str) -> Optional[int]:
+        return self.name_index.get(name)
+
+    def record(self, row: int) -> Dict:
+        """Materialize a row back into the crawler's dict schema"""
+        record = {field: self.field(row, field) for field in TEXT_FIELDS + POOLED_FIELDS}
+        record["birth_year"] = self.field(row, "birth_year")
+        record["honors"] = self.honors(row)
+        return record
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.record(row)
+
+
+def _synthetic_records(n: int, source: List[Dict]) -> Iterable[Dict]:
+    """Replicate the real roster to n records with fresh (non-shared) strings"""
+    for i in range(n):
+        base = source[i % len(source)]
+        record = json.loads(json.dumps(base))
+        record["name"] = f"{record.get('name', '')} {i}"
+        record["url"] = f"{record.get('url', '')}-{i}"
+        yield record
+
+
+def _measure(build) -> int:
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return current
+
+
+def benchmark(sizes=(10_000, 100_000), path: str = PLAYERS_FILE):
+    """Compare resident size of list-of-dicts vs PlayerTable"""
+    source = list(iter_players(path))
+    for n in sizes:
+        dict_bytes = _measure(lambda: list(_synthetic_records(n, source)))
+        # Only the table itself is held; generator records are freed as we go
+        table_bytes = _measure(lambda: PlayerTable.from_records(_synthetic_records(n, source)))
+        print(
+            f"{n:>7} players: dicts {dict_bytes / 1e6:8.1f} MB, "
+            f"table {table_bytes / 1e6:8.1f} MB "
+            f"({dict_bytes / max(table_bytes, 1):.1f}x smaller)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Player table memory benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--players", default=PLAYERS_FILE)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.players)
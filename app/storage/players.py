@@ -0,0 +1,159 @@
+# players.py
+import json
+import os
+import re
+from typing import Dict, Iterable, Iterator, Optional
+
+try:
+    import ijson  # optional C-backed streaming parser
+except ImportError:
+    ijson = None
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+PLAYERS_FILE = os.path.join(DATA_DIR, "players.json")
+
+_WHITESPACE = " \t\n\r"
+# A bare number is only complete once one of these follows it
+_NUMBER_END = re.compile(r"[,\]}\s]")
+
+
+def _project(record: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    if fields is None or not isinstance(record, dict):
+        return record
+    return {k: record[k] for k in fields if k in record}
+
+
+class _Reader:
+    """Minimal incremental JSON reader over a text file (stdlib fallback for ijson)"""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the buffer stays around one record in size
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} in players file")
+        self.pos += 1
+
+    def value(self):
+        if self.peek() in "-0123456789":
+            # raw_decode would happily return the "2" of a "2.5" split across chunks
+            while not _NUMBER_END.search(self.buf, self.pos) and self._fill():
+                pass
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A value touching the end of the buffer may be truncated (e.g. numbers)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._fill():
+                obj, self.pos = self.decoder.raw_decode(self.buf, self.pos)
+                return obj
+
+    def items(self):
+        """Yield the elements of the array starting at the current position"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Malformed players array near offset {self.pos}")
+
+    def seek_key(self, key: str) -> bool:
+        """Advance past `"key":` in the top-level object, skipping other members"""
+        self.expect("{")
+        while self.peek() not in ("}", ""):
+            name = self.value()
+            self.expect(":")
+            if name == key:
+                return True
+            self.value()
+            if self.peek() == ",":
+                self.pos += 1
+        return False
+
+
+def iter_players(
+    path: str = PLAYERS_FILE,
+    fields: Optional[Iterable[str]] = None,
+    chunk_size: int = 64 * 1024,
+) -> Iterator[Dict]:
+    """
+    Yield player records from a players file one at a time.
+
+    Supports `{"players": [...]}` (what the crawler writes), a bare JSON list
+    (what SportsDBScraper writes) and JSONL (`.jsonl`, one record per line).
+    Pass `fields` to keep only the keys a caller needs.
+    """
+    if fields is not None:
+        fields = tuple(fields)
+    if not os.path.exists(path):
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield _project(json.loads(line), fields)
+            return
+
+        reader = _Reader(f, chunk_size)
+        first = reader.peek()
+        if first == "[":
+            prefix = "item"
+        elif first == "{":
+            prefix = "players.item"
+        else:
+            return
+
+        if ijson is not None:
+            with open(path, "rb") as bf:
+                for record in ijson.items(bf, prefix, use_float=True):
+                    yield _project(record, fields)
+            return
+
+        if first == "{" and not reader.seek_key("players"):
+            return
+        for record in reader.items():
+            yield _project(record, fields)
+
+
+def count_players(path: str = PLAYERS_FILE) -> int:
+    """Count records without materializing them"""
+    return sum(1 for _ in iter_players(path, fields=()))
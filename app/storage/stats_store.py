@@ -0,0 +1,434 @@
+# stats_store.py
+import argparse
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .durable import DurableWriter
+from .entity_resolution import MERGED_PLAYERS_FILE, WIKI_PLAYERS_FILE
+from .players import DATA_DIR, iter_players
+
+STATS_DIR = os.path.join(DATA_DIR, "stats")
+
+SEASON_COLUMNS = ("year", "season")
+TEAM_COLUMNS = ("team", "tm", "club")
+_MISSING = {"", "-", "—", "–", "n/a", "na", "dnp"}
+_NUMBER = re.compile(r"^-?[\d,]*\.?\d+")
+
+# Question phrase -> candidate column keys, most specific first
+STAT_ALIASES = {
+    "receiving yards": ("receiving_yds", "receiving_yards", "rec_yds"),
+    "receiving touchdowns": ("receiving_td", "receiving_tds", "rec_td"),
+    "receptions": ("receiving_rec", "receptions", "rec"),
+    "targets": ("receiving_tgt", "tgt"),
+    "rushing yards": ("rushing_yds", "rushing_yards", "rush_yds"),
+    "rushing touchdowns": ("rushing_td", "rushing_tds", "rush_td"),
+    "carries": ("rushing_att", "rush_att"),
+    "passing yards": ("passing_yds", "passing_yards", "pass_yds"),
+    "passing touchdowns": ("passing_td", "passing_tds", "pass_td"),
+    "touchdown passes": ("passing_td", "passing_tds", "pass_td"),
+    "completions": ("passing_cmp", "cmp"),
+    "interceptions": ("passing_int", "interceptions_int", "int"),
+    "sacks": ("tackles_sck", "tackles_sacks", "sacks", "sck"),
+    "tackles": ("tackles_comb", "tackles_cmb", "tackles_total", "comb"),
+    "forced fumbles": ("fumbles_ff", "ff"),
+    "games": ("games_gp", "gp", "g"),
+}
+
+# Wikipedia stat tables use abbreviations; questions use nicknames
+NFL_TEAMS = {
+    "ARI": "Cardinals", "ATL": "Falcons", "BAL": "Ravens", "BUF": "Bills",
+    "CAR": "Panthers", "CHI": "Bears", "CIN": "Bengals", "CLE": "Browns",
+    "DAL": "Cowboys", "DEN": "Broncos", "DET": "Lions", "GB": "Packers",
+    "HOU": "Texans", "IND": "Colts", "JAX": "Jaguars", "KC": "Chiefs",
+    "LAC": "Chargers", "LAR": "Rams", "LV": "Raiders", "MIA": "Dolphins",
+    "MIN": "Vikings", "NE": "Patriots", "NO": "Saints", "NYG": "Giants",
+    "NYJ": "Jets", "PHI": "Eagles", "PIT": "Steelers", "SF": "49ers",
+    "SEA": "Seahawks", "TB": "Buccaneers", "TEN": "Titans", "WAS": "Commanders",
+    "OAK": "Raiders", "SD": "Chargers", "STL": "Rams", "LA": "Rams",
+}
+
+
+# Whole stats questions (lower-cased, punctuation stripped); the scope is parsed by parse_scope
+_STATS = "|".join(sorted(map(re.escape, STAT_ALIASES), key=len, reverse=True))
+STAT_QUESTION = re.compile(
+    r"(?:(?:who|which player) (?:had|has|recorded|posted) the )?"
+    rf"(?P<direction>most|fewest) (?P<stat>{_STATS})(?P<scope>(?: [a-z0-9 ]+)?)"
+)
+_TEAMS = "|".join(sorted({re.escape(nick.lower()) for nick in NFL_TEAMS.values()}, key=len, reverse=True))
+_SCOPE_CLAUSES = (
+    ("seasons", re.compile(r" (?:from|between) ((?:19|20)\d{2}) (?:to|and) ((?:19|20)\d{2})")),
+    ("season", re.compile(r" in ((?:19|20)\d{2})")),
+    ("postseason", re.compile(r" in the (?:playoffs|postseason)")),
+    ("team", re.compile(rf" (?:among|for|on|with) (?:the )?({_TEAMS})(?: players)?")),
+)
+
+
+def parse_scope(scope: str) -> Optional[Tuple[Dict, str]]:
+    """
+    ' among the ravens in 2021' -> ({"team": "Ravens", "season": 2021}, "regular_season").
+    None if any part of the scope is not a season, season range, team or
+    playoffs clause (e.g. ' in nfl history', ' of lamar jackson').
+    """
+    filters: Dict = {}
+    table = "regular_season"
+    while scope:
+        for name, pattern in _SCOPE_CLAUSES:
+            match = pattern.match(scope)
+            if match and (match.end() == len(scope) or scope[match.end()] == " "):
+                break
+        else:
+            return None
+        if name in filters or (name == "postseason" and table == "postseason"):
+            return None
+        if name == "seasons":
+            filters["seasons"] = tuple(sorted(int(y) for y in match.groups()))
+        elif name == "season":
+            filters["season"] = int(match.group(1))
+        elif name == "team":
+            filters["team"] = next(n for n in NFL_TEAMS.values() if n.lower() == match.group(1))
+        else:
+            table = "postseason"
+        scope = scope[match.end():]
+    if "season" in filters and "seasons" in filters:
+        return None
+    return filters, table
+
+
+def column_key(header: str) -> str:
+    """'Receiving Yds' -> 'receiving_yds'"""
+    return re.sub(r"[^a-z0-9]+", "_", header.lower()).strip("_")
+
+
+def table_kind(title: str) -> str:
+    """Bucket a wikitable by what it covers, so every player's tables line up"""
+    title = (title or "").lower()
+    if "college" in title:
+        return "college"
+    if "post" in title or "playoff" in title:
+        return "postseason"
+    return "regular_season"
+
+
+def parse_number(value: str) -> float:
+    """'1,234' -> 1234.0, '78T' -> 78.0, '—' -> nan"""
+    value = (value or "").strip()
+    if value.lower() in _MISSING:
+        return np.nan
+    match = _NUMBER.match(value)
+    return float(match.group().replace(",", "")) if match else np.nan
+
+
+def parse_season(value: str) -> int:
+    match = re.search(r"(18|19|20)\d{2}", value or "")
+    return int(match.group()) if match else 0
+
+
+class StatTable:
+    """
+    One kind of stat table (regular season, postseason, college) for every
+    player, stored column-wise: `player` and `team` are int32 codes into the
+    store's string pools, `season` is int16 and every stat is a float32
+    column with NaN where a player's table lacks it.
+    """
+
+    def __init__(self, name: str, columns: Dict[str, np.ndarray], headers: Dict[str, str]):
+        self.name = name
+        self.columns = columns
+        self.headers = headers  # column key -> original header text
+
+    def __len__(self) -> int:
+        return len(self.columns["player"])
+
+    def stat_columns(self) -> List[str]:
+        return [key for key in self.columns if key not in ("player", "season", "team")]
+
+
+class StatsStore:
+    """
+    Typed columnar career stats built from the Wikipedia wikitables.
+
+    Ingested once into `.npz` files (one per table kind) plus a JSON
+    manifest of the string pools, then queried with NumPy masks and
+    grouped reductions instead of walking nested JSON.
+    """
+
+    def __init__(self, tables: Dict[str, StatTable], players: List[Dict], teams: List[str]):
+        self.tables = tables
+        self.players = players  # code -> {"id", "name"}
+        self.teams = teams  # code -> team label as written in the tables
+        self._team_codes = {team.upper(): code for code, team in enumerate(teams)}
+
+    # Ingestion
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "StatsStore":
+        players: List[Dict] = []
+        teams: List[str] = []
+        team_codes: Dict[str, int] = {}
+        # table kind -> column key -> list of values, padded with NaN as columns appear
+        raw: Dict[str, Dict[str, list]] = {}
+        headers: Dict[str, Dict[str, str]] = {}
+
+        for record in records:
+            wiki = record.get("wiki") or record
+            tables = wiki.get("tables") or []
+            if not tables:
+                continue
+            slug = wiki.get("slug") or record.get("name", "")
+            player_code = len(players)
+            players.append(
+                {
+                    "id": record.get("id") or f"wiki:{slug}",
+                    "name": record.get("name") if "wiki" in record else slug.replace("_", " "),
+                }
+            )
+
+            for table in tables:
+                kind = table_kind(table.get("title", ""))
+                columns = raw.setdefault(kind, {"player": [], "season": [], "team": []})
+                kind_headers = headers.setdefault(kind, {})
+                for row in table.get("data") or []:
+                    keyed = {column_key(h): (h, v) for h, v in row.items()}
+                    season_key = next((k for k in SEASON_COLUMNS if k in keyed), None)
+                    season = parse_season(keyed[season_key][1]) if season_key else 0
+                    if not season:
+                        continue  # career totals and blank rows are derivable from seasons
+                    team_key = next((k for k in TEAM_COLUMNS if k in keyed), None)
+                    team = keyed[team_key][1].strip().upper() if team_key else ""
+                    if team not in team_codes:
+                        team_codes[team] = len(teams)
+                        teams.append(team)
+
+                    n = len(columns["player"])
+                    columns["player"].append(player_code)
+                    columns["season"].append(season)
+                    columns["team"].append(team_codes[team])
+                    for key, (header, value) in keyed.items():
+                        if key in (season_key, team_key):
+                            continue
+                        number = parse_number(value)
+                        if key not in columns:
+                            if np.isnan(number):
+                                continue  # don't start a column with an unparseable value
+                            columns[key] = [np.nan] * n
+                            kind_headers[key] = header
+                        column = columns[key]
+                        column.extend([np.nan] * (n - len(column)))
+                        column.append(number)
+
+        tables = {}
+        for kind, columns in raw.items():
+            n = len(columns["player"])
+            if n == 0:
+                continue
+            arrays = {
+                "player": np.asarray(columns.pop("player"), dtype=np.int32),
+                "season": np.asarray(columns.pop("season"), dtype=np.int16),
+                "team": np.asarray(columns.pop("team"), dtype=np.int32),
+            }
+            for key, values in columns.items():
+                values.extend([np.nan] * (n - len(values)))
+                arrays[key] = np.asarray(values, dtype=np.float32)
+            tables[kind] = StatTable(kind, arrays, headers.get(kind, {}))
+        return cls(tables, players, teams)
+
+    def save(self, directory: str = STATS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        for name, table in self.tables.items():
+            path = os.path.join(directory, f"{name}.npz")
+            tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez_compressed(tmp_path, **table.columns)
+            os.replace(tmp_path, path)
+        DurableWriter(os.path.join(directory, "manifest.json")).write_json(
+            {
+                "tables": {name: table.headers for name, table in self.tables.items()},
+                "players": self.players,
+                "teams": self.teams,
+            }
+        )
+
+    @classmethod
+    def load(cls, directory: str = STATS_DIR) -> "StatsStore":
+        with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        tables = {}
+        for name, headers in manifest["tables"].items():
+            with np.load(os.path.join(directory, f"{name}.npz")) as data:
+                tables[name] = StatTable(name, {key: data[key] for key in data.files}, headers)
+        return cls(tables, manifest["players"], manifest["teams"])
+
+    # Queries
+
+    def resolve_stat(self, phrase: str, table: str = "regular_season") -> Optional[str]:
+        """Map 'receiving yards' (or a column key) to a column of `table`"""
+        columns = self.tables[table].columns if table in self.tables else {}
+        key = column_key(phrase)
+        if key in columns:
+            return key
+        for candidate in STAT_ALIASES.get(phrase.lower().strip(), ()):
+            if candidate in columns:
+                return candidate
+        return None
+
+    def team_codes(self, team: str) -> List[int]:
+        """Codes for a team given as abbreviation or nickname ('BAL' or 'Ravens')"""
+        team = team.strip().lower()
+        abbreviations = [a for a, nick in NFL_TEAMS.items() if nick.lower() == team or a.lower() == team]
+        codes = [self._team_codes[a] for a in abbreviations if a in self._team_codes]
+        if not codes:
+            codes = [code for label, code in self._team_codes.items() if team and team in label.lower()]
+        return codes
+
+    def mask(
+        self,
+        table: str,
+        season: Optional[int] = None,
+        seasons: Optional[Tuple[int, int]] = None,
+        team: Optional[str] = None,
+        player: Optional[str] = None,
+    ) -> np.ndarray:
+        columns = self.tables[table].columns
+        mask = np.ones(len(columns["player"]), dtype=bool)
+        if season is not None:
+            mask &= columns["season"] == season
+        if seasons is not None:
+            mask &= (columns["season"] >= seasons[0]) & (columns["season"] <= seasons[1])
+        if team is not None:
+            mask &= np.isin(columns["team"], self.team_codes(team))
+        if player is not None:
+            codes = [
+                code
+                for code, p in enumerate(self.players)
+                if p["id"] == player or p["name"].lower() == player.lower()
+            ]
+            mask &= np.isin(columns["player"], codes)
+        return mask
+
+    def leaders(
+        self,
+        stat: str,
+        table: str = "regular_season",
+        agg: str = "sum",
+        limit: int = 5,
+        ascending: bool = False,
+        **filters,
+    ) -> List[Tuple[str, float]]:
+        """
+        Top players for `stat` over the rows matching `filters`
+        (season, seasons, team, player), aggregated per player with
+        sum / max / mean. Returns [(player name, value), ...].
+        """
+        if table not in self.tables:
+            return []
+        column = self.resolve_stat(stat, table)
+        if column is None:
+            raise KeyError(f"Unknown stat {stat!r} for {table}")
+        columns = self.tables[table].columns
+        mask = self.mask(table, **filters) & ~np.isnan(columns[column])
+        if not mask.any():
+            return []
+
+        players = columns["player"][mask]
+        values = columns[column][mask].astype(np.float64)
+        n = len(self.players)
+        if agg == "sum":
+            totals = np.bincount(players, weights=values, minlength=n)
+        elif agg == "mean":
+            counts = np.bincount(players, minlength=n)
+            totals = np.bincount(players, weights=values, minlength=n) / np.maximum(counts, 1)
+        elif agg == "max":
+            totals = np.full(n, -np.inf)
+            np.maximum.at(totals, players, values)
+        else:
+            raise ValueError(f"Unknown aggregate {agg!r}")
+
+        present = np.unique(players)
+        order = np.argsort(totals[present] if ascending else -totals[present], kind="stable")
+        return [(self.players[p]["name"], float(totals[p])) for p in present[order][:limit]]
+
+    def season_range(self, table: str = "regular_season") -> Optional[Tuple[int, int]]:
+        if table not in self.tables or not len(self.tables[table]):
+            return None
+        seasons = self.tables[table].columns["season"]
+        return int(seasons.min()), int(seasons.max())
+
+    def answer(self, question: str) -> Optional[Dict]:
+        """
+        Answer 'who had the most receiving yards in 2021 among the Ravens'-style
+        questions, else None. Only whole questions matching STAT_QUESTION with
+        a season and/or team scope are answered: anything else (a named
+        player, "in NFL history", teams as the subject) goes to the LLM,
+        since the table only holds the crawled players' seasons.
+        """
+        text = " ".join(re.sub(r"[^a-z0-9 ]+", " ", question.lower()).split())
+        match = STAT_QUESTION.fullmatch(text)
+        if not match:
+            return None
+        scope = parse_scope(match.group("scope"))
+        if scope is None:
+            return None
+        filters, table = scope
+        if not filters:
+            return None  # unscoped means all-time, which the crawled sample can't answer
+        stat = match.group("stat")
+        if self.resolve_stat(stat, table) is None:
+            return None
+        covered = self.season_range(table)
+        years = [filters["season"]] if "season" in filters else list(filters.get("seasons", ()))
+        if years and (covered is None or min(years) < covered[0] or max(years) > covered[1]):
+            return None
+
+        ascending = match.group("direction") == "fewest"
+        leaders = self.leaders(stat, table=table, limit=3, ascending=ascending, **filters)
+        if not leaders:
+            return None
+        scope = []
+        if "team" in filters:
+            scope.append(f"among {filters['team']} players")
+        if "season" in filters:
+            scope.append(f"in {filters['season']}")
+        elif "seasons" in filters:
+            scope.append(f"from {filters['seasons'][0]} to {filters['seasons'][1]}")
+        if table == "postseason":
+            scope.append("in the playoffs")
+        (name, value), rest = leaders[0], leaders[1:]
+        text = f"{name} had the {'fewest' if ascending else 'most'} {stat}"
+        if scope:
+            text += " " + " ".join(scope)
+        text += f": {value:,.0f}"
+        if rest:
+            text += " (followed by " + ", ".join(f"{n} with {v:,.0f}" for n, v in rest) + ")"
+        return {"answer": text + ".", "stat": stat, "filters": filters, "leaders": leaders}
+
+
+def build_stats(source: Optional[str] = None, directory: str = STATS_DIR) -> StatsStore:
+    """Ingest wikitables from the merged players file (or the raw wiki file) into `directory`"""
+    if source is None:
+        source = MERGED_PLAYERS_FILE if os.path.exists(MERGED_PLAYERS_FILE) else WIKI_PLAYERS_FILE
+    start = time.perf_counter()
+    store = StatsStore.from_records(iter_players(source))
+    store.save(directory)
+    for name, table in store.tables.items():
+        print(f"{name}: {len(table)} player-seasons, {len(table.stat_columns())} stat columns")
+    print(
+        f"Built stats for {len(store.players)} players from {source} "
+        f"in {time.perf_counter() - start:.2f}s -> {directory}"
+    )
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the columnar stats store")
+    parser.add_argument("--source", default=None)
+    parser.add_argument("--dir", default=STATS_DIR)
+    parser.add_argument("--ask", default=None, help="e.g. 'most receiving yards in 2021 among Ravens'")
+    args = parser.parse_args()
+    if args.ask:
+        print(StatsStore.load(args.dir).answer(args.ask))
+    else:
+        build_stats(args.source, args.dir)
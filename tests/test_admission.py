@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from serving.admission import AdmissionController, Rejected
+
+
+def test_limit_charges_without_taking_a_slot():
+    admission = AdmissionController(max_in_flight=1, client_rate=0.001, client_burst=2)
+    admission.limit("a")
+    admission.limit("a")
+    with pytest.raises(Rejected) as e:
+        admission.limit("a")
+    assert e.value.status == 429
+    assert admission.in_flight == 0
+    admission.limit("b")  # buckets are per client
+
+
+def test_admit_without_client_skips_the_bucket():
+    admission = AdmissionController(max_in_flight=1, client_rate=0.001, client_burst=1)
+
+    async def run():
+        admission.limit("a")
+        # Already charged: admitting must not charge "a" again
+        async with admission.admit():
+            assert admission.in_flight == 1
+        async with admission.admit():
+            pass
+        assert admission.in_flight == 0
+        with pytest.raises(Rejected):
+            async with admission.admit("a"):
+                pass
+
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+import pytest
+
+from app.storage import dedup
+from app.storage.dedup import NearDuplicateDetector, collapse_duplicates
+
+BIO = (
+    "Lamar Demeatrice Jackson Jr. (born January 7, 1997) is an American football quarterback "
+    "for the Baltimore Ravens of the National Football League (NFL). He played college football "
+    "at Louisville, where he won the Heisman Trophy as a sophomore."
+)
+
+
+def test_same_player_near_duplicates_collapse_to_longest():
+    items = [
+        ("a", BIO, "Lamar Jackson"),
+        ("b", BIO + " He was the unanimous MVP in 2019.", "Lamar Jackson Jr."),
+        ("c", "Zay Flowers (born 2000) is a wide receiver. " * 5, "Zay Flowers"),
+    ]
+    survivors, collapsed = collapse_duplicates(items)
+    assert survivors == ["b", "c"]
+    assert collapsed == 1
+
+
+def test_different_players_with_same_text_are_kept():
+    # Same scraped bio under two names is not evidence they are one person
+    survivors, collapsed = collapse_duplicates([("a", BIO, "Lamar Jackson"), ("b", BIO, "Tyler Huntley")])
+    assert survivors == ["a", "b"]
+    assert collapsed == 0
+
+
+def test_short_boilerplate_only_collapses_verbatim_repeats_of_one_player():
+    items = [
+        ("zach", "Available in:", "Zachary Thomas"),
+        ("case", "Available in:", "Case Keenum"),
+        ("jerry", "Available in:", "Jerry Hughes"),
+        ("zach-again", "Available in:", "Zachary Thomas"),
+        ("cj", "Career Honours", "C.J. Stroud"),
+        ("jarrett", "Career Honours", "Jarrett Patterson"),
+    ]
+    survivors, collapsed = collapse_duplicates(items)
+    assert survivors == ["zach", "case", "jerry", "cj", "jarrett"]
+    assert collapsed == 1
+
+
+@pytest.mark.skipif(dedup.np is None, reason="numpy not installed")
+def test_numpy_and_python_signatures_agree(monkeypatch):
+    vectorized = NearDuplicateDetector().signature(BIO)
+    monkeypatch.setattr(dedup, "np", None)
+    assert NearDuplicateDetector().signature(BIO) == vectorized
@@ -0,0 +1,65 @@
+import ast
+import os
+import sqlite3
+
+from storage.doc_store import DocStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DATA = os.path.join(ROOT, "app", "sample_data.py")
+
+
+def legacy_docs(path):
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return ast.literal_eval(content[content.find("["): content.rfind("]") + 1])
+
+
+def test_legacy_sample_data_round_trips(tmp_path):
+    docs = legacy_docs(SAMPLE_DATA)
+    assert sum(1 for doc in docs if not doc["title"]) > 1
+
+    store = DocStore(str(tmp_path / "docs.sqlite3"))
+    assert store.import_sample_data(SAMPLE_DATA) == len(docs)
+    assert len(store) == len(docs)
+
+    exported = str(tmp_path / "sample_data.py")
+    store.export_sample_data(exported)
+    assert legacy_docs(exported) == docs
+
+    # Re-importing the export updates rows in place instead of adding new ones
+    store.import_sample_data(exported)
+    assert len(store) == len(docs)
+    store.close()
+
+
+def test_untitled_docs_are_keyed_by_url_then_content(tmp_path):
+    store = DocStore(str(tmp_path / "docs.sqlite3"))
+    store.upsert_many(
+        [
+            {"title": "", "content": "a", "metadata": {"url": "https://x/1"}},
+            {"title": "", "content": "b", "metadata": {"url": "https://x/2"}},
+            {"title": "", "content": "c"},
+            {"title": "", "content": "d"},
+        ]
+    )
+    assert len(store) == 4
+    store.upsert({"title": "Renamed", "content": "a2", "metadata": {"url": "https://x/1"}})
+    assert len(store) == 4
+    assert store.get("https://x/1")["title"] == "Renamed"
+    store.close()
+
+
+def test_title_keyed_store_is_migrated(tmp_path):
+    path = str(tmp_path / "docs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE docs (title TEXT PRIMARY KEY, content TEXT NOT NULL, metadata TEXT)")
+    conn.execute("INSERT INTO docs VALUES ('Tom Brady', 'QB', NULL)")
+    conn.execute("INSERT INTO docs VALUES ('', 'x', '{\"url\": \"https://x/1\"}')")
+    conn.commit()
+    conn.close()
+
+    store = DocStore(path)
+    assert len(store) == 2
+    assert "Tom Brady" in store
+    assert store.get("https://x/1") == {"title": "", "content": "x", "metadata": {"url": "https://x/1"}}
+    store.close()
@@ -0,0 +1,70 @@
+import json
+import os
+
+from app.storage.durable import DurableWriter, is_complete_json
+
+
+def players_file(path, names):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"players": [{"name": name} for name in names]}, f)
+
+
+def test_is_valid_uses_checksum_and_catches_truncation(tmp_path):
+    writer = DurableWriter(str(tmp_path / "players.json"), backup_dir=str(tmp_path / "backups"))
+    writer.write_players([{"name": "A"}, {"name": "B"}])
+    assert writer.is_valid()
+
+    with open(writer.path, "rb") as f:
+        data = f.read()
+    for cut in (len(data) - 1, len(data) // 2, 0):
+        with open(writer.path, "wb") as f:
+            f.write(data[:cut])
+        assert not writer.is_valid()
+
+    # A good file without a checksum (written before this version) still validates
+    os.remove(writer.checksum_path)
+    with open(writer.path, "wb") as f:
+        f.write(data)
+    assert writer.is_valid()
+
+
+def test_is_complete_json(tmp_path):
+    path = str(tmp_path / "p.json")
+    for text, ok in (
+        ('{"players": [{"a": 1}]}', True),
+        ('[{"a": 1}, {"b": [1, 2]}]\n', True),
+        ('{"players": [{"a": 1}]', False),
+        ('{"players": [{"a": 1}, {"b": ', False),
+        ("", False),
+        ("not json", False),
+    ):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        assert is_complete_json(path) is ok, text
+
+
+def test_adopt_legacy_backups(tmp_path):
+    backups = tmp_path / "backups"
+    backups.mkdir()
+    for count in (50, 100, 150, 200):
+        players_file(backups / f"players_backup_{count}.json", [f"P{count}"])
+    with open(backups / "players_backup_250.json", "w") as f:
+        f.write('{"players": [')  # truncated by a crash
+    players_file(backups / "wiki_players_backup_10.json", ["W"])
+
+    writer = DurableWriter(str(tmp_path / "players.json"), backup_dir=str(backups), keep=2)
+    assert writer.adopt_legacy_backups("players") == 2
+    assert sorted(os.listdir(backups)) == [
+        "players.json.gen000001",
+        "players.json.gen000002",
+        "players.json.generations.json",
+        "wiki_players_backup_10.json",
+    ]
+
+    # The newest complete legacy copy is what a corrupt target is restored from
+    with open(writer.path, "w") as f:
+        f.write("{")
+    assert writer.restore() == 2
+    with open(writer.path) as f:
+        assert json.load(f)["players"] == [{"name": "P200"}]
+    assert writer.adopt_legacy_backups("players") == 0
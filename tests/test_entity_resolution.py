@@ -0,0 +1,28 @@
+import json
+import os
+
+from app.storage.entity_resolution import refresh_merged
+
+
+def write(path, players):
+    path.write_text(json.dumps({"players": players}), encoding="utf-8")
+
+
+def test_refresh_merged_follows_inputs(tmp_path):
+    players, wiki, merged = tmp_path / "players.json", tmp_path / "wiki.json", tmp_path / "merged.json"
+    write(players, [{"url": "https://www.thesportsdb.com/player/1-Zay-Flowers", "name": "Zay Flowers"}])
+    write(wiki, [])
+
+    assert refresh_merged(str(players), str(wiki), str(merged))
+    assert not refresh_merged(str(players), str(wiki), str(merged))
+
+    # A later crawl rewrites players.json
+    write(players, [
+        {"url": "https://www.thesportsdb.com/player/1-Zay-Flowers", "name": "Zay Flowers"},
+        {"url": "https://www.thesportsdb.com/player/2-Lamar-Jackson", "name": "Lamar Jackson"},
+    ])
+    stamp = os.stat(merged).st_mtime_ns + 1_000_000
+    os.utime(players, ns=(stamp, stamp))
+    assert refresh_merged(str(players), str(wiki), str(merged))
+    names = {p["name"] for p in json.loads(merged.read_text())["players"]}
+    assert names == {"Zay Flowers", "Lamar Jackson"}
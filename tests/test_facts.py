@@ -0,0 +1,62 @@
+import pytest
+
+from serving.facts import FactIndex, classify
+from storage.player_table import PlayerTable
+
+PLAYERS = [
+    {"name": "Mark Andrews", "position": "Tight End", "height": "6 ft 5 in", "birth_year": 1995},
+    {"name": "Lamar Jackson", "position": "Quarterback", "birth_year": 1997},
+    {"name": "Rasheen Ali", "position": "Running Back"},
+]
+
+
+@pytest.fixture(scope="module")
+def facts():
+    return FactIndex(PlayerTable.from_records(PLAYERS))
+
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        ("What position does Mark Andrews play?", ("position", "mark andrews")),
+        ("what is lamar jackson's position", ("position", "lamar jacksons")),
+        ("When was Lamar Jackson born?", ("birth_year", "lamar jackson")),
+        ("What's Mark Andrews' height?", ("height", "mark andrews")),
+        ("Which team does Rasheen Ali play for?", ("team", "rasheen ali")),
+        # Only whole-question forms take the fast path
+        ("What position did Mark Andrews play in high school?", None),
+        ("Did Mark Andrews change position?", None),
+        ("Which team drafted Lamar Jackson?", None),
+        ("Why is Lamar Jackson's team so good?", None),
+        ("position", None),
+    ],
+)
+def test_classify(question, expected):
+    assert classify(question) == expected
+
+
+@pytest.mark.parametrize(
+    "question, answer",
+    [
+        ("What position does Mark Andrews play?", "Mark Andrews plays Tight End."),
+        ("What is Lamar Jackson's position?", "Lamar Jackson plays Quarterback."),
+        ("How tall is Mark Andrews?", "Mark Andrews is 6 ft 5 in tall."),
+        ("when was lamar jackson born", "Lamar Jackson was born in 1997."),
+        # Qualifiers make the name slot more than a name
+        ("How tall is Mark Andrews in cleats?", None),
+        ("When was Lamar Jackson born and where?", None),
+        # Nobody has a team, so team questions always go to the LLM
+        ("What team is Rasheen Ali on?", None),
+        # Missing value
+        ("How tall is Lamar Jackson?", None),
+        ("How tall is Someone Else?", None),
+    ],
+)
+def test_answer(facts, question, answer):
+    fact = facts.answer(question)
+    assert (fact and fact["answer"]) == answer
+
+
+def test_fields_without_data_are_skipped(facts):
+    assert "team" not in facts.fields
+    assert {"position", "height", "birth_year"} <= facts.fields
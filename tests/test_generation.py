@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from serving.generation import BatchScheduler, FallbackGenerator, Generator
+
+
+class Echo(Generator):
+    name = "echo"
+
+    def stream(self, question, context):
+        yield from question.split()
+
+
+def test_generator_requires_stream():
+    with pytest.raises(TypeError):
+        Generator()
+    assert Echo().generate("a b", "") == "ab"
+
+
+def test_fallback_streams_from_secondary_when_primary_fails():
+    class Broken(Generator):
+        name = "broken"
+
+        def stream(self, question, context):
+            raise ConnectionError("offline")
+            yield
+
+    generator = FallbackGenerator(Broken(), Echo())
+    assert list(generator.stream("a b", "")) == ["a", "b"]
+
+
+def test_oversized_prompt_fails_only_its_own_request():
+    batches = []
+
+    def run_batch(batch):
+        batches.append([r.prompt_ids for r in batch])
+        for request in batch:
+            request.pieces.put(str(len(request.prompt_ids)))
+            request.pieces.put(None)
+
+    scheduler = BatchScheduler(run_batch, max_batch=4, max_wait=0.05, max_prompt=3)
+    results = {}
+
+    def ask(name, prompt_ids):
+        try:
+            results[name] = list(scheduler.submit(prompt_ids))
+        except ValueError as e:
+            results[name] = e
+
+    threads = [
+        threading.Thread(target=ask, args=("short", [1, 2])),
+        threading.Thread(target=ask, args=("long", [1, 2, 3, 4])),
+        threading.Thread(target=ask, args=("empty", [])),
+        threading.Thread(target=ask, args=("fits", [1, 2, 3])),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results["short"] == ["2"]
+    assert results["fits"] == ["3"]
+    assert isinstance(results["long"], ValueError)
+    assert isinstance(results["empty"], ValueError)
+    assert all(len(ids) <= 3 for batch in batches for ids in batch)
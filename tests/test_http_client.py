@@ -0,0 +1,56 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.scrapers.http_client import FetchClient, get_client
+
+BODY = ("Lamar Jackson, Baltimore Ravens. " * 2000).encode("utf-8")
+GZIPPED = gzip.compress(BODY)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Encoding", "gzip")
+        if self.path == "/chunked":
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(GZIPPED), 64):
+                chunk = GZIPPED[i : i + 64]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(GZIPPED)))
+            self.end_headers()
+            self.wfile.write(GZIPPED)
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.mark.parametrize("path", ["/sized", "/chunked"])
+def test_wire_bytes_are_compressed_bytes(server, path):
+    client = FetchClient()
+    response = client.get(server + path)
+    assert response.content == BODY
+    snap = client.metrics.snapshot()
+    assert snap["bytes_wire"] == len(GZIPPED)
+    assert snap["bytes_decoded"] == len(BODY)
+
+
+def test_uncached_client_is_separate():
+    assert get_client(cached=False).cache is None
+    assert get_client(cached=False) is get_client(cached=False)
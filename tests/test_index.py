@@ -0,0 +1,81 @@
+import chromadb
+import pytest
+
+from serving.index import IndexRefresher, build_generation
+
+
+def bio(name, detail):
+    return (
+        f"{name} (born 1997) is an American football player for the Baltimore Ravens of the National "
+        f"Football League. He played college football at {detail} and was drafted in the first round."
+    )
+
+
+PLAYERS = [
+    {"name": "Lamar Jackson", "description": bio("Lamar Jackson", "Louisville")},
+    {"name": "Zay Flowers", "description": bio("Zay Flowers", "Boston College")},
+    {"name": "Mark Andrews", "description": bio("Mark Andrews", "Oklahoma")},
+]
+
+
+@pytest.fixture
+def client():
+    client = chromadb.EphemeralClient()
+    yield client
+    for name in client.list_collections():
+        client.delete_collection(name=name if isinstance(name, str) else name.name)
+
+
+def test_rebuild_only_embeds_changed_descriptions(client):
+    calls = []
+
+    def embed(text):
+        calls.append(text)
+        return [float(len(text)), float(text.count("a")), 1.0]
+
+    first = build_generation(1, client, embed, PLAYERS)
+    assert first.embedded == 3
+
+    calls.clear()
+    refreshed = [
+        PLAYERS[0],
+        {"name": "Zay Flowers", "description": bio("Zay Flowers", "Boston College, where he set receiving records")},
+        {"name": "Roquan Smith", "description": bio("Roquan Smith", "Georgia")},
+    ]
+    second = build_generation(2, client, embed, refreshed, previous=first)
+
+    assert second.embedded == 2
+    assert calls == [refreshed[1]["description"], refreshed[2]["description"]]
+    assert sorted(second.ids) == sorted(f"{p['name']}_{i}" for i, p in enumerate(refreshed))
+    # The reused vector is the one computed for the same text
+    lamar = second.shards["nfl"].get(ids=["Lamar Jackson_0"], include=["embeddings"])["embeddings"][0]
+    assert list(lamar) == embed(PLAYERS[0]["description"])
+
+
+def collection_names(client):
+    return {name if isinstance(name, str) else name.name for name in client.list_collections()}
+
+
+def test_swaps_keep_generations_that_requests_still_hold(client, tmp_path):
+    players_file = tmp_path / "players.json"
+    players_file.write_text("[]")
+    refresher = IndexRefresher(
+        client,
+        lambda text: [float(len(text)), 1.0, 0.0],
+        source=lambda: str(players_file),
+        load=lambda path: PLAYERS,
+        retain=1,
+    )
+    refresher.rebuild()
+
+    with refresher.acquire() as pinned:
+        assert pinned.number == 1
+        # Several quick swaps while a request is still querying generation 1
+        refresher.rebuild()
+        refresher.rebuild()
+        refresher.rebuild()
+        assert collection_names(client) == {"sports_g1_nfl", "sports_g3_nfl", "sports_g4_nfl"}
+        assert pinned.shards["nfl"].count() == 3
+
+    # Released: generation 1 goes, the newest retired one stays
+    assert collection_names(client) == {"sports_g3_nfl", "sports_g4_nfl"}
@@ -0,0 +1,46 @@
+import json
+
+from app.scrapers.sportsdb.jobs import JobQueue, export_players
+
+PLAYER = "https://www.thesportsdb.com/player/1-A"
+
+
+def test_expired_leases_stop_after_max_attempts(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=3)
+    queue.enqueue([("player", PLAYER, "NFL", None)])
+
+    # The worker "crashes" every time: each lease expires without complete() or fail()
+    attempts = []
+    for _ in range(10):
+        task = queue.lease("w", lease_seconds=-1)
+        if task is None:
+            break
+        attempts.append(task["attempt"])
+    assert attempts == [1, 2, 3]
+    assert queue.counts() == {"player": {"failed": 1}}
+    assert queue.pending() == 0
+
+
+def test_live_lease_is_not_handed_out_again(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.enqueue([("player", PLAYER, "NFL", None)])
+    assert queue.lease("a", lease_seconds=60)["attempt"] == 1
+    assert queue.lease("b") is None
+
+
+def test_export_upserts_into_existing_players(tmp_path):
+    output = tmp_path / "players.json"
+    existing = [
+        {"url": PLAYER, "name": "A", "description": "old"},
+        {"url": "https://www.thesportsdb.com/player/2-B", "name": "B", "description": "kept"},
+    ]
+    output.write_text(json.dumps({"players": existing}))
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.save_player({"url": PLAYER, "name": "A", "description": "new"}, "NFL", None, "h")
+    queue.close()
+
+    assert export_players(str(tmp_path / "jobs.sqlite3"), str(output)) == 1
+    players = {p["name"]: p for p in json.loads(output.read_text())["players"]}
+    assert players["A"]["description"] == "new"
+    assert players["A"]["league"] == "NFL"
+    assert players["B"]["description"] == "kept"
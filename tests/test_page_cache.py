@@ -0,0 +1,57 @@
+import os
+
+from app.scrapers.page_cache import PageCache, replay
+from app.scrapers.wiki.crawler import BASE_WIKI_URL
+from app.scrapers.wiki.crawler import replay_parse as wiki_replay_parse
+
+WIKI_PAGE = (
+    '<html><body><div class="mw-parser-output">'
+    "<h2>Early life</h2><p>Born in Pompano Beach.</p>"
+    "<h2>References</h2><p>[1]</p>"
+    "</div></body></html>"
+)
+
+
+def parse_length(html, url):
+    return {"url": url, "length": len(html)} if "skip" not in url else None
+
+
+def test_put_get_hit_and_miss(tmp_path):
+    cache = PageCache(str(tmp_path))
+    assert cache.get("https://x/1") is None
+    assert cache.body("https://x/1") is None
+
+    sha = cache.put("https://x/1", "<p>one</p>", headers={"ETag": "abc", "Set-Cookie": "s"})
+    page = cache.get("https://x/1")
+    assert page.sha256 == sha
+    assert page.headers == {"ETag": "abc"}
+    assert cache.body("https://x/1") == "<p>one</p>"
+
+    # Identical bodies share one object; a new body replaces the URL's entry
+    assert cache.put("https://x/2", "<p>one</p>") == sha
+    cache.put("https://x/1", "<p>two</p>")
+    assert cache.body("https://x/1") == "<p>two</p>"
+    assert cache.body("https://x/2") == "<p>one</p>"
+    assert len(cache) == 2
+
+
+def test_replay_parses_entries_under_prefix(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.put("https://x/a", "aa")
+    cache.put("https://x/skip", "bbb")
+    cache.put("https://y/c", "cccc")
+
+    results = replay(cache, parse_length, prefix="https://x/", workers=2)
+    assert results == [{"url": "https://x/a", "length": 2}]
+
+
+def test_wiki_replay_has_no_crawler_side_effects(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = PageCache(str(tmp_path / "cache"))
+    cache.put(BASE_WIKI_URL + "Zach_Thomas", WIKI_PAGE)
+
+    [player] = replay(cache, wiki_replay_parse, prefix=BASE_WIKI_URL, workers=1)
+    assert player["name"] == "Zach_Thomas"
+    assert player["sections"] == {"Early_life": "Born in Pompano Beach."}
+    # Parsing never builds a WikipediaCrawler, so no data dirs or backups appear
+    assert not os.path.exists(tmp_path / "app")
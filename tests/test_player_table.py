@@ -0,0 +1,66 @@
+from storage.player_table import PlayerTable
+
+RECORDS = [
+    {
+        "id": "p1",
+        "name": "Lamar Jackson",
+        "url": "https://www.thesportsdb.com/player/34161033-Lamar-Jackson",
+        "description": "Lamar Jackson is a quarterback. Zoë café ✓",
+        "team": "Baltimore Ravens",
+        "position": "Quarterback",
+        "nationality": "United States",
+        "status": "Active",
+        "birth_place": "Pompano Beach, Florida",
+        "number": "8",
+        "height": "6 ft 2 in",
+        "weight": "205 lbs",
+        "league": "NFL",
+        "birth_year": 1997,
+        "honors": [{"honor": "NFL MVP", "year": "2019"}, {"honor": "NFL MVP", "year": "2023"}],
+    },
+    {
+        "id": "p2",
+        "name": "Zay Flowers",
+        "url": "https://www.thesportsdb.com/player/34249334-Zay-Flowers",
+        "description": "Zay Flowers is a wide receiver.",
+        "team": "Baltimore Ravens",
+        "position": "Wide Receiver",
+        "nationality": "United States",
+        "status": "Active",
+        "birth_place": "Fort Lauderdale, Florida",
+        "number": "4",
+        "height": "5 ft 9 in",
+        "weight": "182 lbs",
+        "league": "NFL",
+        "birth_year": 2000,
+        "honors": [],
+    },
+]
+
+
+def test_records_round_trip():
+    table = PlayerTable.from_records(RECORDS)
+    assert len(table) == 2
+    assert list(table) == RECORDS
+    assert table.record(0)["description"].endswith("Zoë café ✓")
+
+
+def test_missing_fields_come_back_empty():
+    table = PlayerTable.from_records([{"name": "Mark Andrews"}])
+    record = table.record(0)
+    assert record["name"] == "Mark Andrews"
+    assert record["team"] == "" and record["description"] == ""
+    assert record["birth_year"] is None
+    assert record["honors"] == []
+
+
+def test_shared_values_are_pooled_and_names_indexed():
+    table = PlayerTable.from_records(RECORDS + [{"name": "Lamar Jackson", "team": "Other"}])
+    assert table.pooled["team"][0] == table.pooled["team"][1]
+    assert table.pool.values.count("Baltimore Ravens") == 1
+    assert table.pool.values.count("NFL MVP") == 1
+    # The first record with a name wins the lookup
+    assert table.find("Lamar Jackson") == 0
+    assert table.find("Zay Flowers") == 1
+    assert table.find("Nobody") is None
+    assert table.field(1, "honors") == []
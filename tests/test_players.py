@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from app.storage import players
+from app.storage.players import count_players, iter_players
+
+
+@pytest.fixture(autouse=True)
+def stdlib_reader(monkeypatch):
+    # Exercise the fallback reader even where ijson is installed
+    monkeypatch.setattr(players, "ijson", None)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 7, 64])
+@pytest.mark.parametrize(
+    "data",
+    [
+        [1, 2.5, 3],
+        [-12, 1e5, 0.125, 100000],
+        [{"name": "Lamar Jackson", "birth_year": 1997, "height": 1.88}, {"name": "Zay Flowers", "number": 4}],
+        {"meta": {"n": 2.75}, "players": [{"name": "a", "weight": 215.5}, {"name": "b"}]},
+        [{"name": "x", "tags": ["a", "b"], "active": True, "team": None}],
+        [],
+        {"players": []},
+    ],
+)
+def test_chunk_boundaries(tmp_path, data, chunk_size):
+    path = tmp_path / "players.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    expected = data["players"] if isinstance(data, dict) else data
+    assert list(iter_players(str(path), chunk_size=chunk_size)) == expected
+
+
+def test_projection_and_count(tmp_path):
+    path = tmp_path / "players.json"
+    path.write_text(json.dumps({"players": [{"name": "a", "url": "u1"}, {"name": "b", "url": "u2"}]}))
+    assert list(iter_players(str(path), fields=("url",), chunk_size=3)) == [{"url": "u1"}, {"url": "u2"}]
+    assert count_players(str(path)) == 2
+
+
+def test_jsonl(tmp_path):
+    path = tmp_path / "players.jsonl"
+    path.write_text('{"name": "a"}\n\n{"name": "b"}\n')
+    assert [p["name"] for p in iter_players(str(path))] == ["a", "b"]
+
+
+def test_malformed_array(tmp_path):
+    path = tmp_path / "players.json"
+    path.write_text('[1 2]')
+    with pytest.raises(ValueError):
+        list(iter_players(str(path), chunk_size=2))
@@ -0,0 +1,64 @@
+import json
+import time
+
+from serving.query_log import QueryLog, WarmStart, log_files, mine, scrub
+from storage.durable import DurableWriter, file_sha256
+
+
+def wait_for_lines(directory, expected, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        lines = [line for path in log_files(directory) for line in open(path, encoding="utf-8")]
+        if len(lines) >= expected:
+            return lines
+        time.sleep(0.01)
+    raise AssertionError(f"query log never reached {expected} lines")
+
+
+def test_scrub_removes_contact_details():
+    assert scrub("mail me at fan@example.com or +1 (555) 123-4567") == "mail me at <email> or <number>"
+
+
+def test_log_then_prewarm_round_trip(tmp_path):
+    directory = str(tmp_path / "query_log")
+    log = QueryLog(directory, sample_rate=1.0)
+    for question in (
+        "Tell me about Lamar Jackson",
+        "tell me about lamar jackson!",
+        "About Lamar Jackson?",
+        "Who is C.J. Stroud?",
+        "who is cj stroud",
+        "How tall is Zay Flowers?",
+    ):
+        log.log(question, "/ask")
+    lines = wait_for_lines(directory, 6)
+    assert all(set(json.loads(line)) == {"ts", "q", "endpoint"} for line in lines)
+
+    clusters = mine(log_files(directory), top_n=10, min_count=2)
+    assert [(c["cluster"], c["count"]) for c in clusters] == [
+        ("lamar jackson", 3),
+        ("who is cj stroud", 2),
+    ]
+    assert clusters[0]["question"] == "tell me about lamar jackson"
+
+    # What prewarm.py writes, minus the model calls
+    players_file = tmp_path / "players.json"
+    players_file.write_text('{"players": []}')
+    artifact = str(tmp_path / "warm_start.json")
+    DurableWriter(artifact).write_json(
+        {
+            "players_sha256": file_sha256(str(players_file)),
+            "entries": [{**c, "docs": ["doc"], "ids": ["id"], "answer": "answer"} for c in clusters],
+        }
+    )
+
+    warm = WarmStart.load(artifact, str(players_file))
+    warm.attach(3)
+    assert warm.get("Can you tell me about Lamar Jackson?", 3)["answer"] == "answer"
+    assert warm.get("Who is CJ Stroud", 3)["docs"] == ["doc"]
+    assert warm.get("How tall is Zay Flowers?", 3) is None
+    assert warm.get("Tell me about Lamar Jackson", 4) is None  # a newer index generation
+
+    # Built from other player data: not used at all
+    players_file.write_text('{"players": [{"name": "Zay Flowers"}]}')
+    assert WarmStart.load(artifact, str(players_file)) is None
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from app.scrapers.http_client import FetchClient
+from app.scrapers.sportsdb import crawler as crawler_module
+from app.scrapers.sportsdb.refresh import RefreshState, apply_delta, pending_deltas
+
+SITE = "https://www.thesportsdb.com"
+
+
+def player_page(name, description):
+    return (
+        f"<html><body><b>Name</b><br><font><a>{name}</a></font>"
+        f"<b>Description</b><br><p>{description}</p></body></html>"
+    )
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    # The crawler and refresh state use paths relative to the repo root
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(crawler_module, "get_client", lambda: FetchClient())
+    monkeypatch.setattr(crawler_module, "sleep", lambda seconds: None)
+    pages = {
+        "/league/4391-NFL": '<a href="/team/1-Ravens">Ravens</a>',
+        "/team/1-Ravens": '<a href="/player/11-Lamar-Jackson">L</a><a href="/player/12-Zay-Flowers">Z</a>',
+        "/player/11-Lamar-Jackson": player_page("Lamar Jackson", "Quarterback."),
+        "/player/12-Zay-Flowers": player_page("Zay Flowers", "Wide receiver."),
+    }
+    crawler = crawler_module.SportsDBCrawler()
+    crawler.progress.interval = 3600
+    monkeypatch.setattr(crawler, "fetch_page", lambda url: pages.get(url[len(SITE):], ""))
+    return crawler, pages, tmp_path
+
+
+def players(tmp_path):
+    with open(tmp_path / "app/data/players.json", encoding="utf-8") as f:
+        return {p["name"]: p["description"] for p in json.load(f)["players"]}
+
+
+def test_refresh_applies_changes_to_players_file(site):
+    crawler, pages, tmp_path = site
+    crawler.refresh("NFL")
+    assert players(tmp_path) == {"Lamar Jackson": "Quarterback.", "Zay Flowers": "Wide receiver."}
+    assert pending_deltas("app/data/deltas") == []
+
+    pages["/team/1-Ravens"] = '<a href="/player/12-Zay-Flowers">Z</a>'
+    pages["/player/12-Zay-Flowers"] = player_page("Zay Flowers", "Wide receiver, 2023 first-round pick.")
+    crawler.refresh("NFL")
+    assert players(tmp_path) == {"Zay Flowers": "Wide receiver, 2023 first-round pick."}
+
+
+@pytest.mark.parametrize("run", ["refresh", "crawl_league"])
+def test_players_are_tagged_with_their_league(site, run):
+    crawler, pages, tmp_path = site
+    getattr(crawler, run)("NFL")
+    with open(tmp_path / "app/data/players.json", encoding="utf-8") as f:
+        assert {p["name"]: p.get("league") for p in json.load(f)["players"]} == {
+            "Lamar Jackson": "NFL",
+            "Zay Flowers": "NFL",
+        }
+
+
+def test_hashes_are_not_committed_before_the_delta_is_applied(site, monkeypatch):
+    crawler, pages, tmp_path = site
+    crawler.refresh("NFL")
+    zay = f"{SITE}/player/12-Zay-Flowers"
+    old_hash = RefreshState().content_hash(zay)
+
+    pages["/player/12-Zay-Flowers"] = player_page("Zay Flowers", "Traded.")
+
+    def crash(writer, delta_dir=None):
+        raise OSError("disk full")
+
+    apply = crawler_module.apply_pending_deltas
+    monkeypatch.setattr(crawler_module, "apply_pending_deltas", crash)
+    with pytest.raises(OSError):
+        crawler.refresh("NFL")
+    assert RefreshState().content_hash(zay) == old_hash
+    assert players(tmp_path)["Zay Flowers"] == "Wide receiver."
+
+    # The next run still sees the change and delivers it
+    monkeypatch.setattr(crawler_module, "apply_pending_deltas", apply)
+    crawler.refresh("NFL")
+    assert players(tmp_path)["Zay Flowers"] == "Traded."
+    assert RefreshState().content_hash(zay) != old_hash
+
+
+def test_apply_delta_replaces_every_copy_of_a_url():
+    players = [
+        {"url": "u", "v": "old1"},
+        {"url": "a", "v": "a"},
+        {"url": "u", "v": "old2"},
+        {"url": "gone", "v": "x"},
+        {"url": "u", "v": "old3"},
+        {"url": "gone", "v": "y"},
+        {"url": "a", "v": "a-dup"},
+    ]
+    delta = {"upserts": [{"url": "u", "v": "new"}, {"url": "n", "v": "added"}], "removed": ["gone"]}
+    assert list(apply_delta(players, delta)) == [
+        {"url": "u", "v": "new"},
+        {"url": "a", "v": "a"},
+        {"url": "a", "v": "a-dup"},  # untouched URLs keep their records
+        {"url": "n", "v": "added"},
+    ]
+
+
+def test_save_data_appends_to_existing_players(site):
+    crawler, pages, tmp_path = site
+    crawler.refresh("NFL")
+    crawler.players_data = [{"name": "Derrick Henry", "description": "Running back."}]
+    crawler.save_data()
+    assert players(tmp_path) == {
+        "Lamar Jackson": "Quarterback.",
+        "Zay Flowers": "Wide receiver.",
+        "Derrick Henry": "Running back.",
+    }
+    assert crawler.players_data == []
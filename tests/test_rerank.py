@@ -0,0 +1,24 @@
+import numpy as np
+
+from serving.rerank import Reranker, description_terms
+from storage.player_table import PlayerTable
+
+PLAYERS = [
+    {"name": "Mark Andrews", "position": "Tight End", "description": "Mark Andrews is a tight end from Oklahoma."},
+    {"name": "Lamar Jackson", "position": "Quarterback", "description": "Lamar Jackson won the MVP award twice."},
+    {"name": "Zay Flowers", "position": "Wide Receiver", "description": "Zay Flowers played at Boston College."},
+]
+
+
+def test_cached_terms_score_like_fresh_tokenization():
+    table = PlayerTable.from_records(PLAYERS)
+    terms = description_terms(table)
+    reranker = Reranker(final_k=2)
+    rows, distances = [2, 0, 1], [0.3, 0.4, 0.5]
+    for question in ("Which tight end played at Oklahoma?", "Who won MVP twice?", "boston college receiver"):
+        fresh = reranker.features(question, table, rows, distances)
+        cached = reranker.features(question, table, rows, distances, terms)
+        assert np.array_equal(fresh, cached)
+    # With equal distances the lexical match decides
+    ranked, ids = reranker.rerank("Who won MVP twice?", table, rows, ["z", "m", "l"], [0.4] * 3, terms)
+    assert ranked[0] == 1 and ids[0] == "l"
@@ -0,0 +1,77 @@
+import chromadb
+import pytest
+
+from serving.index import build_generation
+from serving.router import ShardRouter, shard_name
+
+PLAYERS = [
+    {
+        "name": "Lamar Jackson",
+        "team": "Baltimore Ravens",
+        "description": "Lamar Jackson (born 1997) is a quarterback for the Baltimore Ravens.",
+    },
+    {
+        "name": "Zay Flowers",
+        "team": "Baltimore Ravens",
+        "league": "NFL",
+        "description": "Zay Flowers (born 2000) is a wide receiver for the Baltimore Ravens.",
+    },
+    {
+        "name": "LeBron James",
+        "team": "Los Angeles Lakers",
+        "league": "NBA",
+        "description": "LeBron James (born 1984) is a forward for the Los Angeles Lakers.",
+    },
+]
+
+
+def test_shard_name_defaults_and_sanitizes():
+    assert shard_name(None) == "nfl"
+    assert shard_name("") == "nfl"
+    assert shard_name("NBA") == "nba"
+    assert shard_name("/league/4328-English Premier League") == "league_4328_english_premier_league"
+
+
+@pytest.fixture
+def index():
+    client = chromadb.EphemeralClient()
+    generation = build_generation(1, client, lambda text: [float(len(text)), 1.0, 0.0], PLAYERS)
+    yield generation
+    for name in client.list_collections():
+        client.delete_collection(name=name if isinstance(name, str) else name.name)
+
+
+@pytest.fixture(scope="module")
+def router():
+    return ShardRouter(max_workers=2)
+
+
+def test_players_without_a_league_go_to_the_nfl_shard(index):
+    assert index.shard_sizes == {"nfl": 2, "nba": 1}
+
+
+@pytest.mark.parametrize(
+    "question, shards",
+    [
+        ("Who plays for the Baltimore Ravens?", ["nfl"]),
+        ("Who is the best player on the Los Angeles Lakers?", ["nba"]),
+        ("How many titles does LeBron James have?", ["nba"]),
+        ("Baltimore Ravens or Los Angeles Lakers: which team is older?", ["nba", "nfl"]),
+        ("Who is the best point guard?", ["nba"]),
+        ("Who is the best player ever?", ["nba", "nfl"]),
+    ],
+)
+def test_route(index, router, question, shards):
+    assert sorted(router.route(index, question)) == shards
+
+
+def test_query_merges_routed_shards_by_distance(index, router):
+    results = router.query(
+        index,
+        ["Who plays for the Baltimore Ravens?", "Who is the best player ever?"],
+        [[70.0, 1.0, 0.0], [70.0, 1.0, 0.0]],
+        n_results=3,
+    )
+    assert len(results["ids"][0]) == 2  # only the NFL shard
+    assert len(results["ids"][1]) == 3  # every shard
+    assert results["distances"][1] == sorted(results["distances"][1])
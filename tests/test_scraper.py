@@ -0,0 +1,40 @@
+import json
+
+from app.scrapers.http_client import FetchClient
+from app.scrapers.sportsdb import scraper as scraper_module
+from app.storage.durable import DurableWriter
+
+
+def page(name, description):
+    return (
+        f'<html><body><font size="5">{name}</font>'
+        f'<div class="col-sm-9"><p>{description}</p></div></body></html>'
+    )
+
+
+def test_process_players_merges_into_the_current_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper_module, "get_client", lambda: FetchClient())
+    pages = {
+        "https://x/lamar": page("Lamar Jackson", "Quarterback."),
+        "https://x/zay": page("Zay Flowers", "Wide receiver."),
+    }
+    scraper = scraper_module.SportsDBScraper()
+    scraper.players_file = str(tmp_path / "players.json")
+    monkeypatch.setattr(scraper, "fetch_player_page", pages.get)
+
+    assert scraper.process_players(["https://x/lamar"])["added"] == 1
+
+    # Another writer (the crawler) adds a player between runs
+    with open(scraper.players_file, encoding="utf-8") as f:
+        players = json.load(f)["players"]
+    DurableWriter(scraper.players_file).write_players(
+        players + [{"name": "Derrick Henry", "description": "Running back."}]
+    )
+
+    stats = scraper.process_players(["https://x/zay", "https://x/lamar"])
+    assert (stats["added"], stats["updated"]) == (1, 1)
+    scraper.save_players_json({"name": "Mark Andrews", "description": "Tight end."})
+
+    with open(scraper.players_file, encoding="utf-8") as f:
+        names = [p["name"] for p in json.load(f)["players"]]
+    assert names == ["Lamar Jackson", "Derrick Henry", "Zay Flowers", "Mark Andrews"]
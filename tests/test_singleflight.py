@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from serving.singleflight import SingleFlight, normalize_question
+
+
+def test_normalize_question():
+    assert normalize_question("Who is C.J. Stroud?") == normalize_question("who is  cj stroud")
+    assert normalize_question("Who is Zoë?") == "who is zoe"
+
+
+def test_concurrent_calls_share_one_computation():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(*(flight.do("q", compute) for _ in range(5)))
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+        assert {result for result, _ in results} == {"answer"}
+        assert flight._calls == {}
+
+        # Once finished the key is forgotten, so the next call computes again
+        assert await flight.do("q", compute) == ("answer", False)
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+
+def test_owner_gets_the_error_and_waiters_retry_on_their_own():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            if len(calls) == 1:
+                raise RuntimeError("rate limited")
+            return "answer"
+
+        owner = asyncio.ensure_future(flight.do("q", flaky))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do("q", flaky))
+
+        with pytest.raises(RuntimeError):
+            await owner
+        assert await waiter == ("answer", False)
+        assert len(calls) == 2
+        assert flight._calls == {}
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def main():
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "answer"
+
+        owner = asyncio.ensure_future(flight.do("q", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do("q", compute))
+        await asyncio.sleep(0)
+        owner.cancel()
+        assert await waiter == ("answer", True)
+        assert flight._calls == {}
+
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+from app.scrapers.sportsdb.api_bench import compare
+
+
+def fixture_players(n=24):
+    positions = ["Quarterback", "Tight End", "Wide Receiver", "Linebacker"]
+    return [
+        {
+            "url": f"https://www.thesportsdb.com/player/{34100000 + i}-Player-{i}",
+            "name": f"Player {i}" if i % 5 else f"José D'Angelo {i}",
+            "number": str(i),
+            "position": positions[i % len(positions)],
+            "birth_year": 1990 + i % 10,
+            "birth_place": "Baltimore, Maryland" if i % 2 else "",
+            "height": "6 ft 2 in (1.88 m)",
+            "weight": "220 lb (100 kg)",
+            "status": "Active",
+            "nationality": "White" if i % 3 else "",
+            "description": f"Player {i} is an American football player. He played college football at State {i}.",
+            "honors": [],
+        }
+        for i in range(n)
+    ]
+
+
+def test_api_ingest_matches_html_scrape_with_fewer_requests():
+    report = compare(fixture_players(), per_team=8, chrome=4000, latency=0, port=0)
+
+    assert report["teams"] == 3 and report["players"] == 24
+    assert report["html"]["players"] == report["api"]["players"] == 24
+    assert report["agreement"] == {"matched": 24, "field_mismatches": {}}
+    assert report["html"]["errors"] == report["api"]["errors"] == 0
+    # League + one roster per team, instead of league + teams + every player page
+    assert report["api"]["requests"] == 1 + 3
+    assert report["html"]["requests"] == 1 + 3 + 24
+    assert report["api"]["bytes_wire"] < report["html"]["bytes_wire"]
@@ -0,0 +1,77 @@
+import pytest
+
+from storage.stats_store import StatsStore, parse_scope
+
+
+def season(year, team, rushing, games):
+    return {"Year": str(year), "Team": team, "Rushing Yds": f"{rushing:,}", "GP": str(games)}
+
+
+RECORDS = [
+    {
+        "name": "Lamar Jackson",
+        "wiki": {
+            "slug": "Lamar_Jackson",
+            "tables": [
+                {"title": "Regular season", "data": [season(2019, "BAL", 1206, 15), season(2020, "BAL", 1005, 15)]},
+                {"title": "Postseason", "data": [season(2019, "BAL", 143, 1)]},
+            ],
+        },
+    },
+    {
+        "name": "Mark Ingram",
+        "wiki": {
+            "slug": "Mark_Ingram",
+            "tables": [
+                {"title": "Regular season", "data": [season(2019, "BAL", 1018, 15), season(2020, "HOU", 299, 11)]},
+            ],
+        },
+    },
+]
+
+
+@pytest.fixture(scope="module")
+def store():
+    return StatsStore.from_records(RECORDS)
+
+
+@pytest.mark.parametrize(
+    "question, leader, value",
+    [
+        ("Who had the most rushing yards in 2019?", "Lamar Jackson", 1206),
+        ("who had the fewest rushing yards in 2020", "Mark Ingram", 299),
+        ("Most rushing yards among Ravens in 2020", "Lamar Jackson", 1005),
+        ("Which player had the most rushing yards for the Texans?", "Mark Ingram", 299),
+        ("Who had the most rushing yards from 2019 to 2020?", "Lamar Jackson", 2211),
+        ("Who had the most rushing yards in the playoffs in 2019?", "Lamar Jackson", 143),
+    ],
+)
+def test_answers_scoped_leader_questions(store, question, leader, value):
+    answer = store.answer(question)
+    assert answer is not None
+    assert answer["leaders"][0] == (leader, value)
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "What were the top games of Lamar Jackson?",
+        "Did Mark Andrews have the most rushing yards in 2019?",
+        "Which team led the league in rushing yards in 2019?",
+        "Who has the most rushing yards in NFL history?",
+        "Who had the most rushing yards?",  # all-time: not covered by the crawled sample
+        "Who had the most rushing yards in 2005?",  # outside the seasons the table holds
+        "Who had the most rushing yards in 2019 of Lamar Jackson?",
+        "Who had the most rushing yards in 2019 and why?",
+        "Who had the most punts in 2019?",
+    ],
+)
+def test_falls_through_to_the_llm(store, question):
+    assert store.answer(question) is None
+
+
+def test_parse_scope():
+    assert parse_scope(" among the ravens in 2021") == ({"team": "Ravens", "season": 2021}, "regular_season")
+    assert parse_scope(" in the playoffs") == ({}, "postseason")
+    assert parse_scope(" in nfl history") is None
+    assert parse_scope(" in 2019 in 2020") is None